@@ -0,0 +1,114 @@
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from alttprbot.exceptions import SahasrahBotException
+
+VERSION_LINE = re.compile(r"ALttP Dungeon Randomizer Version (.*)  -  Seed: ([0-9]*)")
+CONNECTION_LINE = re.compile(r"(.*?) (<=>|=>|<=) (.*)")
+HASH_LINE = re.compile(r"Hash[^:]*:\s*(.*)")
+
+# sections of the spoiler that are indexed, the rest (e.g. the playthrough) are skipped over
+LOCATION_SECTIONS = {'Locations'}
+CONNECTION_SECTIONS = {'Entrances', 'Doors'}
+
+
+@dataclass
+class DoorSpoiler:
+    """
+    The parts of a Door Randomizer spoiler the bot uses, without the raw text.
+    """
+    version: Optional[str] = None
+    seed: Optional[str] = None
+    hash_code: Tuple[str, ...] = ()
+    settings: Dict[str, str] = field(default_factory=dict)
+    locations: Dict[str, str] = field(default_factory=dict)
+    # (from, direction, to), direction is one of <=>, => or <=
+    entrances: List[Tuple[str, str, str]] = field(default_factory=list)
+    doors: List[Tuple[str, str, str]] = field(default_factory=list)
+
+
+class DoorSpoilerError(SahasrahBotException):
+    pass
+
+
+class DoorSpoilerParser():
+    """
+    Parses a Door Randomizer spoiler as it is fed, a chunk of bytes at a time, keeping only the partial last line
+    between chunks.
+    """
+
+    def __init__(self):
+        self.spoiler = DoorSpoiler()
+        self._section = None
+        self._partial = b''
+
+    def feed(self, chunk: bytes) -> None:
+        lines = (self._partial + bytes(chunk)).split(b'\n')
+        self._partial = lines.pop()
+        for raw in lines:
+            self._line(raw)
+
+    def tee(self, chunks: Iterable[bytes]) -> Iterable[bytes]:
+        """
+        Feed each chunk to the parser on its way past, so the spoiler can be parsed while it's being compressed.
+        """
+        for chunk in chunks:
+            self.feed(chunk)
+            yield chunk
+
+    def close(self) -> DoorSpoiler:
+        if self._partial:
+            self._line(self._partial)
+            self._partial = b''
+        if not self.spoiler.hash_code:
+            raise DoorSpoilerError("Unable to find the hash code in the door randomizer spoiler.")
+        return self.spoiler
+
+    def _line(self, raw: bytes) -> None:
+        spoiler = self.spoiler
+        text = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+        line = text.strip()
+        if not line:
+            return
+
+        if spoiler.version is None and (match := VERSION_LINE.search(line)):
+            spoiler.version, spoiler.seed = match.groups()
+            return
+
+        # the hash isn't always in the header, so it's looked for in every section
+        if not spoiler.hash_code and (match := HASH_LINE.fullmatch(line)):
+            spoiler.hash_code = tuple(sys.intern(code) for code in match.group(1).split(', '))
+            return
+
+        # section headers are a name and a colon on a line of their own.  settings are padded out to line up, so
+        # one with an empty value still has trailing spaces
+        if text.endswith(':') and ': ' not in text:
+            self._section = line[:-1]
+            return
+
+        section = self._section
+        if section is None:
+            key, sep, value = line.partition(':')
+            if sep:
+                spoiler.settings[key.strip()] = value.strip()
+        elif section in LOCATION_SECTIONS:
+            location, sep, item = line.rpartition(': ')
+            if sep:
+                spoiler.locations[sys.intern(location)] = sys.intern(item)
+        elif section in CONNECTION_SECTIONS:
+            if match := CONNECTION_LINE.fullmatch(line):
+                a, direction, b = match.groups()
+                connection = (sys.intern(a), sys.intern(direction), sys.intern(b))
+                (spoiler.entrances if section == 'Entrances' else spoiler.doors).append(connection)
+
+
+def parse_door_spoiler(chunks: Iterable[bytes]) -> DoorSpoiler:
+    """
+    Parse a Door Randomizer spoiler from an iterable of byte chunks, which don't need to line up with lines.
+    """
+    parser = DoorSpoilerParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
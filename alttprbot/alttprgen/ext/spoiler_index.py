@@ -0,0 +1,264 @@
+import sys
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from pyz3r.misc import seek_patch_data
+from pyz3r.spoiler import get_seed_prizepacks, translation
+
+# sections of the spoiler that list item locations, in the order they are written out
+SECTIONS = [
+    'Special',
+    'Hyrule Castle',
+    'Eastern Palace',
+    'Desert Palace',
+    'Tower Of Hera',
+    'Castle Tower',
+    'Dark Palace',
+    'Swamp Palace',
+    'Skull Woods',
+    'Thieves Town',
+    'Ice Palace',
+    'Misery Mire',
+    'Turtle Rock',
+    'Ganons Tower',
+    'Light World',
+    'Death Mountain',
+    'Dark World'
+]
+ENTRANCE_SECTIONS = [
+    'Special',
+    'Hyrule Castle',
+    'Eastern Palace',
+    'Desert Palace',
+    'Tower of Hera',
+    'Agahnims Tower',
+    'Palace of Darkness',
+    'Swamp Palace',
+    'Skull Woods',
+    'Thieves Town',
+    'Ice Palace',
+    'Misery Mire',
+    'Turtle Rock',
+    'Ganons Tower',
+    'Caves',
+    'Light World',
+    'Dark World'
+]
+
+# (section, prize location) for each dungeon with a prize
+PRIZES = [
+    ('Eastern Palace', 'Eastern Palace - Prize'),
+    ('Desert Palace', 'Desert Palace - Prize'),
+    ('Tower Of Hera', 'Tower of Hera - Prize'),
+    ('Dark Palace', 'Palace of Darkness - Prize'),
+    ('Swamp Palace', 'Swamp Palace - Prize'),
+    ('Skull Woods', 'Skull Woods - Prize'),
+    ('Thieves Town', 'Thieves\' Town - Prize'),
+    ('Ice Palace', 'Ice Palace - Prize'),
+    ('Misery Mire', 'Misery Mire - Prize'),
+    ('Turtle Rock', 'Turtle Rock - Prize'),
+]
+ENTRANCE_PRIZES = [
+    ('Eastern Palace', 'Eastern Palace - Prize'),
+    ('Desert Palace', 'Desert Palace - Prize'),
+    ('Tower of Hera', 'Tower of Hera - Prize'),
+    ('Palace of Darkness', 'Palace of Darkness - Prize'),
+    ('Swamp Palace', 'Swamp Palace - Prize'),
+    ('Skull Woods', 'Skull Woods - Prize'),
+    ('Thieves Town', 'Thieves\' Town - Prize'),
+    ('Ice Palace', 'Ice Palace - Prize'),
+    ('Misery Mire', 'Misery Mire - Prize'),
+    ('Turtle Rock', 'Turtle Rock - Prize'),
+]
+
+PROGRESSION_ITEMS = frozenset([
+    'L1Sword',
+    'MasterSword',
+    'ProgressiveSword',
+    'BottleWithRandom',
+    'Bottle',
+    'BottleWithRedPotion',
+    'BottleWithGreenPotion',
+    'BottleWithBluePotion',
+    'BottleWithBee',
+    'BottleWithGoldBee',
+    'BottleWithFairy',
+    'Bombos',
+    'BookOfMudora',
+    'BowAndArrows',
+    'CaneOfSomaria',
+    'Cape',
+    'Ether',
+    'FireRod',
+    'Flippers',
+    'Hammer',
+    'Hookshot',
+    'IceRod',
+    'Lamp',
+    'MagicMirror',
+    'MoonPearl',
+    'Mushroom',
+    'OcarinaInactive',
+    'OcarinaActive',
+    'PegasusBoots',
+    'Powder',
+    'PowerGlove',
+    'Quake',
+    'Shovel',
+    'TitansMitt',
+    'BowAndSilverArrows',
+    'SilverArrowUpgrade',
+    'ProgressiveGlove',
+    'ProgressiveBow',
+    'BugCatchingNet',
+    'CaneOfByrna',
+])
+
+DIGGING_GAME_OFFSET = 982421
+
+
+def _clean(name: str) -> str:
+    # strip the player number from multiworld style names, e.g. "Link's House:1"
+    return sys.intern(name.replace(':1', ''))
+
+
+class SpoilerIndex():
+    """
+    An alttpr.com spoiler parsed once into lookup tables, so the progression spoiler, the formatted spoiler and
+    queries like "where are the progressive swords" don't each walk the raw spoiler.
+
+        index = seed.spoiler_index
+        index.locations_of('ProgressiveSword')
+    """
+
+    def __init__(self, data: dict, hash_id: str = None, url: str = None):
+        self.data = data
+        self.hash_id = hash_id
+        self.url = url
+
+        spoiler = data['spoiler']
+        self.meta: dict = spoiler.get('meta', {})
+        self.entrance_shuffle = self.meta.get('shuffle', 'none') != 'none'
+
+        sections = ENTRANCE_SECTIONS if self.entrance_shuffle else SECTIONS
+        prizes = ENTRANCE_PRIZES if self.entrance_shuffle else PRIZES
+        prize_locations = {location for _, location in prizes}
+
+        # section -> locations, in spoiler order.  prizes are kept apart, as they aren't item locations
+        self.sections: Dict[str, Tuple[str, ...]] = {}
+        self.location_item: Dict[str, str] = {}
+        self.location_section: Dict[str, str] = {}
+        self.prizes: Dict[str, str] = {}
+        item_locations: Dict[str, List[str]] = {}
+
+        for section in sections:
+            if section not in spoiler:
+                continue
+            locations = []
+            for location, item in spoiler[section].items():
+                location, item = _clean(location), _clean(item)
+                if location in prize_locations:
+                    self.prizes[section] = item
+                    continue
+                locations.append(location)
+                self.location_item[location] = item
+                self.location_section[location] = section
+                item_locations.setdefault(item, []).append(location)
+            self.sections[section] = tuple(locations)
+
+        self.item_locations: Dict[str, Tuple[str, ...]] = {
+            item: tuple(locations) for item, locations in item_locations.items()
+        }
+        self.progression_locations: FrozenSet[str] = frozenset(
+            location for location, item in self.location_item.items() if item in PROGRESSION_ITEMS
+        )
+
+        self.entrances: Optional[list] = spoiler.get('Entrances') if self.entrance_shuffle else None
+        self.bosses: Optional[dict] = spoiler.get('Bosses')
+        self.shops: Optional[list] = spoiler.get('Shops')
+
+    @property
+    def spoilers_available(self) -> bool:
+        return self.meta.get('spoilers') in ['on', 'generate']
+
+    def item_at(self, location: str) -> Optional[str]:
+        return self.location_item.get(location)
+
+    def locations_of(self, *items: str) -> List[Tuple[str, str]]:
+        """
+        Returns (section, location) for every location holding one of the items.
+        """
+        return [
+            (self.location_section[location], location)
+            for item in items
+            for location in self.item_locations.get(item, ())
+        ]
+
+    def is_progression(self, location: str) -> bool:
+        return location in self.progression_locations
+
+    def _meta(self) -> dict:
+        return dict(self.meta, hash=self.hash_id, permalink=self.url)
+
+    def progression_spoiler(self) -> Optional[OrderedDict]:
+        """
+        The progression items in each section, plus the entrances for entrance shuffle seeds.
+        """
+        if not self.spoilers_available:
+            return None
+
+        progression_spoiler = OrderedDict()
+        for section, locations in self.sections.items():
+            if section == 'Special':
+                continue
+            progression_for_section = [location for location in locations if location in self.progression_locations]
+            if progression_for_section:
+                progression_spoiler[section] = progression_for_section
+
+        if self.entrance_shuffle:
+            progression_spoiler['Entrances'] = self.entrances
+
+        progression_spoiler['meta'] = self._meta()
+        return progression_spoiler
+
+    def formatted_spoiler(self, translate_dungeon_items=False) -> Optional[OrderedDict]:
+        """
+        The spoiler as written for spoiler races.  Matches pyz3r's create_filtered_spoiler.
+        """
+        if not self.spoilers_available:
+            return None
+
+        sorteddict = OrderedDict()
+        sorteddict['Prizes'] = dict(self.prizes)
+
+        for section, locations in self.sections.items():
+            items = {location: self.location_item[location] for location in locations}
+            if translate_dungeon_items:
+                items = {location: translation.get(item, item) for location, item in items.items()}
+            sorteddict[section] = items
+
+        drops = get_seed_prizepacks(self.data)
+        sorteddict['Drops'] = {
+            'PullTree': drops['PullTree'],
+            'RupeeCrab': {
+                'Main': drops['RupeeCrab']['Main'],
+                'Final': drops['RupeeCrab']['Final'],
+            },
+            'Stun': drops['Stun'],
+            'FishSave': drops['FishSave'],
+            'PrizePacks': drops['PrizePacks'],
+        }
+
+        sorteddict['Special']['DiggingGameDigs'] = seek_patch_data(self.data['patch'], DIGGING_GAME_OFFSET, 1)[0]
+
+        if self.meta.get('mode', 'open') == 'retro':
+            sorteddict['Shops'] = self.shops
+
+        if not self.meta.get('enemizer.boss_shuffle', 'none') == 'none':
+            sorteddict['Bosses'] = {_clean(k): _clean(v) for k, v in self.bosses.items()}
+
+        if self.entrance_shuffle:
+            sorteddict['Entrances'] = self.entrances
+
+        sorteddict['meta'] = self._meta()
+        return sorteddict
@@ -1,13 +1,11 @@
 import base64
+import copy
 import logging
 import os
 import random
 from dataclasses import dataclass
 from typing import List
 
-import aiocache
-import aiofiles
-import pyz3r
 import yaml
 from aiohttp.client_exceptions import ClientResponseError
 from slugify import slugify
@@ -17,7 +15,12 @@ from tortoise.exceptions import DoesNotExist
 
 import config
 from alttprbot import models
-from alttprbot.alttprgen.randomizer import ctjets, mysterydoors
+from alttprbot.alttprgen.hedging import hedger
+from alttprbot.alttprgen.preset_index import preset_autocomplete
+from alttprbot.alttprgen.preset_registry import namespaced_preset_cache, preset_registry
+from alttprbot.alttprgen.randomizer import ctjets, mysterydoors, mysteryweights
+from alttprbot.alttprgen.scheduler import Priority, generation_scheduler
+from alttprbot.alttprgen.upstreams import alttpr_breaker, samus_breaker
 from alttprbot.exceptions import SahasrahBotException
 from alttprbot.util.helpers import generate_random_string
 from alttprbot_discord.util.alttpr_discord import ALTTPRDiscord
@@ -46,9 +49,8 @@ class WeightsetNotFoundException(SahasrahBotException):
     pass
 
 
-@aiocache.cached(ttl=60, cache=aiocache.SimpleMemoryCache)
 async def get_global_preset_list(path) -> List[str]:
-    return [os.path.splitext(f)[0] for f in os.listdir(path) if f.endswith(".yaml")]
+    return await preset_registry.names(path)
 
 
 @dataclass
@@ -97,20 +99,26 @@ class SahasrahBotPresetCore():
 
         return preset
 
-    async def search(self, value: str) -> List[str]:
-        preset_files = await self.get_presets()
-        return sorted([a for a in preset_files if a.startswith(value.lower())][:25])
+    async def search(self, value: str, discord_user_id: int = None) -> List[str]:
+        global_index = preset_autocomplete.global_index(self.global_preset_path, await self.get_presets())
+        return preset_autocomplete.search(global_index, self.randomizer, value, discord_user_id=discord_user_id)
 
     async def get_presets(self, namespace=None) -> list:
         if namespace is None:
             return await get_global_preset_list(self.global_preset_path)
 
+        cached = namespaced_preset_cache.get_listing(namespace, self.randomizer)
+        if cached is not None:
+            return cached
+
         namespace_data = await models.PresetNamespaces.get_or_none(name=namespace)
         if namespace_data is None:
             raise NamespaceNotFound(f"Could not find namespace {namespace}.")
 
         presets = await models.Presets.filter(namespace__name=namespace_data.name, randomizer=self.randomizer)
-        return [preset.preset_name for preset in presets]
+        preset_names = [preset.preset_name for preset in presets]
+        namespaced_preset_cache.set_listing(namespace, self.randomizer, preset_names)
+        return preset_names
 
     async def fetch(self) -> PresetData:
         if self.preset is None:
@@ -141,17 +149,25 @@ class SahasrahBotPresetCore():
         await models.Presets.update_or_create(randomizer=self.randomizer, preset_name=self.preset,
                                               namespace=namespace_data, defaults={'content': self.raw})
 
+        namespaced_preset_cache.invalidate(self.namespace, self.randomizer)
+        namespaced_preset_cache.set(self.namespace, self.randomizer, self.preset, self.raw, self.preset_data)
+        preset_autocomplete.add_namespaced(self.namespace, self.randomizer, self.preset)
+
     async def _fetch_global(self):
-        basename = os.path.basename(f'{self.preset}.yaml')
-        try:
-            async with aiofiles.open(os.path.join(self.global_preset_path, basename)) as f:
-                self.raw = await f.read()
-                self.preset_data = yaml.safe_load(self.raw)
-        except FileNotFoundError as err:
+        basename = os.path.splitext(os.path.basename(f'{self.preset}.yaml'))[0]
+        preset = await preset_registry.get(self.global_preset_path, basename)
+        if preset is None:
             raise PresetNotFoundException(
-                f'Could not find preset {self.preset}.  See a list of available presets at https://sahasrahbot.synack.live/presets.html') from err
+                f'Could not find preset {self.preset}.  See a list of available presets at https://sahasrahbot.synack.live/presets.html')
+
+        self.raw, self.preset_data = preset
 
     async def _fetch_namespaced(self):
+        cached = namespaced_preset_cache.get(self.namespace, self.randomizer, self.preset)
+        if cached is not None:
+            self.raw, self.preset_data = cached
+            return
+
         data = await models.Presets.get_or_none(preset_name=self.preset, randomizer=self.randomizer,
                                                 namespace__name=self.namespace)
 
@@ -160,15 +176,19 @@ class SahasrahBotPresetCore():
 
         self.raw = data.content
         self.preset_data = yaml.safe_load(self.raw)
+        namespaced_preset_cache.set(self.namespace, self.randomizer, self.preset, self.raw, self.preset_data)
 
 
 class ALTTPRPreset(SahasrahBotPresetCore):
     randomizer = 'alttpr'
+    seed: ALTTPRDiscord = None
+    audit_data: dict = None
 
     # TODO: Make this so it isn't an absolute dumpster fire
     # this code really sucks
     async def generate(self, hints=False, nohints=False, spoilers="off", tournament=True, allow_quickswap=False,
-                       endpoint_prefix="", branch=None) -> ALTTPRDiscord:
+                       endpoint_prefix="", branch=None, audit=True,
+                       priority: Priority = Priority.CASUAL) -> ALTTPRDiscord:
         if self.preset_data is None:
             await self.fetch()
 
@@ -185,18 +205,20 @@ class ALTTPRPreset(SahasrahBotPresetCore):
             if allow_quickswap:
                 settings['quickswap'] = True
 
-            seed = await AlttprDoorDiscord.create(
-                settings=settings,
-                spoilers=spoilers == "on",
-                branch=branch
-            )
+            async with generation_scheduler.slot('alttprdoor', priority):
+                seed = await AlttprDoorDiscord.create(
+                    settings=settings,
+                    spoilers=spoilers == "on",
+                    branch=branch
+                )
             hash_id = seed.hash
         elif avianart:
             preset = settings['preset']
-            seed = await AVIANARTDiscord.create(
-                preset=preset,
-                race=tournament,
-            )
+            async with generation_scheduler.slot('avianart', priority):
+                seed = await AVIANARTDiscord.create(
+                    preset=preset,
+                    race=tournament,
+                )
             hash_id = seed.hash_id
         else:
             branch = self.preset_data.get('branch', branch)  # live, tournament, beeta
@@ -247,14 +269,16 @@ class ALTTPRPreset(SahasrahBotPresetCore):
             else:
                 baseurl = config.ALTTPR_BASEURL
 
-            seed = await ALTTPRDiscord.generate(
-                settings=settings,
-                endpoint=endpoint,
-                baseurl=baseurl,
-            )
+            async with generation_scheduler.slot('alttpr', priority), alttpr_breaker.guard():
+                seed = await ALTTPRDiscord.generate(
+                    settings=settings,
+                    endpoint=endpoint,
+                    baseurl=baseurl,
+                )
             hash_id = seed.hash
 
-        await models.AuditGeneratedGames.create(
+        # kept so a seed rolled with audit=False (e.g. for the seed pool) can be recorded when it is handed out
+        self.audit_data = dict(
             randomizer=self.randomizer,
             hash_id=hash_id,
             permalink=seed.url,
@@ -265,6 +289,8 @@ class ALTTPRPreset(SahasrahBotPresetCore):
             doors=doors,
             avianart=avianart
         )
+        if audit:
+            await models.AuditGeneratedGames.create(**self.audit_data)
         return seed
 
 
@@ -275,41 +301,53 @@ class ALTTPRMystery(SahasrahBotPresetCore):
     def global_preset_path(self) -> str:
         return "presets/alttprmystery"
 
-    async def generate(self, spoilers="off", tournament=True, allow_quickswap=True):
+    @property
+    def compiled(self) -> mysteryweights.CompiledWeightset:
+        return mysteryweights.compile_weightset(self.preset_data, self.raw)
+
+    async def generate(self, spoilers="off", tournament=True, allow_quickswap=True,
+                       priority: Priority = Priority.CASUAL):
         if self.preset_data is None:
             await self.fetch()
 
+        async def roll():
+            mystery = await mystery_generate(self.preset_data, spoilers=spoilers, compiled=self.compiled)
+
+            # door seeds are hedged by AlttprDoor itself, so they are only hedged at one level
+            if mystery.doors:
+                async with generation_scheduler.slot('alttprdoor', priority):
+                    seed = await AlttprDoorDiscord.create(
+                        settings=mystery.settings,
+                        spoilers=spoilers != "mystery",
+                        branch=mystery.branch
+                    )
+                return mystery, seed
+
+            if mystery.customizer:
+                endpoint = "/api/customizer"
+            else:
+                endpoint = "/api/randomizer"
+
+            mystery.settings['tournament'] = tournament
+            mystery.settings['allow_quickswap'] = allow_quickswap
+
+            async def attempt():
+                # each hedged attempt gets its own copy of the settings
+                async with generation_scheduler.slot('alttpr', priority), alttpr_breaker.guard():
+                    return await ALTTPRDiscord.generate(settings=copy.deepcopy(mystery.settings),
+                                                        endpoint=endpoint)
+
+            seed = await hedger.run('alttprmystery', attempt, failures=(ClientResponseError,))
+            return mystery, seed
+
         try:
             async for attempt in AsyncRetrying(stop=stop_after_attempt(5),
                                                retry=retry_if_exception_type(ClientResponseError)):
                 with attempt:
+                    # each retry rolls new settings, in case the randomizer rejected the last ones
                     try:
-                        mystery = await mystery_generate(self.preset_data, spoilers=spoilers)
-
-                        if mystery.doors:
-                            seed = await AlttprDoorDiscord.create(
-                                settings=mystery.settings,
-                                spoilers=spoilers != "mystery",
-                                branch=mystery.branch
-                            )
-                        else:
-                            if mystery.customizer:
-                                endpoint = "/api/customizer"
-                            else:
-                                endpoint = "/api/randomizer"
-
-                            mystery.settings['tournament'] = tournament
-                            mystery.settings['allow_quickswap'] = allow_quickswap
-                            seed = await ALTTPRDiscord.generate(settings=mystery.settings, endpoint=endpoint)
-                    except:
-                        # await models.AuditGeneratedGames.create(
-                        #     randomizer='alttpr',
-                        #     settings=mystery.settings,
-                        #     gentype='mystery failure',
-                        #     genoption=self.preset,
-                        #     customizer=1 if mystery.customizer else 0,
-                        #     doors=mystery.doors
-                        # )
+                        mystery, seed = await roll()
+                    except Exception:
                         logging.exception("Failed to generate game, retrying...")
                         raise
         except RetryError as e:
@@ -333,7 +371,7 @@ class ALTTPRMystery(SahasrahBotPresetCore):
         if self.preset_data is None:
             await self.fetch()
 
-        mystery = await mystery_generate(weights=self.preset_data)
+        mystery = await mystery_generate(weights=self.preset_data, compiled=self.compiled)
 
         return mystery
 
@@ -344,7 +382,7 @@ class SMPreset(SahasrahBotPresetCore):
     spoiler_key: str = None
     seed: SMDiscord = None
 
-    async def generate(self, tournament=True, spoilers=False):
+    async def generate(self, tournament=True, spoilers=False, priority: Priority = Priority.CASUAL):
         if self.preset_data is None:
             await self.fetch()
 
@@ -357,10 +395,11 @@ class SMPreset(SahasrahBotPresetCore):
 
             settings['spoilerKey'] = self.spoiler_key
 
-        self.seed = await self.randomizer_class.create(
-            settings=settings,
-            baseurl=self.baseurl
-        )
+        async with generation_scheduler.slot(self.randomizer, priority), samus_breaker.guard():
+            self.seed = await self.randomizer_class.create(
+                settings=settings,
+                baseurl=self.baseurl
+            )
 
         await models.AuditGeneratedGames.create(
             randomizer=self.randomizer,
@@ -418,12 +457,13 @@ class SMZ3Preset(SMPreset):
 class CTJetsPreset(SahasrahBotPresetCore):
     randomizer = 'ctjets'
 
-    async def generate(self):
+    async def generate(self, priority: Priority = Priority.CASUAL):
         if self.preset_data is None:
             await self.fetch()
 
         settings = self.preset_data['settings']  # pylint: disable=E1136
-        seed_uri = await ctjets.roll_ctjets(settings, version=self.preset_data.get('version', '3_1_0'))
+        async with generation_scheduler.slot(self.randomizer, priority):
+            seed_uri = await ctjets.roll_ctjets(settings, version=self.preset_data.get('version', '3_1_0'))
 
         await models.AuditGeneratedGames.create(
             randomizer=self.randomizer,
@@ -437,12 +477,14 @@ class CTJetsPreset(SahasrahBotPresetCore):
         return seed_uri
 
 
-async def mystery_generate(weights, spoilers="mystery"):
+async def mystery_generate(weights, spoilers="mystery", compiled: mysteryweights.CompiledWeightset = None):
+    if compiled is None:
+        compiled = mysteryweights.compile_weightset(weights)
+
     if 'preset' in weights:
-        rolledpreset = pyz3r.mystery.get_random_option(weights['preset'])
+        rolledpreset = compiled.choose(weights['preset'])
         if rolledpreset == 'none':
-            return mysterydoors.generate_doors_mystery(weights=weights,
-                                                       spoilers=spoilers)  # pylint: disable=unbalanced-tuple-unpacking
+            return compiled.roll(spoilers=spoilers)
         else:
             data = ALTTPRPreset(rolledpreset)
             await data.fetch()
@@ -453,7 +495,7 @@ async def mystery_generate(weights, spoilers="mystery"):
             settings.pop('name', None)
             settings.pop('notes', None)
             settings['spoilers'] = spoilers
-            custom_instructions = pyz3r.mystery.get_random_option(weights.get('custom_instructions', None))
+            custom_instructions = compiled.choose(weights.get('custom_instructions', None))
 
             return mysterydoors.AlttprMystery(
                 weights=weights,
@@ -463,8 +505,7 @@ async def mystery_generate(weights, spoilers="mystery"):
                 custom_instructions=custom_instructions
             )
     else:
-        return mysterydoors.generate_doors_mystery(weights=weights,
-                                                   spoilers=spoilers)  # pylint: disable=unbalanced-tuple-unpacking
+        return compiled.roll(spoilers=spoilers)
 
 
 async def create_or_retrieve_namespace(discord_user_id, discord_user_name):
@@ -478,6 +519,7 @@ async def create_or_retrieve_namespace(discord_user_id, discord_user_name):
                                                                    defaults={'name': tempnamespaceslug})
 
     await namespace.fetch_related('collaborators')
+    preset_autocomplete.add_user_namespace(discord_user_id, namespace.name)
     return namespace
 
 
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple, Type, TypeVar
+
+T = TypeVar('T')
+
+HISTORY_SIZE = 50  # recent attempts remembered per backend
+MIN_SAMPLES = 10  # attempts needed before a backend's failure rate is trusted
+
+
+@dataclass
+class HedgePolicy:
+    enabled: bool = False
+    # hedge once this share of recent attempts have failed
+    min_failure_rate: float = 0.05
+    # launch the second attempt straight away once this share of recent attempts have failed
+    immediate_failure_rate: float = 0.3
+    # assume an outage and stop hedging once this share of recent attempts have failed
+    outage_failure_rate: float = 0.6
+    # otherwise, launch the second attempt once the first has taken longer than this percentile of recent successes
+    latency_percentile: float = 0.9
+    # hedges allowed per request, and how many can be saved up for a burst
+    budget_ratio: float = 0.2
+    budget_burst: float = 3.0
+
+
+HEDGE_POLICIES = {
+    'alttprdoor': HedgePolicy(enabled=True),
+    'alttprmystery': HedgePolicy(enabled=True),
+}
+
+
+@dataclass
+class BackendHealth:
+    policy: HedgePolicy
+    history: Deque[Tuple[bool, float]] = field(default_factory=lambda: deque(maxlen=HISTORY_SIZE))
+    tokens: float = 0.0
+    requests: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+
+    def record(self, success: bool, latency: float):
+        self.history.append((success, latency))
+
+    @property
+    def failure_rate(self) -> Optional[float]:
+        if len(self.history) < MIN_SAMPLES:
+            return None
+        return sum(1 for success, _ in self.history if not success) / len(self.history)
+
+    def latency(self, percentile: float) -> Optional[float]:
+        latencies = sorted(latency for success, latency in self.history if success)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percentile))]
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Seconds to wait before launching a second attempt, or None to not hedge this request.
+        """
+        failure_rate = self.failure_rate
+        if not self.policy.enabled or failure_rate is None:
+            return None
+        if failure_rate < self.policy.min_failure_rate or failure_rate >= self.policy.outage_failure_rate:
+            return None
+        if failure_rate >= self.policy.immediate_failure_rate:
+            return 0
+        return self.latency(self.policy.latency_percentile)
+
+    def take_token(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class Hedger():
+    """
+    Runs a generation attempt, and if the backend has been failing, races a second attempt against it.  The first
+    success wins and the other attempt is cancelled.
+
+    Whether to hedge comes from each backend's recent history, and each backend can only hedge a share of its
+    requests, so hedging doesn't pile more load onto a backend that is already struggling.
+    """
+
+    def __init__(self, policies: Dict[str, HedgePolicy] = None):
+        self.policies = HEDGE_POLICIES if policies is None else policies
+        self.backends: Dict[str, BackendHealth] = {}
+
+    def health(self, backend: str) -> BackendHealth:
+        if backend not in self.backends:
+            self.backends[backend] = BackendHealth(policy=self.policies.get(backend, HedgePolicy()))
+        return self.backends[backend]
+
+    async def _attempt(self, health: BackendHealth, attempt: Callable[[], Awaitable[T]],
+                       failures: Tuple[Type[Exception], ...]) -> T:
+        start = time.monotonic()
+        try:
+            result = await attempt()
+        except failures:
+            health.record(False, time.monotonic() - start)
+            raise
+        health.record(True, time.monotonic() - start)
+        return result
+
+    async def run(self, backend: str, attempt: Callable[[], Awaitable[T]],
+                  failures: Tuple[Type[Exception], ...] = (Exception,)) -> T:
+        """
+        Run attempt(), hedging it with a second call to attempt() if the backend's policy allows.
+        Only exceptions in failures count against the backend's health.
+        """
+        health = self.health(backend)
+        health.requests += 1
+        health.tokens = min(health.tokens + health.policy.budget_ratio, health.policy.budget_burst)
+
+        delay = health.hedge_delay()
+        if delay is None:
+            return await self._attempt(health, attempt, failures)
+
+        first = asyncio.create_task(self._attempt(health, attempt, failures))
+        tasks = {first}
+        hedged = False
+        error = None
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(tasks, timeout=None if hedged else delay,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    if health.take_token():
+                        health.hedges += 1
+                        logging.info("Hedging %s generation after %.1f seconds.", backend, delay)
+                        tasks.add(asyncio.create_task(self._attempt(health, attempt, failures)))
+                    continue
+
+                for task in done:
+                    tasks.discard(task)
+                    if task.exception() is None:
+                        if task is not first:
+                            health.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            backend: {
+                'failure_rate': health.failure_rate,
+                'requests': health.requests,
+                'hedges': health.hedges,
+                'hedge_wins': health.hedge_wins,
+                'tokens': round(health.tokens, 2),
+            } for backend, health in self.backends.items()
+        }
+
+
+hedger = Hedger()
@@ -0,0 +1,213 @@
+import asyncio
+import bisect
+import functools
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+from alttprbot import models
+
+AUTOCOMPLETE_LIMIT = 25
+NAMESPACE_REFRESH_INTERVAL = 300
+
+# ranks, lower is better
+RANK_EXACT = 0
+RANK_PREFIX = 1
+RANK_SUBSTRING = 2
+RANK_FUZZY = 3
+
+
+def _fuzzy_score(query: str, candidate: str):
+    """
+    Returns how many characters were skipped to match query as a subsequence of candidate, or None if it isn't one.
+    """
+    skipped = 0
+    position = 0
+    for char in query:
+        found = candidate.find(char, position)
+        if found == -1:
+            return None
+        skipped += found - position
+        position = found + 1
+    return skipped
+
+
+class PresetNameIndex():
+    """
+    Sorted index of preset names that supports ranked prefix, substring and fuzzy (subsequence) matching.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._keys: List[str] = []
+        self._names: List[str] = []
+        for name in sorted(set(names), key=str.lower):
+            self._keys.append(name.lower())
+            self._names.append(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def add(self, name: str) -> None:
+        key = name.lower()
+        idx = bisect.bisect_left(self._keys, key)
+        if idx < len(self._keys) and self._names[idx] == name:
+            return
+        self._keys.insert(idx, key)
+        self._names.insert(idx, name)
+
+    def remove(self, name: str) -> None:
+        idx = bisect.bisect_left(self._keys, name.lower())
+        while idx < len(self._keys) and self._keys[idx] == name.lower():
+            if self._names[idx] == name:
+                del self._keys[idx]
+                del self._names[idx]
+                return
+            idx += 1
+
+    def ranked(self, query: str) -> List[Tuple[int, int, str]]:
+        """
+        Returns (rank, score, name) tuples for every name matching the query, best matches first.
+        """
+        query = query.lower()
+        if not query:
+            return [(RANK_PREFIX, 0, name) for name in self._names]
+
+        results = []
+        start = bisect.bisect_left(self._keys, query)
+        end = bisect.bisect_right(self._keys, query + '\uffff')
+        for idx in range(start, end):
+            rank = RANK_EXACT if self._keys[idx] == query else RANK_PREFIX
+            results.append((rank, len(self._keys[idx]), self._names[idx]))
+
+        for idx, key in enumerate(self._keys):
+            if start <= idx < end:
+                continue
+            position = key.find(query)
+            if position != -1:
+                results.append((RANK_SUBSTRING, position, self._names[idx]))
+                continue
+            score = _fuzzy_score(query, key)
+            if score is not None:
+                results.append((RANK_FUZZY, score, self._names[idx]))
+
+        results.sort()
+        return results
+
+    def search(self, query: str, limit: int = AUTOCOMPLETE_LIMIT) -> List[str]:
+        return [name for _, _, name in self.ranked(query)[:limit]]
+
+
+class PresetAutocomplete():
+    """
+    Answers preset autocomplete queries entirely from memory.
+
+    Global presets come from the preset registry.  Namespaced presets and the namespaces each Discord user can write
+    to are loaded from the database in the background, and kept current by the code paths that save presets.
+    """
+
+    def __init__(self, refresh_interval: int = NAMESPACE_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._global: Dict[str, PresetNameIndex] = {}
+        self._namespaced: Dict[str, Dict[str, PresetNameIndex]] = {}
+        self._user_namespaces: Dict[int, Set[str]] = {}
+        self._loaded_at: float = None
+        self._refresh_task: asyncio.Task = None
+        # changes made while a refresh is reading the database, replayed on top of what it loaded
+        self._changes: List[Callable[[], None]] = None
+
+    def global_index(self, path: str, names: List[str]) -> PresetNameIndex:
+        index = self._global.get(path)
+        if index is None or len(index) != len(names) or list(index) != names:
+            index = PresetNameIndex(names)
+            self._global[path] = index
+        return index
+
+    def add_namespaced(self, namespace: str, randomizer: str, preset_name: str) -> None:
+        self._namespaced.setdefault(randomizer, {}).setdefault(namespace, PresetNameIndex()).add(preset_name)
+        self._record(self.add_namespaced, namespace, randomizer, preset_name)
+
+    def remove_namespaced(self, namespace: str, randomizer: str, preset_name: str) -> None:
+        index = self._namespaced.get(randomizer, {}).get(namespace)
+        if index is not None:
+            index.remove(preset_name)
+        self._record(self.remove_namespaced, namespace, randomizer, preset_name)
+
+    def add_user_namespace(self, discord_user_id: int, namespace: str) -> None:
+        self._user_namespaces.setdefault(discord_user_id, set()).add(namespace)
+        self._record(self.add_user_namespace, discord_user_id, namespace)
+
+    def _record(self, change: Callable, *args) -> None:
+        if self._changes is not None:
+            self._changes.append(functools.partial(change, *args))
+
+    async def refresh(self) -> None:
+        namespaced: Dict[str, Dict[str, PresetNameIndex]] = {}
+        user_namespaces: Dict[int, Set[str]] = {}
+
+        self._changes = []
+        try:
+            # names only, the preset content is never needed here
+            owners = await models.PresetNamespaces.all().values_list('discord_user_id', 'name')
+            collaborators = await models.PresetNamespaceCollaborators.all().values_list(
+                'discord_user_id', 'namespace__name')
+            presets = await models.Presets.all().values_list('randomizer', 'namespace__name', 'preset_name')
+
+            for discord_user_id, namespace in [*owners, *collaborators]:
+                user_namespaces.setdefault(discord_user_id, set()).add(namespace)
+            for randomizer, namespace, preset_name in presets:
+                namespaced.setdefault(randomizer, {}).setdefault(namespace, PresetNameIndex()).add(preset_name)
+
+            self._namespaced = namespaced
+            self._user_namespaces = user_namespaces
+            changes = self._changes
+        finally:
+            self._changes = None
+
+        for change in changes:
+            change()
+        self._loaded_at = time.monotonic()
+
+    async def _refresh_quietly(self):
+        try:
+            await self.refresh()
+        except Exception:
+            logging.exception("Unable to refresh the namespaced preset autocomplete index.")
+
+    def _schedule_refresh(self) -> None:
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+            return
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_quietly())
+
+    def search(self, global_index: PresetNameIndex, randomizer: str, query: str, discord_user_id: int = None,
+               limit: int = AUTOCOMPLETE_LIMIT) -> List[str]:
+        """
+        Search global presets, plus the presets in namespaces the user can write to.  A query containing a slash,
+        such as "synack/cas", searches that namespace instead.  Never waits on the database; namespaced results are
+        served from whatever was last loaded.
+        """
+        self._schedule_refresh()
+        namespaced = self._namespaced.get(randomizer, {})
+
+        if '/' in query:
+            namespace, _, preset_query = query.lower().partition('/')
+            index = namespaced.get(namespace)
+            if index is None:
+                return []
+            return [f"{namespace}/{name}" for name in index.search(preset_query, limit)]
+
+        results = global_index.ranked(query)
+        for namespace in sorted(self._user_namespaces.get(discord_user_id, ())):
+            index = namespaced.get(namespace)
+            if index is None:
+                continue
+            results.extend((rank, score, f"{namespace}/{name}") for rank, score, name in index.ranked(query))
+
+        results.sort()
+        return [name for _, _, name in results[:limit]]
+
+
+preset_autocomplete = PresetAutocomplete()
@@ -0,0 +1,198 @@
+import asyncio
+import copy
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+PRESET_ROOT = "presets"
+REFRESH_INTERVAL = 60
+
+
+@dataclass
+class RegisteredPreset:
+    name: str
+    path: str
+    mtime: float
+    raw: str
+    data: dict
+
+
+def _read_preset_file(path: str, name: str) -> RegisteredPreset:
+    mtime = os.stat(path).st_mtime
+    with open(path, encoding='utf-8') as f:
+        raw = f.read()
+    return RegisteredPreset(name=name, path=path, mtime=mtime, raw=raw, data=yaml.safe_load(raw))
+
+
+class PresetRegistry():
+    """
+    In-memory copy of the global presets on disk.
+
+    Each directory (e.g. presets/alttpr) is parsed once, then rescanned at most every REFRESH_INTERVAL seconds in a
+    worker thread, where only files with a changed mtime are parsed again.  Callers always receive a deep copy of the
+    preset data, as the generators modify it in place.
+    """
+
+    def __init__(self, root: str = PRESET_ROOT, refresh_interval: int = REFRESH_INTERVAL):
+        self.root = root
+        self.refresh_interval = refresh_interval
+        self._directories: Dict[str, Dict[str, RegisteredPreset]] = {}
+        self._scanned_at: Dict[str, float] = {}
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+
+    def _scan_directory(self, path: str) -> Dict[str, RegisteredPreset]:
+        current = self._directories.get(path, {})
+        scanned = {}
+        try:
+            filenames = os.listdir(path)
+        except FileNotFoundError:
+            return scanned
+
+        for filename in filenames:
+            if not filename.endswith(".yaml"):
+                continue
+            name = os.path.splitext(filename)[0]
+            filepath = os.path.join(path, filename)
+            existing = current.get(name)
+            try:
+                if existing is not None and existing.mtime == os.stat(filepath).st_mtime:
+                    scanned[name] = existing
+                    continue
+                scanned[name] = _read_preset_file(filepath, name)
+            except FileNotFoundError:
+                continue
+            except yaml.YAMLError:
+                logging.exception("Unable to parse preset file %s", filepath)
+                if existing is not None:
+                    scanned[name] = existing
+
+        return scanned
+
+    def load(self) -> None:
+        """
+        Synchronously parse every preset directory under the root.  Intended to be called once at startup.
+        """
+        if not os.path.isdir(self.root):
+            return
+        for directory in sorted(os.listdir(self.root)):
+            path = os.path.join(self.root, directory)
+            if os.path.isdir(path):
+                self._store(path, self._scan_directory(path))
+
+    def _store(self, path: str, presets: Dict[str, RegisteredPreset]) -> None:
+        self._directories[path] = presets
+        self._scanned_at[path] = time.monotonic()
+
+    async def refresh(self, path: str) -> None:
+        loop = asyncio.get_running_loop()
+        presets = await loop.run_in_executor(None, self._scan_directory, path)
+        self._store(path, presets)
+
+    async def _ensure_loaded(self, path: str) -> None:
+        if path not in self._directories:
+            await self.refresh(path)
+            return
+
+        if time.monotonic() - self._scanned_at[path] < self.refresh_interval:
+            return
+
+        # serve what we have and rescan in the background
+        task = self._refresh_tasks.get(path)
+        if task is None or task.done():
+            self._refresh_tasks[path] = asyncio.create_task(self.refresh(path))
+
+    async def get(self, path: str, name: str) -> Optional[Tuple[str, dict]]:
+        """
+        Returns a tuple of (raw yaml, preset data) for a global preset, or None if it does not exist.
+        The preset data returned is a copy that the caller is free to modify.
+        """
+        await self._ensure_loaded(path)
+        preset = self._directories[path].get(name)
+
+        if preset is None:
+            # the file may have been added since the last scan
+            filepath = os.path.join(path, f"{name}.yaml")
+            loop = asyncio.get_running_loop()
+            try:
+                preset = await loop.run_in_executor(None, _read_preset_file, filepath, name)
+            except FileNotFoundError:
+                return None
+            self._directories[path][name] = preset
+
+        return preset.raw, copy.deepcopy(preset.data)
+
+    async def names(self, path: str) -> List[str]:
+        await self._ensure_loaded(path)
+        return sorted(self._directories[path].keys())
+
+
+preset_registry = PresetRegistry()
+
+
+class NamespacedPresetCache():
+    """
+    Bounded LRU cache of presets stored in the Presets table, keyed by (namespace, randomizer, preset_name).
+
+    Entries are written through by SahasrahBotPresetCore.save() and must be invalidated by anything else that writes
+    to the Presets table.  The list of preset names in each (namespace, randomizer) is cached alongside them.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._presets: OrderedDict[Tuple[str, str, str], Tuple[str, dict]] = OrderedDict()
+        self._listings: OrderedDict[Tuple[str, str], List[str]] = OrderedDict()
+
+    @staticmethod
+    def _key(*parts: str) -> tuple:
+        # lookups are lowercased by SahasrahBotPresetCore, but names in the table may not be
+        return tuple(part.lower() for part in parts)
+
+    def _evict(self, cache: OrderedDict) -> None:
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+    def get(self, namespace: str, randomizer: str, preset_name: str) -> Optional[Tuple[str, dict]]:
+        key = self._key(namespace, randomizer, preset_name)
+        try:
+            raw, data = self._presets[key]
+        except KeyError:
+            return None
+        self._presets.move_to_end(key)
+        return raw, copy.deepcopy(data)
+
+    def set(self, namespace: str, randomizer: str, preset_name: str, raw: str, data: dict) -> None:
+        key = self._key(namespace, randomizer, preset_name)
+        self._presets[key] = (raw, copy.deepcopy(data))
+        self._presets.move_to_end(key)
+        self._evict(self._presets)
+
+    def get_listing(self, namespace: str, randomizer: str) -> Optional[List[str]]:
+        key = self._key(namespace, randomizer)
+        try:
+            names = self._listings[key]
+        except KeyError:
+            return None
+        self._listings.move_to_end(key)
+        return list(names)
+
+    def set_listing(self, namespace: str, randomizer: str, names: List[str]) -> None:
+        key = self._key(namespace, randomizer)
+        self._listings[key] = list(names)
+        self._listings.move_to_end(key)
+        self._evict(self._listings)
+
+    def invalidate(self, namespace: str, randomizer: str, preset_name: str = None) -> None:
+        """
+        Drop a single preset, along with the namespace listing it belongs to.
+        """
+        if preset_name is not None:
+            self._presets.pop(self._key(namespace, randomizer, preset_name), None)
+        self._listings.pop(self._key(namespace, randomizer), None)
+
+
+namespaced_preset_cache = NamespacedPresetCache()
@@ -1,19 +1,19 @@
 import asyncio
-import gzip
-import json
-import logging
+import contextlib
+import copy
 import os
 import random
-import re
 import string
-import tempfile
 import sys
 
-import aioboto3
-import aiofiles
 from tenacity import RetryError, AsyncRetrying, stop_after_attempt, retry_if_exception_type
 
 import config
+from alttprbot.alttprgen.ext.door_spoiler import DoorSpoiler, DoorSpoilerParser
+from alttprbot.alttprgen.hedging import hedger
+from alttprbot.alttprgen.randomizer.alttprdoor_pool import DoorWorkerJobFailed, get_door_worker_pool
+from alttprbot.util import rom, storage
+from alttprbot.util.streaming import byte_slices, gzip_chunks, stream_in_executor
 
 
 class AlttprDoor():
@@ -27,108 +27,87 @@ class AlttprDoor():
         self.patch_name = None
         self.rom_name = None
         self.spoiler_name = None
+        # the raw spoiler text, only kept until it has been uploaded and parsed into self.spoiler
         self.spoilerfile = None
+        self.spoiler: DoorSpoiler = None
 
     async def generate_game(self):
-        with tempfile.TemporaryDirectory() as tmp:
-            settings_file_path = os.path.join(tmp, "settings.json")
-            self.hash = ''.join(random.choices(string.ascii_letters + string.digits, k=12))
-
-            self.settings['outputpath'] = tmp
-            self.settings['outputname'] = self.hash
-            self.settings['create_rom'] = True
-            self.settings['create_spoiler'] = True
-            self.settings['calc_playthrough'] = False
-            self.settings['rom'] = config.ALTTP_ROM
-            if not self.branch == "volatile":
-                self.settings['enemizercli'] = os.path.join(
-                    os.getcwd(),
-                    "utils",
-                    "enemizer",
-                    'osx.10.12-x64' if sys.platform == 'darwin' else 'ubuntu.16.04-x64',
-                    'EnemizerCLI.Core'
-                )
-
-            # set some defaults we do NOT want to change ever
-            self.settings['count'] = 1
-            self.settings['multi'] = 1
-            self.settings['names'] = ""
-            self.settings['race'] = not self.spoilers
-
-            with open(settings_file_path, "w") as f:
-                json.dump(self.settings, f)
-
-            attempts = 0
+        self.settings['create_rom'] = True
+        self.settings['create_spoiler'] = True
+        self.settings['calc_playthrough'] = False
+        self.settings['rom'] = config.ALTTP_ROM
+        if not self.branch == "volatile":
+            self.settings['enemizercli'] = os.path.join(
+                os.getcwd(),
+                "utils",
+                "enemizer",
+                'osx.10.12-x64' if sys.platform == 'darwin' else 'ubuntu.16.04-x64',
+                'EnemizerCLI.Core'
+            )
+
+        # set some defaults we do NOT want to change ever
+        self.settings['count'] = 1
+        self.settings['multi'] = 1
+        self.settings['names'] = ""
+        self.settings['race'] = not self.spoilers
+
+        pool = get_door_worker_pool(self.door_rando_location)
+
+        async def run_job():
+            # every attempt, hedged or not, gets its own copy of the settings and its own output name
+            settings = copy.deepcopy(self.settings)
+            settings['outputname'] = ''.join(random.choices(string.ascii_letters + string.digits, k=12))
+            return settings, await pool.run(settings)
+
+        attempts = 0
+        try:
+            async for attempt in AsyncRetrying(stop=stop_after_attempt(4),
+                                               retry=retry_if_exception_type(DoorWorkerJobFailed)):
+                with attempt:
+                    attempts += 1
+                    settings, output = await hedger.run('alttprdoor', run_job, failures=(DoorWorkerJobFailed,))
+        except RetryError as e:
+            raise e.last_attempt._exception from e
+
+        self.attempts = attempts
+        self.settings = settings
+        self.hash = settings['outputname']
+
+        self.patch_name = "DR_" + self.settings['outputname'] + ".bps"
+        self.rom_name = "DR_" + self.settings['outputname'] + ".sfc"
+        self.spoiler_name = "DR_" + self.settings['outputname'] + "_Spoiler.txt"
+
+        patchfile = await rom.create_bps_patch_async(config.ALTTP_ROM, output['rom'])
+        self.spoilerfile = output['spoiler']
+
+        # the spoiler is parsed a slice at a time on its way into the compressor, in the same executor thread
+        parser = DoorSpoilerParser()
+        spoiler_chunks = stream_in_executor(lambda: gzip_chunks(parser.tee(byte_slices(self.spoilerfile))),
+                                            metric='alttprdoor.spoiler_compress')
+        async with contextlib.aclosing(spoiler_chunks):
+            tasks = [
+                asyncio.ensure_future(storage.get_storage().put(config.SAHASRAHBOT_BUCKET, storage.StorageObject(
+                    key=f"patch/{self.patch_name}",
+                    body=patchfile,
+                    public=True
+                ))),
+                asyncio.ensure_future(storage.get_storage().put_stream(config.SAHASRAHBOT_BUCKET, storage.StorageObject(
+                    key=f"spoiler/{self.spoiler_name}",
+                    public=self.spoilers,
+                    content_encoding='gzip',
+                    content_disposition='attachment'
+                ), spoiler_chunks)),
+            ]
             try:
-                async for attempt in AsyncRetrying(stop=stop_after_attempt(4),
-                                                   retry=retry_if_exception_type(Exception)):
-                    with attempt:
-                        attempts += 1
-                        proc = await asyncio.create_subprocess_exec(
-                            'python3',
-                            'DungeonRandomizer.py',
-                            '--settingsfile', settings_file_path,
-                            stdout=asyncio.subprocess.PIPE,
-                            stderr=asyncio.subprocess.PIPE,
-                            cwd=self.door_rando_location)
-
-                        stdout, stderr = await proc.communicate()
-                        logging.info(stdout.decode())
-                        if proc.returncode > 0:
-                            raise Exception(f'Exception while generating game: {stderr.decode()}')
-
-            except RetryError as e:
-                raise e.last_attempt._exception from e
-
-            self.attempts = attempts
-
-            self.patch_name = "DR_" + self.settings['outputname'] + ".bps"
-            self.rom_name = "DR_" + self.settings['outputname'] + ".sfc"
-            self.spoiler_name = "DR_" + self.settings['outputname'] + "_Spoiler.txt"
-
-            rom_path = os.path.join(tmp, self.rom_name)
-            patch_path = os.path.join(tmp, self.patch_name)
-            spoiler_path = os.path.join(tmp, self.spoiler_name)
-
-            proc = await asyncio.create_subprocess_exec(
-                os.path.join('utils', 'macos' if sys.platform == 'darwin' else 'linux', 'flips'),
-                '--create',
-                '--bps-delta',
-                config.ALTTP_ROM,
-                rom_path,
-                patch_path,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE)
-
-            stdout, stderr = await proc.communicate()
-            logging.info(stdout.decode())
-            if proc.returncode > 0:
-                raise Exception(f'Exception while while creating patch: {stderr.decode()}')
-
-            async with aiofiles.open(patch_path, "rb") as f:
-                patchfile = await f.read()
-
-            session = aioboto3.Session()
-            async with session.client('s3') as s3:
-                await s3.put_object(
-                    Bucket=config.SAHASRAHBOT_BUCKET,
-                    Key=f"patch/{self.patch_name}",
-                    Body=patchfile,
-                    ACL='public-read'
-                )
-
-            async with aiofiles.open(spoiler_path, "rb") as f:
-                self.spoilerfile = await f.read()
-
-            async with session.client('s3') as s3:
-                await s3.put_object(
-                    Bucket=config.SAHASRAHBOT_BUCKET,
-                    Key=f"spoiler/{self.spoiler_name}",
-                    Body=gzip.compress(self.spoilerfile),
-                    ACL='public-read' if self.spoilers else 'private',
-                    ContentEncoding='gzip',
-                    ContentDisposition='attachment'
-                )
+                await asyncio.gather(*tasks)
+            except BaseException:
+                # the spoiler upload has to stop iterating spoiler_chunks before it can be closed
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        self.spoiler = parser.close()
+        self.spoilerfile = None
 
     @classmethod
     async def create(
@@ -156,8 +135,7 @@ class AlttprDoor():
     # Pull the code from the spoiler file, and translate it to what SahasrahBot expects
     @property
     def code(self):
-        file_select_code = re.search("Hash:*\s(.*,.*,.*,.*,.*)", self.spoilerfile.decode()).groups()[0]
-        code = list(file_select_code.split(', '))
+        code = self.spoiler.hash_code
         code_map = {
             'Bomb': 'Bombs',
             'Powder': 'Magic Powder',
@@ -175,8 +153,7 @@ class AlttprDoor():
 
     @property
     def version(self):
-        return \
-        re.search("ALttP Dungeon Randomizer Version (.*)  -  Seed: ([0-9]*)", self.spoilerfile.decode()).groups()[0]
+        return self.spoiler.version
 
     @property
     def doors(self):
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import os
+import pickle
+import sys
+from typing import Dict, Optional, Set
+
+from alttprbot.exceptions import SahasrahBotException
+
+WORKERS_PER_BRANCH = 2
+MAX_PENDING_JOBS = 10  # jobs waiting for a worker, per branch
+JOB_TIMEOUT = 300  # seconds
+RESPAWN_BACKOFF = 5  # seconds
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alttprdoor_worker.py')
+
+
+class DoorWorkerPoolBusy(SahasrahBotException):
+    pass
+
+
+class DoorWorkerJobFailed(Exception):
+    pass
+
+
+class DoorWorker():
+    """
+    A worker process with the randomizer already imported, waiting for a single job.  The job is sent and the result
+    read over the process's pipes from the event loop.
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+
+    @classmethod
+    async def start(cls, location: str) -> 'DoorWorker':
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, WORKER_SCRIPT, location,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        return cls(process)
+
+    async def run(self, settings: dict, timeout: int) -> Dict[str, bytes]:
+        try:
+            stdout, _ = await asyncio.wait_for(self.process.communicate(pickle.dumps(settings)), timeout)
+        except asyncio.TimeoutError:
+            self.kill()
+            raise DoorWorkerJobFailed(f"Door randomizer job timed out after {timeout} seconds.")
+        except (BrokenPipeError, ConnectionResetError) as e:
+            self.kill()
+            raise DoorWorkerJobFailed("Door randomizer worker exited unexpectedly.") from e
+        except asyncio.CancelledError:
+            self.kill()
+            raise
+
+        if not stdout:
+            raise DoorWorkerJobFailed(f"Door randomizer worker exited with {self.process.returncode}.")
+
+        try:
+            status, result = pickle.loads(stdout)
+        except Exception as e:
+            # a worker killed part way through writing its result leaves truncated output
+            raise DoorWorkerJobFailed(
+                f"Door randomizer worker exited with {self.process.returncode} and returned an unreadable result."
+            ) from e
+        if status != 'ok':
+            raise DoorWorkerJobFailed(f'Exception while generating game: {result}')
+        return result
+
+    def kill(self):
+        if self.process.returncode is None:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+
+
+class DoorWorkerPool():
+    """
+    Keeps processes for one Door Randomizer checkout started ahead of time, each with the randomizer already imported.
+    Every worker runs a single job, so no state carries over between seeds, and a fresh one is started as soon as a
+    worker is taken.
+    """
+
+    def __init__(self, location: str, workers: int = WORKERS_PER_BRANCH, max_pending: int = MAX_PENDING_JOBS,
+                 timeout: int = JOB_TIMEOUT):
+        self.location = location
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = 0
+        self._idle: Optional[asyncio.Queue] = None
+        self._spawning: Set[asyncio.Task] = set()
+
+    def _start(self):
+        self._idle = asyncio.Queue()
+        for _ in range(self.workers):
+            self._respawn()
+
+    def _respawn(self):
+        task = asyncio.create_task(self._spawn())
+        self._spawning.add(task)
+        task.add_done_callback(self._spawning.discard)
+
+    async def _spawn(self):
+        while True:
+            try:
+                worker = await DoorWorker.start(self.location)
+            except Exception:
+                logging.exception("Unable to start a door randomizer worker for %s", self.location)
+                await asyncio.sleep(RESPAWN_BACKOFF)
+                continue
+            self._idle.put_nowait(worker)
+            return
+
+    async def run(self, settings: dict) -> Dict[str, bytes]:
+        """
+        Generate a game from a Door Randomizer settings dict, returning a dict with the "rom" and "spoiler" bytes.
+        """
+        if self._idle is None:
+            self._start()
+
+        if self.pending >= self.max_pending:
+            raise DoorWorkerPoolBusy("The door randomizer is busy right now.  Please try again in a few minutes.")
+
+        self.pending += 1
+        try:
+            worker: DoorWorker = await self._idle.get()
+        finally:
+            self.pending -= 1
+
+        self._respawn()
+        return await worker.run(settings, self.timeout)
+
+    def shutdown(self):
+        if self._idle is None:
+            return
+        for task in self._spawning:
+            task.cancel()
+        while not self._idle.empty():
+            self._idle.get_nowait().kill()
+        self._idle = None
+
+
+_pools: Dict[str, DoorWorkerPool] = {}
+
+
+def get_door_worker_pool(location: str) -> DoorWorkerPool:
+    if location not in _pools:
+        _pools[location] = DoorWorkerPool(location)
+    return _pools[location]
+
+
+def shutdown_door_worker_pools():
+    for pool in _pools.values():
+        pool.shutdown()
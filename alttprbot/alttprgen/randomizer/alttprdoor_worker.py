@@ -0,0 +1,70 @@
+"""
+A single-use Door Randomizer worker, started ahead of time by alttprdoor_pool.
+
+It is run as a script rather than imported, so none of the bot's modules are loaded into it.  It imports the
+randomizer, waits for a pickled settings dict on stdin, runs one job, writes the pickled result to stdout and exits,
+so nothing left over from one seed can affect the next.
+"""
+import importlib
+import json
+import os
+import pickle
+import runpy
+import sys
+import tempfile
+import traceback
+
+# modules imported by DungeonRandomizer.py that are loaded before the job arrives
+PRELOAD_MODULES = ['CLI', 'Main']
+
+
+def run_job(settings: dict) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = {**settings, 'outputpath': tmp}
+        settings_file_path = os.path.join(tmp, "settings.json")
+        with open(settings_file_path, "w") as f:
+            json.dump(settings, f)
+
+        sys.argv = ['DungeonRandomizer.py', '--settingsfile', settings_file_path]
+        try:
+            runpy.run_path('DungeonRandomizer.py', run_name='__main__')
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                raise RuntimeError(f"DungeonRandomizer.py exited with {e.code}") from e
+
+        output = {}
+        for key, suffix in [('rom', '.sfc'), ('spoiler', '_Spoiler.txt')]:
+            with open(os.path.join(tmp, f"DR_{settings['outputname']}{suffix}"), 'rb') as f:
+                output[key] = f.read()
+        return output
+
+
+def main():
+    location = sys.argv[1]
+
+    # the result goes back over the original stdout, anything the randomizer prints goes to stderr instead
+    results = os.fdopen(os.dup(sys.stdout.fileno()), 'wb')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    os.chdir(location)
+    sys.path.insert(0, os.getcwd())
+    for module in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            traceback.print_exc()
+
+    data = sys.stdin.buffer.read()
+    if not data:
+        return
+
+    try:
+        result = ('ok', run_job(pickle.loads(data)))
+    except BaseException:
+        result = ('error', traceback.format_exc())
+    results.write(pickle.dumps(result))
+    results.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,31 @@
-import asyncio
-import aiohttp
+from alttprbot.alttprgen.upstreams import avianart_breaker
+from alttprbot.exceptions import SahasrahBotException
+from alttprbot.util import http
+from alttprbot.util.poller import Poller
+
+AVIANART_BASE_URL = 'https://avianart.games'
+GENERATION_DEADLINE = 120  # seconds
+
+
+class AvianartGenerationFailed(SahasrahBotException):
+    pass
+
+
+async def _check_permlink(hash_id):
+    async with avianart_breaker.guard():
+        async with http.get_session().get(f'{AVIANART_BASE_URL}/api.php?action=permlink&hash={hash_id}') as resp:
+            result = await resp.json()
+
+    status = result['response'].get('status', 'finished')
+    if status == 'failure':
+        raise AvianartGenerationFailed("Failed to generate game: " + result['response'].get('message'))
+    if status == 'finished':
+        return result
+    return None
+
+
+avianart_poller = Poller('avianart', check=_check_permlink, deadline=GENERATION_DEADLINE)
+
 
 class AVIANART():
     def __init__(self, preset=None, race=True):
@@ -11,29 +37,21 @@ class AVIANART():
 
     async def generate_game(self):
         payload = [{"args":{"race": self.race}}]
-        async with aiohttp.ClientSession() as session:
-            async with session.post(f'https://avianart.games/api.php?action=generate&preset={self.preset}', json=payload) as resp:
+        async with avianart_breaker.guard():
+            async with http.get_session().post(
+                    f'{AVIANART_BASE_URL}/api.php?action=generate&preset={self.preset}', json=payload) as resp:
                 result = await resp.json()
 
-            hash_id = result['response']['hash']
-
-            # check until we get an error or it is finished generating
-            attempts = 0
-            while result['response'].get('status', 'finished') != 'finished' and attempts < 24:
-                await asyncio.sleep(5)
-                attempts += 1
-                async with session.get(f'https://avianart.games/api.php?action=permlink&hash={hash_id}') as resp:
-                    result = await resp.json()
-
-                self.status = result['response'].get('status', 'finished')
-
-                if self.status == 'finished':
-                    self.hash_id = hash_id
-                    self.result = result
-                    return hash_id
-                
-                if self.status == 'failure':
-                    raise Exception("Failed to generate game: " + result['response'].get('message'))
+        hash_id = result['response']['hash']
+
+        # wait until we get an error or it is finished generating
+        if result['response'].get('status', 'finished') != 'finished':
+            result = await avianart_poller.wait(hash_id)
+
+        self.status = 'finished'
+        self.hash_id = hash_id
+        self.result = result
+        return hash_id
 
     @classmethod
     async def create(
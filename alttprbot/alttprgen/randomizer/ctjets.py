@@ -1,12 +1,20 @@
 import aiohttp
 from bs4 import BeautifulSoup
 
+from alttprbot.alttprgen.upstreams import ctjot_breaker
+from alttprbot.util import http
+
 
 async def roll_ctjets(settings: dict, version: str = '3_1_0'):
+    async with ctjot_breaker.guard():
+        return await _roll_ctjets(settings, version)
+
+
+async def _roll_ctjets(settings: dict, version: str):
     version = version.replace('.', '_')
     jar = aiohttp.CookieJar()
 
-    async with aiohttp.ClientSession(cookie_jar=jar) as session:
+    async with http.new_session(cookie_jar=jar) as session:
         async with session.get(url=f'https://ctjot.com/{version}/options/') as resp:
             soup = BeautifulSoup(await resp.text(), features="html5lib")
 
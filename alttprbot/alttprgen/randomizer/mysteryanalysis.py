@@ -0,0 +1,152 @@
+import os
+import random
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from alttprbot.alttprgen.randomizer.mysterydoors import AlttprMystery
+from alttprbot.alttprgen.randomizer.mysteryweights import CompiledWeightset
+
+ALTTPR_PRESET_PATH = os.path.join("presets", "alttpr")
+
+# fields reported by default, normalized so door randomizer and alttpr.com settings can be compared
+SUMMARY_FIELDS = ['preset', 'doors', 'customizer', 'mode', 'weapons', 'goal', 'entrances', 'door_shuffle',
+                  'keysanity', 'item_pool', 'crystals_tower', 'crystals_ganon', 'boss_shuffle', 'hints']
+
+DOORS_GOALS = {'crystals': 'fast_ganon', 'triforcehunt': 'triforce-hunt'}
+DOORS_WEAPONS = {'random': 'randomized'}
+
+Condition = Tuple[str, str]
+
+
+@dataclass
+class MysteryAnalysis:
+    rolls: int
+    marginals: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+    joints: Dict[Tuple[Condition, ...], int] = field(default_factory=Counter)
+    by_subweight: Dict[Tuple[str, ...], Counter] = field(default_factory=lambda: defaultdict(Counter))
+    subweights: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+    warnings: List[str] = field(default_factory=list)
+
+
+def flatten(settings: dict, prefix: str = '') -> dict:
+    flat = {}
+    for key, value in settings.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def summarize(mystery: AlttprMystery) -> dict:
+    """
+    Flatten a rolled game's settings (e.g. "enemizer.boss_shuffle"), and add the normalized SUMMARY_FIELDS.
+    """
+    settings = mystery.settings
+    record = flatten(settings)
+    record['doors'] = mystery.doors
+    record['customizer'] = bool(mystery.customizer)
+
+    if mystery.doors:
+        record['mode'] = 'retro' if settings['retro'] else settings['mode']
+        record['weapons'] = DOORS_WEAPONS.get(settings['swords'], settings['swords'])
+        record['goal'] = DOORS_GOALS.get(settings['goal'], settings['goal'])
+        record['entrances'] = 'none' if settings['shuffle'] == 'vanilla' else settings['shuffle']
+        record['door_shuffle'] = settings['door_shuffle']
+        record['keysanity'] = settings['keysanity']
+        record['item_pool'] = settings['difficulty']
+        record['crystals_tower'] = settings['crystals_gt']
+        record['crystals_ganon'] = settings['crystals_ganon']
+        record['boss_shuffle'] = settings['shufflebosses']
+        record['hints'] = 'on' if settings['hints'] else 'off'
+    else:
+        record['mode'] = settings.get('mode')
+        record['weapons'] = settings.get('weapons')
+        record['goal'] = settings.get('goal')
+        record['entrances'] = settings.get('entrances')
+        record['door_shuffle'] = 'vanilla'
+        record['keysanity'] = settings.get('dungeon_items') == 'full'
+        record['item_pool'] = settings.get('item', {}).get('pool')
+        record['crystals_tower'] = settings.get('crystals', {}).get('tower')
+        record['crystals_ganon'] = settings.get('crystals', {}).get('ganon')
+        record['boss_shuffle'] = settings.get('enemizer', {}).get('boss_shuffle')
+        record['hints'] = settings.get('hints')
+    return record
+
+
+def parse_condition(text: str) -> Tuple[Condition, ...]:
+    """
+    Parse a joint query such as "weapons=swordless,keysanity=true,mode=inverted".
+    """
+    conditions = []
+    for part in text.split(','):
+        key, _, value = part.partition('=')
+        conditions.append((key.strip(), value.strip()))
+    return tuple(conditions)
+
+
+def _matches(record: dict, conditions: Tuple[Condition, ...]) -> bool:
+    return all(str(record.get(key)).lower() == value.lower() for key, value in conditions)
+
+
+def analyze(weights: dict, rolls: int = 100000, joints: List[Tuple[Condition, ...]] = None,
+            fields: List[str] = None, by_subweight: str = 'door_shuffle', rng=random) -> MysteryAnalysis:
+    """
+    Roll a weightset offline and tally what comes out.  Nothing is sent to a randomizer, and "preset"-style
+    weights only tally which preset would have been used.
+    """
+    joints = joints or []
+    fields = fields or SUMMARY_FIELDS
+    compiled = CompiledWeightset(weights)
+    analysis = MysteryAnalysis(rolls=rolls)
+
+    preset_weights = weights.get('preset')
+    for _ in range(rolls):
+        record = {}
+        if preset_weights is not None:
+            record['preset'] = compiled.choose(preset_weights, rng)
+
+        if record.get('preset', 'none') == 'none':
+            try:
+                mystery = compiled.roll(rng=rng)
+            except Exception as e:
+                analysis.errors[f"{type(e).__name__}: {e}"] += 1
+                continue
+            record.update(summarize(mystery))
+            analysis.subweights[mystery.subweights] += 1
+            analysis.by_subweight[mystery.subweights][record.get(by_subweight)] += 1
+
+        for name in fields:
+            if name in record:
+                analysis.marginals[name][record[name]] += 1
+        for conditions in joints:
+            if _matches(record, conditions):
+                analysis.joints[conditions] += 1
+
+    analysis.warnings = check_weightset(weights, compiled, analysis)
+    return analysis
+
+
+def check_weightset(weights: dict, compiled: CompiledWeightset, analysis: MysteryAnalysis) -> List[str]:
+    warnings = []
+
+    if analysis.errors:
+        warnings.append(f"{sum(analysis.errors.values())} of {analysis.rolls} rolls failed.")
+
+    # subweights that can never be rolled, or were never rolled
+    def walk(node: CompiledWeightset):
+        for name, child in node.children.items():
+            if analysis.subweights and not any(path[:len(child.path)] == child.path for path in analysis.subweights):
+                warnings.append(f"Subweight {'/'.join(str(p) for p in child.path)} was never rolled.")
+            walk(child)
+    walk(compiled)
+
+    for name in (weights.get('preset') or {}):
+        if name == 'none' or '/' in str(name):
+            continue
+        if not os.path.exists(os.path.join(ALTTPR_PRESET_PATH, f"{name}.yaml")):
+            warnings.append(f"Preset {name} does not exist in {ALTTPR_PRESET_PATH}.")
+
+    return warnings
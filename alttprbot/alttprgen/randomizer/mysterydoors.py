@@ -1,11 +1,12 @@
 import copy
 import logging
 from dataclasses import dataclass
-from typing import Union
+from typing import Tuple, Union
 import random
 
-from pyz3r.mystery import get_random_option, generate_random_settings
+from pyz3r.mystery import get_random_option
 
+from alttprbot.alttprgen.randomizer.pyz3r_mystery import generate_alttpr_settings
 from alttprbot_discord.util.alttpr_discord import ALTTPRDiscord
 from alttprbot_discord.util.alttprdoors_discord import AlttprDoorDiscord
 
@@ -19,6 +20,7 @@ class AlttprMystery:
     custom_instructions: str = None
     seed: Union[AlttprDoorDiscord, ALTTPRDiscord] = None
     branch: str = None
+    subweights: Tuple[str, ...] = ()
 
 
 BASE_DOORS_PAYLOAD = {
@@ -73,66 +75,66 @@ BASE_DOORS_PAYLOAD = {
 }
 
 
-def generate_doors_settings(weights, options):
+def generate_doors_settings(weights, options, choose=get_random_option, rng=random):
     branch = weights.get('options', {}).get('branch', 'stable')
 
-    options["glitches"] = get_random_option(weights['glitches_required'])
-    options["dungeon_items"] = get_random_option(weights['dungeon_items'])
-    options["accessibility"] = get_random_option(weights['accessibility'])
-    options["goals"] = get_random_option(weights['goals'])
-    options["ganon_open"] = get_random_option(weights['ganon_open'])
-    options["tower_open"] = get_random_option(weights['tower_open'])
-    options["world_state"] = get_random_option(weights['world_state'])
-    options["hints"] = get_random_option(weights['hints'])
-    options["weapons"] = get_random_option(weights['weapons'])
-    options["item_pool"] = get_random_option(weights['item_pool'])
-    options["item_functionality"] = get_random_option(weights['item_functionality'])
-    options["boss_shuffle"] = get_random_option(weights['boss_shuffle'])
-    options["enemy_shuffle"] = get_random_option(weights['enemy_shuffle'])
-    options["enemy_damage"] = get_random_option(weights['enemy_damage'])
-    options["enemy_health"] = get_random_option(weights['enemy_health'])
-    options["pot_shuffle"] = get_random_option(weights.get('pot_shuffle', 'off'))
-    options['algorithm'] = get_random_option(weights.get('algorithm', 'balanced'))
-    options['entrance_shuffle'] = get_random_option(weights['entrance_shuffle'])
-    options['colorizepots'] = get_random_option(weights.get('colorizepots', False))
-
-    options["mapshuffle"] = get_random_option(weights.get('mapshuffle', False))
-    options["compassshuffle"] = get_random_option(weights.get('compassshuffle', False))
-    options["keyshuffle"] = get_random_option(weights.get('keyshuffle', False))
-    options["bigkeyshuffle"] = get_random_option(weights.get('bigkeyshuffle', False))
-
-    options["timer"] = get_random_option(weights.get('timer', 'none'))
-    options["experimental"] = get_random_option(weights.get('experimental', False))
-    options["dungeon_counters"] = get_random_option(weights.get('dungeon_counters', 'default'))
-    options["triforce_pool"] = get_random_option(weights.get('triforce_pool', 0))
-    options["triforce_goal"] = get_random_option(weights.get('triforce_goal', 0))
-    options["restrict_boss_items"] = get_random_option(weights.get('restrict_boss_items', 'none'))
-    options["shufflelinks"] = get_random_option(weights.get('shufflelinks', False))
-    options["overworld_map"] = get_random_option(weights.get('overworld_map', 'default'))
-    options["pseudoboots"] = get_random_option(weights.get('pseudoboots', False))
-
-    options['intensity'] = get_random_option(weights.get('intensity', 2))
-    options['beemizer'] = get_random_option(weights.get('beemizer', 0))
+    options["glitches"] = choose(weights['glitches_required'])
+    options["dungeon_items"] = choose(weights['dungeon_items'])
+    options["accessibility"] = choose(weights['accessibility'])
+    options["goals"] = choose(weights['goals'])
+    options["ganon_open"] = choose(weights['ganon_open'])
+    options["tower_open"] = choose(weights['tower_open'])
+    options["world_state"] = choose(weights['world_state'])
+    options["hints"] = choose(weights['hints'])
+    options["weapons"] = choose(weights['weapons'])
+    options["item_pool"] = choose(weights['item_pool'])
+    options["item_functionality"] = choose(weights['item_functionality'])
+    options["boss_shuffle"] = choose(weights['boss_shuffle'])
+    options["enemy_shuffle"] = choose(weights['enemy_shuffle'])
+    options["enemy_damage"] = choose(weights['enemy_damage'])
+    options["enemy_health"] = choose(weights['enemy_health'])
+    options["pot_shuffle"] = choose(weights.get('pot_shuffle', 'off'))
+    options['algorithm'] = choose(weights.get('algorithm', 'balanced'))
+    options['entrance_shuffle'] = choose(weights['entrance_shuffle'])
+    options['colorizepots'] = choose(weights.get('colorizepots', False))
+
+    options["mapshuffle"] = choose(weights.get('mapshuffle', False))
+    options["compassshuffle"] = choose(weights.get('compassshuffle', False))
+    options["keyshuffle"] = choose(weights.get('keyshuffle', False))
+    options["bigkeyshuffle"] = choose(weights.get('bigkeyshuffle', False))
+
+    options["timer"] = choose(weights.get('timer', 'none'))
+    options["experimental"] = choose(weights.get('experimental', False))
+    options["dungeon_counters"] = choose(weights.get('dungeon_counters', 'default'))
+    options["triforce_pool"] = choose(weights.get('triforce_pool', 0))
+    options["triforce_goal"] = choose(weights.get('triforce_goal', 0))
+    options["restrict_boss_items"] = choose(weights.get('restrict_boss_items', 'none'))
+    options["shufflelinks"] = choose(weights.get('shufflelinks', False))
+    options["overworld_map"] = choose(weights.get('overworld_map', 'default'))
+    options["pseudoboots"] = choose(weights.get('pseudoboots', False))
+
+    options['intensity'] = choose(weights.get('intensity', 2))
+    options['beemizer'] = choose(weights.get('beemizer', 0))
 
     # volatile settings
     if branch == "volatile":
-        options["keyshuffle"] = get_random_option(weights.get('keyshuffle', "none"))
-        options["dropshuffle"] = get_random_option(weights.get('dropshuffle', "none"))
+        options["keyshuffle"] = choose(weights.get('keyshuffle', "none"))
+        options["dropshuffle"] = choose(weights.get('dropshuffle', "none"))
 
     inventoryweights: dict = weights.get('startinventory', {})
 
-    startinventory_limit = get_random_option(weights.get('startinventorylimit', None))
+    startinventory_limit = choose(weights.get('startinventorylimit', None))
 
     # shuffle order of startinventory
     startitems = []
     for item in inventoryweights:
-        count = get_random_option(weights['startinventory'][item])
+        count = choose(weights['startinventory'][item])
         if count > 0:
             startitems += count * [item]
 
     # if we have a startinventory limit, limit the number of items by random sampling
     if startinventory_limit is not None and len(startitems) > startinventory_limit:
-        startitems = random.sample(startitems, k=startinventory_limit)
+        startitems = rng.sample(startitems, k=startinventory_limit)
 
     options['startinventory'] = ','.join(startitems)
 
@@ -161,7 +163,7 @@ def generate_doors_settings(weights, options):
 
         if match:
             for key, value in actions.items():
-                options[key] = get_random_option(value)
+                options[key] = choose(value)
 
     settings = copy.deepcopy(BASE_DOORS_PAYLOAD)
 
@@ -240,7 +242,8 @@ def generate_doors_settings(weights, options):
     return settings
 
 
-def generate_doors_mystery(weights, tournament=True, spoilers="mystery"):
+def resolve_subweights(weights):
+    # iterate through subweights until fully resolved
     while True:
         subweight_name = get_random_option(
             {k: v['chance'] for (k, v) in weights.get('subweights', {}).items()})
@@ -254,14 +257,25 @@ def generate_doors_mystery(weights, tournament=True, spoilers="mystery"):
         subweights['subweights'] = subweights.get('subweights', {})
         weights = {**weights, **subweights}
 
+    return weights
+
+
+def generate_doors_mystery(weights, tournament=True, spoilers="mystery"):
+    return roll_mystery(resolve_subweights(weights), tournament=tournament, spoilers=spoilers)
+
+
+def roll_mystery(weights, tournament=True, spoilers="mystery", choose=get_random_option, rng=random):
+    """
+    Roll a mystery game from weights that have their subweights resolved.
+    """
     options = {}
-    options['door_shuffle'] = get_random_option(weights.get('door_shuffle', 'vanilla'))
-    options['keydropshuffle'] = get_random_option(weights.get('keydropshuffle', False))
-    options['dropshuffle'] = get_random_option(weights.get('dropshuffle', False))
-    options['pottery'] = get_random_option(weights.get('pottery', 'none'))
-    options['shopsanity'] = get_random_option(weights.get('shopsanity', False))
-    options["collection_rate"] = get_random_option(weights.get('collection_rate', False))
-    options["bombbag"] = get_random_option(weights.get('bombbag', False))
+    options['door_shuffle'] = choose(weights.get('door_shuffle', 'vanilla'))
+    options['keydropshuffle'] = choose(weights.get('keydropshuffle', False))
+    options['dropshuffle'] = choose(weights.get('dropshuffle', False))
+    options['pottery'] = choose(weights.get('pottery', 'none'))
+    options['shopsanity'] = choose(weights.get('shopsanity', False))
+    options["collection_rate"] = choose(weights.get('collection_rate', False))
+    options["bombbag"] = choose(weights.get('bombbag', False))
 
     doors = options['door_shuffle'] != 'vanilla'
     somedropshuffle = options['keydropshuffle'] == 'on' or options['dropshuffle'] == 'on' or options[
@@ -270,17 +284,17 @@ def generate_doors_mystery(weights, tournament=True, spoilers="mystery"):
     collection_rate = options['collection_rate'] == 'on'
     bombbag = options['bombbag'] == 'on'
 
-    custom_instructions = get_random_option(weights.get('custom_instructions', None))
+    custom_instructions = choose(weights.get('custom_instructions', None))
 
     if doors or somedropshuffle or shopsanity or collection_rate or bombbag or weights.get('options', {}).get(
             'force_doors', False):
-        settings = generate_doors_settings(weights, options)
+        settings = generate_doors_settings(weights, options, choose=choose, rng=rng)
         customizer = False
         doors = True
         branch = weights.get('options', {}).get('branch', 'stable')
-        # return settings, False, True
     else:
-        settings, customizer = generate_random_settings(weights, tournament=tournament, spoilers=spoilers)
+        settings, customizer = generate_alttpr_settings(weights, tournament=tournament, spoilers=spoilers,
+                                                        choose=choose, rng=rng)
         doors = False
         branch = None
 
@@ -0,0 +1,128 @@
+import logging
+import math
+import random
+from bisect import bisect
+from collections import OrderedDict
+from functools import partial
+from itertools import accumulate
+from typing import List, Tuple
+
+from pyz3r.mystery import conv
+
+from alttprbot.alttprgen.randomizer import mysterydoors
+
+COMPILED_WEIGHTSET_CACHE_SIZE = 64
+
+
+class CompiledOption():
+    """
+    A weighted option set with its cumulative weights prebuilt.
+
+    Picking consumes the RNG exactly the way random.choices does, so a compiled weightset rolls the same settings as
+    pyz3r.mystery.get_random_option for the same random state.
+    """
+    __slots__ = ('population', 'cum_weights', 'total', 'value')
+
+    def __init__(self, optset):
+        self.population = None
+        self.cum_weights = None
+        self.total = None
+        self.value = None
+
+        if optset is None or optset == {}:
+            return
+
+        if not isinstance(optset, dict):
+            self.value = conv(optset)
+            return
+
+        self.population = [conv(key) for key in optset.keys()]
+        try:
+            self.cum_weights = list(accumulate(optset.values()))
+            self.total = self.cum_weights[-1] + 0.0
+        except TypeError as err:
+            raise TypeError("There is a non-numeric value as a weight.") from err
+        if self.total <= 0.0:
+            raise ValueError('Total of weights must be greater than zero')
+        if not math.isfinite(self.total):
+            raise ValueError('Total of weights must be finite')
+
+    def pick(self, rng=random):
+        if self.cum_weights is None:
+            return self.value
+        return self.population[bisect(self.cum_weights, rng.random() * self.total, 0, len(self.population) - 1)]
+
+
+class CompiledWeightset():
+    """
+    A mystery weightset with every subweight merged ahead of time, and weighted options compiled the first time they
+    are rolled.  The weights must not be modified once compiled.
+    """
+
+    def __init__(self, weights: dict, options: dict = None, path: Tuple[str, ...] = ()):
+        self.weights = weights
+        self.path = path
+        # compiled options, keyed by id() of the option set, shared with every subweight of this weightset
+        self._options = {} if options is None else options
+
+        subweights = weights.get('subweights', {})
+        self.subweight = CompiledOption({k: v['chance'] for (k, v) in subweights.items()})
+        self.children = {}
+        for name in self.subweight.population or []:
+            child = subweights.get(name, {}).get('weights', {})
+            child['subweights'] = child.get('subweights', {})
+            self.children[name] = CompiledWeightset({**weights, **child}, self._options, path + (name,))
+
+    def choose(self, optset, rng=random):
+        if not isinstance(optset, dict):
+            return conv(optset)
+
+        entry = self._options.get(id(optset))
+        if entry is None or entry[0] is not optset:
+            entry = (optset, CompiledOption(optset))
+            self._options[id(optset)] = entry
+        return entry[1].pick(rng)
+
+    def resolve(self, rng=random) -> 'CompiledWeightset':
+        node = self
+        while True:
+            subweight_name = node.subweight.pick(rng)
+
+            logging.info(f"{subweight_name=}")
+
+            if subweight_name is None:
+                return node
+            node = node.children[subweight_name]
+
+    def roll(self, tournament=True, spoilers="mystery", rng=random) -> mysterydoors.AlttprMystery:
+        node = self.resolve(rng)
+        mystery = mysterydoors.roll_mystery(node.weights, tournament=tournament, spoilers=spoilers,
+                                            choose=partial(node.choose, rng=rng), rng=rng)
+        mystery.subweights = node.path
+        return mystery
+
+    def roll_many(self, n: int, tournament=True, spoilers="mystery", rng=random) -> List[mysterydoors.AlttprMystery]:
+        return [self.roll(tournament=tournament, spoilers=spoilers, rng=rng) for _ in range(n)]
+
+
+_compiled: 'OrderedDict[str, CompiledWeightset]' = OrderedDict()
+
+
+def compile_weightset(weights: dict, raw: str = None) -> CompiledWeightset:
+    """
+    Compile a weightset.  Weightsets loaded from a preset are cached by their raw YAML, so an edited preset is
+    recompiled automatically.
+    """
+    if raw is None:
+        return CompiledWeightset(weights)
+
+    compiled = _compiled.get(raw)
+    if compiled is not None:
+        _compiled.move_to_end(raw)
+        return compiled
+
+    compiled = CompiledWeightset(weights)
+    _compiled[raw] = compiled
+    if len(_compiled) > COMPILED_WEIGHTSET_CACHE_SIZE:
+        _compiled.popitem(last=False)
+    return compiled
@@ -1,23 +1,25 @@
-import aiohttp
-
 import config
+from alttprbot.alttprgen.scheduler import Priority, generation_scheduler
+from alttprbot.alttprgen.upstreams import ootr_breaker
+from alttprbot.util import http
 
 OOTR_BASE_URL = 'https://ootrandomizer.com'
 OOTR_API_KEY = config.OOTR_API_KEY
 
 
-async def roll_ootr(settings, version='6.1.0', encrypt=True):
-    async with aiohttp.request(
-            method='post',
-            url=f"{OOTR_BASE_URL}/api/sglive/seed/create",
-            raise_for_status=True,
-            json=settings,
-            params={
-                "key": OOTR_API_KEY,
-                "version": version,
-                "encrypt": str(encrypt).lower()
-            }
-    ) as resp:
-        result = await resp.json()
+async def roll_ootr(settings, version='6.1.0', encrypt=True, priority: Priority = Priority.CASUAL):
+    async with generation_scheduler.slot('ootr', priority), ootr_breaker.guard():
+        async with http.get_session().request(
+                method='post',
+                url=f"{OOTR_BASE_URL}/api/sglive/seed/create",
+                raise_for_status=True,
+                json=settings,
+                params={
+                    "key": OOTR_API_KEY,
+                    "version": version,
+                    "encrypt": str(encrypt).lower()
+                }
+        ) as resp:
+            result = await resp.json()
 
     return result
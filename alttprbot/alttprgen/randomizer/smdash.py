@@ -1,17 +1,23 @@
 import ssl
-import aiohttp
 
+from alttprbot.alttprgen.scheduler import Priority, generation_scheduler
+from alttprbot.alttprgen.upstreams import smdash_breaker
+from alttprbot.util import http
+from alttprbot.util.httpcache import http_cache
 
-async def create_smdash(mode="classic_mm", spoiler=False):
+DASH_PRESETS_MAX_AGE = 60 * 60  # seconds
+
+
+async def create_smdash(mode="classic_mm", spoiler=False, priority: Priority = Priority.CASUAL):
     """
     Generates a DASH Super Metroid Randomizer seed and returns the URL to download it.
     """
-    async with aiohttp.ClientSession() as session:
-        route = f'https://www.dashrando.net/generate/{mode}?race=1'
-        if spoiler:
-            route += '&spoiler=1'
-        async with session.get(route, ssl=ssl.SSLContext(protocol=ssl.PROTOCOL_TLSv1_2),
-                               allow_redirects=False) as resp:
+    route = f'https://www.dashrando.net/generate/{mode}?race=1'
+    if spoiler:
+        route += '&spoiler=1'
+    async with generation_scheduler.slot('smdash', priority), smdash_breaker.guard():
+        async with http.get_session().get(route, ssl=ssl.SSLContext(protocol=ssl.PROTOCOL_TLSv1_2),
+                                          allow_redirects=False) as resp:
             msg = await resp.text()
             if resp.status == 307:
                 return msg
@@ -23,14 +29,11 @@ async def get_smdash_presets():
     Returns the available DASH presets as a list of strings.
     """
     try:
-        async with aiohttp.ClientSession() as session:
-            route = f'https://www.dashrando.net/api/presets'
-            async with session.get(route, ssl=ssl.SSLContext(protocol=ssl.PROTOCOL_TLSv1_2),
-                                allow_redirects=False) as resp:
-                obj = await resp.json()
-                presets = []
-                for p in obj['data']:
-                    presets.append(p['tags'][0])
-                return presets
+        obj = await http_cache.get('https://www.dashrando.net/api/presets', max_age=DASH_PRESETS_MAX_AGE,
+                                   ssl=ssl.SSLContext(protocol=ssl.PROTOCOL_TLSv1_2), allow_redirects=False)
+        presets = []
+        for p in obj['data']:
+            presets.append(p['tags'][0])
+        return presets
     except:
-        return ['classic', 'recall', '2017_mm', 'chozo_bozo', 'sgl23', 'surprise_surprise']
\ No newline at end of file
+        return ['classic', 'recall', '2017_mm', 'chozo_bozo', 'sgl23', 'surprise_surprise']
@@ -0,0 +1,150 @@
+import asyncio
+import contextlib
+import enum
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+# maximum number of seeds being generated at the same time against each backend
+BACKEND_CONCURRENCY = {
+    'alttpr': 4,
+    'alttprdoor': 2,
+    'avianart': 2,
+    'sm': 2,
+    'smz3': 2,
+    'ootr': 2,
+    'smdash': 2,
+    'ctjets': 1,
+}
+DEFAULT_BACKEND_CONCURRENCY = 2
+
+SLOW_WAIT_WARNING = 30  # seconds
+
+
+class Priority(enum.IntEnum):
+    """
+    Lower values are generated first.
+    """
+    TOURNAMENT = 0
+    SPOILER = 1
+    CASUAL = 2
+    BACKGROUND = 3  # seed pool refills
+
+
+@dataclass
+class WaitStats:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def record(self, wait: float):
+        self.count += 1
+        self.total += wait
+        self.max = max(self.max, wait)
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+@dataclass
+class BackendQueue:
+    limit: int
+    active: int = 0
+    waiters: List[Tuple[int, int, asyncio.Future]] = field(default_factory=list)
+    waits: Dict[Priority, WaitStats] = field(default_factory=dict)
+
+
+class GenerationScheduler():
+    """
+    Admission control for seed generation.  Each backend runs at most a fixed number of generations at once, and
+    callers waiting for a backend are let through by priority, then in the order they arrived.
+    """
+
+    def __init__(self, backend_concurrency: Dict[str, int] = None):
+        self.backend_concurrency = BACKEND_CONCURRENCY if backend_concurrency is None else backend_concurrency
+        self.backends: Dict[str, BackendQueue] = {}
+        self._counter = itertools.count()
+
+    def _backend(self, backend: str) -> BackendQueue:
+        if backend not in self.backends:
+            self.backends[backend] = BackendQueue(
+                limit=self.backend_concurrency.get(backend, DEFAULT_BACKEND_CONCURRENCY))
+        return self.backends[backend]
+
+    async def acquire(self, backend: str, priority: Priority = Priority.CASUAL) -> None:
+        queue = self._backend(backend)
+        start = time.monotonic()
+
+        if queue.active >= queue.limit or queue.waiters:
+            future = asyncio.get_running_loop().create_future()
+            entry = (priority, next(self._counter), future)
+            heapq.heappush(queue.waiters, entry)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # we were handed a slot just as we were cancelled, so pass it on
+                    self._release(queue)
+                elif entry in queue.waiters:
+                    queue.waiters.remove(entry)
+                    heapq.heapify(queue.waiters)
+                raise
+        else:
+            queue.active += 1
+
+        wait = time.monotonic() - start
+        queue.waits.setdefault(Priority(priority), WaitStats()).record(wait)
+        if wait > SLOW_WAIT_WARNING:
+            logging.warning("Waited %.1f seconds for a %s generation slot (priority %s).", wait, backend,
+                            Priority(priority).name)
+
+    def release(self, backend: str) -> None:
+        self._release(self._backend(backend))
+
+    def _release(self, queue: BackendQueue) -> None:
+        queue.active -= 1
+        while queue.waiters and queue.active < queue.limit:
+            _, _, future = heapq.heappop(queue.waiters)
+            if not future.done():
+                queue.active += 1
+                future.set_result(None)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, backend: str, priority: Priority = Priority.CASUAL):
+        """
+        Hold a generation slot for the backend while the block runs.
+
+            async with generation_scheduler.slot('alttpr', Priority.TOURNAMENT):
+                seed = await ALTTPRDiscord.generate(...)
+        """
+        await self.acquire(backend, priority)
+        try:
+            yield
+        finally:
+            self.release(backend)
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            backend: {
+                'limit': queue.limit,
+                'active': queue.active,
+                'queued': len(queue.waiters),
+                'queued_by_priority': {
+                    p.name: sum(1 for w in queue.waiters if w[0] == p) for p in Priority
+                },
+                'waits': {
+                    p.name: {
+                        'count': s.count,
+                        'average': round(s.average, 3),
+                        'max': round(s.max, 3),
+                    } for p, s in queue.waits.items()
+                },
+            } for backend, queue in self.backends.items()
+        }
+
+
+generation_scheduler = GenerationScheduler()
@@ -0,0 +1,40 @@
+import json
+
+import config
+from alttprbot.alttprgen.upstreams import alttpr_breaker
+from alttprbot.util.singleflight import SingleFlight
+from alttprbot.util.sizedcache import SizedLRUCache
+from alttprbot_discord.util.alttpr_discord import ALTTPRDiscord
+
+SEED_CACHE_MAX_BYTES = getattr(config, 'SEED_CACHE_MAX_BYTES', 64 * 1024 * 1024)
+
+# retrieved seed payloads, keyed by (randomizer, baseurl, hash), stored as serialized json so that the size budget is
+# exact and callers can't modify the cached copy
+seed_cache = SizedLRUCache(SEED_CACHE_MAX_BYTES)
+
+retrieve_flight = SingleFlight()
+
+
+async def retrieve_alttpr(hash_id: str, baseurl: str = None) -> ALTTPRDiscord:
+    """
+    Retrieve an alttpr.com game by its hash, from the seed cache if it has been retrieved before.
+    """
+    kwargs = {} if baseurl is None else {'baseurl': baseurl}
+    seed = ALTTPRDiscord(**kwargs)
+    key = ('alttpr', seed.baseurl, hash_id)
+
+    payload = seed_cache.get(key)
+    if payload is None:
+        payload = await retrieve_flight.run(key, _retrieve_alttpr, seed, hash_id, key)
+
+    seed.hash = hash_id
+    seed.data = json.loads(payload)
+    return seed
+
+
+async def _retrieve_alttpr(seed: ALTTPRDiscord, hash_id: str, key) -> bytes:
+    async with alttpr_breaker.guard():
+        data = await seed.retrieve_game(hash_id)
+    payload = json.dumps(data, separators=(',', ':')).encode()
+    seed_cache.put(key, payload, len(payload))
+    return payload
@@ -0,0 +1,166 @@
+import asyncio
+import datetime
+import logging
+import random
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+from alttprbot import models
+
+# maximum number of pooled seeds being generated at the same time against each backend
+BACKEND_CONCURRENCY = {
+    'alttpr': 2,
+    'alttprdoor': 1,
+    'avianart': 1,
+}
+DEFAULT_BACKEND_CONCURRENCY = 1
+
+REFILL_JITTER = 5  # seconds
+FAILURE_BACKOFF = 30  # seconds
+DEFAULT_MAX_AGE = datetime.timedelta(days=1)
+
+# a factory returns the generated seed, and the keyword arguments for the AuditGeneratedGames row to create when
+# the seed is handed out
+SeedFactory = Callable[[], Awaitable[Tuple[Any, dict]]]
+
+
+@dataclass
+class PooledSeed:
+    seed: Any
+    audit_data: dict
+    created: datetime.datetime = field(default_factory=datetime.datetime.utcnow)
+
+
+class SeedPool():
+    def __init__(self, key: Hashable, factory: SeedFactory, size: int, backend: str,
+                 max_age: datetime.timedelta = DEFAULT_MAX_AGE):
+        self.key = key
+        self.factory = factory
+        self.size = size
+        self.backend = backend
+        self.max_age = max_age
+        self.seeds: Deque[PooledSeed] = deque()
+        # how many seeds to keep ready.  seeds that expire unused aren't replaced until the pool is used again
+        self.wanted = size
+        self.taken = 0
+        self.misses = 0
+        self.failures = 0
+        self._refill = asyncio.Event()
+
+    def _discard_expired(self):
+        cutoff = datetime.datetime.utcnow() - self.max_age
+        while self.seeds and self.seeds[0].created < cutoff:
+            self.seeds.popleft()
+            self.wanted = max(self.wanted - 1, 0)
+
+    def take(self) -> Optional[PooledSeed]:
+        """
+        Removes and returns the oldest unexpired seed, or None if the pool is empty.
+        This never awaits, so two callers can never be handed the same seed.
+        """
+        self._discard_expired()
+        self.wanted = self.size
+        self._refill.set()
+        if not self.seeds:
+            self.misses += 1
+            return None
+        self.taken += 1
+        return self.seeds.popleft()
+
+    async def run(self, semaphore: asyncio.Semaphore):
+        while True:
+            self._discard_expired()
+            if len(self.seeds) >= self.wanted:
+                self._refill.clear()
+                await self._refill.wait()
+                continue
+
+            # spread out refills so several pools don't hit the same backend at once
+            await asyncio.sleep(random.uniform(0, REFILL_JITTER))
+            async with semaphore:
+                try:
+                    seed, audit_data = await self.factory()
+                except Exception:
+                    self.failures += 1
+                    logging.exception("Unable to generate a seed for pool %s", self.key)
+                    await asyncio.sleep(FAILURE_BACKOFF + random.uniform(0, REFILL_JITTER))
+                    continue
+
+            self.seeds.append(PooledSeed(seed=seed, audit_data=audit_data))
+            logging.info("Added a seed to pool %s (%s/%s)", self.key, len(self.seeds), self.size)
+
+
+class SeedPoolManager():
+    """
+    Keeps a number of pre-rolled, unseen seeds ready for each registered key, so they can be handed out instantly.
+    """
+
+    def __init__(self, backend_concurrency: Dict[str, int] = None):
+        self.backend_concurrency = BACKEND_CONCURRENCY if backend_concurrency is None else backend_concurrency
+        self.pools: Dict[Hashable, SeedPool] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    def register(self, key: Hashable, factory: SeedFactory, size: int = 5, backend: str = 'alttpr',
+                 max_age: datetime.timedelta = DEFAULT_MAX_AGE) -> None:
+        self.pools[key] = SeedPool(key=key, factory=factory, size=size, backend=backend, max_age=max_age)
+
+    def unregister(self, key: Hashable) -> None:
+        """
+        Remove the pool for the key, cancelling its refills and dropping any seeds it was holding.
+        """
+        self.pools.pop(key, None)
+        task = self._tasks.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def _semaphore(self, backend: str) -> asyncio.Semaphore:
+        if backend not in self._semaphores:
+            self._semaphores[backend] = asyncio.Semaphore(
+                self.backend_concurrency.get(backend, DEFAULT_BACKEND_CONCURRENCY))
+        return self._semaphores[backend]
+
+    def start(self) -> None:
+        for key, pool in self.pools.items():
+            if key not in self._tasks or self._tasks[key].done():
+                self._tasks[key] = asyncio.create_task(pool.run(self._semaphore(pool.backend)))
+
+    async def stop(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks = {}
+
+    async def take(self, key: Hashable):
+        """
+        Hand out a pooled seed for the key, recording it in AuditGeneratedGames.
+        Returns None if no pool is registered for the key, or it is currently empty.
+        """
+        pool = self.pools.get(key)
+        if pool is None:
+            return None
+
+        pooled = pool.take()
+        if pooled is None:
+            logging.warning("Seed pool %s is empty, falling back to generating a seed.", key)
+            return None
+
+        await models.AuditGeneratedGames.create(**pooled.audit_data)
+        return pooled.seed
+
+    def stats(self) -> Dict[Hashable, dict]:
+        return {
+            key: {
+                'available': len(pool.seeds),
+                'size': pool.size,
+                'wanted': pool.wanted,
+                'backend': pool.backend,
+                'taken': pool.taken,
+                'misses': pool.misses,
+                'failures': pool.failures,
+            } for key, pool in self.pools.items()
+        }
+
+
+seed_pool_manager = SeedPoolManager()
@@ -1,5 +1,7 @@
 # import pyz3r
 from alttprbot.alttprgen.preset import fetch_preset
+from alttprbot.alttprgen.scheduler import Priority, generation_scheduler
+from alttprbot.alttprgen.upstreams import samus_breaker
 from alttprbot.exceptions import SahasrahBotException
 from alttprbot_discord.util.sm_discord import SMDiscord, SMZ3Discord
 
@@ -8,7 +10,8 @@ class PresetNotFoundException(SahasrahBotException):
     pass
 
 
-async def generate_multiworld(preset, players, tournament=False, randomizer='smz3', seed_number=None):
+async def generate_multiworld(preset, players, tournament=False, randomizer='smz3', seed_number=None,
+                              priority: Priority = Priority.CASUAL):
     preset_dict = await fetch_preset(preset, randomizer=randomizer)
 
     settings = preset_dict['settings']
@@ -24,13 +27,14 @@ async def generate_multiworld(preset, players, tournament=False, randomizer='smz
         settings[f'player-{idx}'] = player
 
     settings['race'] = "true" if tournament else "false"
-    if randomizer == 'sm':
-        seed = await SMDiscord.create(
-            settings=settings,
-        )
-    elif randomizer == 'smz3':
-        seed = await SMZ3Discord.create(
-            settings=settings,
-        )
+    async with generation_scheduler.slot(randomizer, priority), samus_breaker.guard():
+        if randomizer == 'sm':
+            seed = await SMDiscord.create(
+                settings=settings,
+            )
+        elif randomizer == 'smz3':
+            seed = await SMZ3Discord.create(
+                settings=settings,
+            )
 
     return seed
@@ -1,14 +1,14 @@
-import gzip
-import json
+import contextlib
 import random
 import string
 from dataclasses import dataclass
 
-import aioboto3
-
 import config
 from alttprbot.alttprgen.ext.progression_spoiler import create_progression_spoiler
 from alttprbot.alttprgen.generator import ALTTPRPreset, PresetData
+from alttprbot.alttprgen.scheduler import Priority
+from alttprbot.util import storage
+from alttprbot.util.streaming import gzip_chunks, json_pieces, stream_in_executor
 from alttprbot_discord.util.alttpr_discord import ALTTPRDiscord
 
 
@@ -19,7 +19,8 @@ class ALTTPRSpoilerGame:
     seed: ALTTPRDiscord
 
 
-async def generate_spoiler_game(preset, spoiler_type='spoiler', festive=False, branch=None, allow_quickswap=True):
+async def generate_spoiler_game(preset, spoiler_type='spoiler', festive=False, branch=None, allow_quickswap=True,
+                                priority: Priority = Priority.SPOILER):
     preset_data = ALTTPRPreset(preset)
     await preset_data.fetch()
     seed = await preset_data.generate(
@@ -27,7 +28,8 @@ async def generate_spoiler_game(preset, spoiler_type='spoiler', festive=False, b
         tournament=True,
         allow_quickswap=allow_quickswap,
         endpoint_prefix="/festive" if festive else "",
-        branch=branch
+        branch=branch,
+        priority=priority
     )
 
     spoiler_log_url = await write_json_to_disk(seed, spoiler_type)
@@ -41,7 +43,8 @@ async def generate_spoiler_game(preset, spoiler_type='spoiler', festive=False, b
 
 async def generate_spoiler_game_custom(content, spoiler_type='spoiler', branch=None):
     preset_data = await ALTTPRPreset.custom(content)
-    seed = await preset_data.generate(spoilers="generate", tournament=True, allow_quickswap=True, branch=branch)
+    seed = await preset_data.generate(spoilers="generate", tournament=True, allow_quickswap=True, branch=branch,
+                                      priority=Priority.SPOILER)
 
     spoiler_log_url = await write_json_to_disk(seed, spoiler_type)
 
@@ -55,22 +58,20 @@ async def generate_spoiler_game_custom(content, spoiler_type='spoiler', branch=N
 async def write_json_to_disk(seed, spoiler_type='spoiler'):
     filename = f"{spoiler_type}__{seed.hash}__{'-'.join(seed.code).replace(' ', '')}__{''.join(random.choices(string.ascii_letters + string.digits, k=4))}.txt"
 
-    if spoiler_type == 'progression':
-        sorteddict = create_progression_spoiler(seed)
-    else:
-        sorteddict = seed.get_formatted_spoiler(translate_dungeon_items=True)
-
-    payload = gzip.compress(json.dumps(sorteddict, indent=4).encode('utf-8'))
-
-    session = aioboto3.Session()
-    async with session.client('s3') as s3:
-        await s3.put_object(
-            Bucket=config.AWS_SPOILER_BUCKET_NAME,
-            Key=filename,
-            Body=payload,
-            ACL='public-read',
-            ContentEncoding='gzip',
-            ContentDisposition='attachment'
-        )
+    def produce():
+        # building, serializing and compressing a large spoiler takes long enough to stall the event loop
+        if spoiler_type == 'progression':
+            sorteddict = create_progression_spoiler(seed)
+        else:
+            sorteddict = seed.get_formatted_spoiler(translate_dungeon_items=True)
+        yield from gzip_chunks(json_pieces(sorteddict, indent=4))
+
+    async with contextlib.aclosing(stream_in_executor(produce, metric='spoiler.serialize')) as chunks:
+        await storage.get_storage().put_stream(config.AWS_SPOILER_BUCKET_NAME, storage.StorageObject(
+            key=filename,
+            public=True,
+            content_encoding='gzip',
+            content_disposition='attachment'
+        ), chunks)
 
     return f"{config.SPOILERLOGURLBASE}/{filename}"
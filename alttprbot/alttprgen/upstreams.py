@@ -0,0 +1,14 @@
+from pyz3r.exceptions import AlttprFailedToGenerate
+
+from alttprbot.util.circuitbreaker import get_breaker
+
+# circuit breakers for the randomizer websites seeds are generated on
+
+# pyz3r retries internally and raises AlttprFailedToGenerate once it gives up.  a call covers every retry, so
+# a healthy site can still take a couple of minutes, only calls well past that count as slow
+alttpr_breaker = get_breaker('alttpr.com', failures=(AlttprFailedToGenerate,), slow_call_duration=180)
+samus_breaker = get_breaker('samus.link', failures=(AlttprFailedToGenerate,), slow_call_duration=180)
+avianart_breaker = get_breaker('avianart.games')
+ootr_breaker = get_breaker('ootrandomizer.com')
+smdash_breaker = get_breaker('dashrando.net')
+ctjot_breaker = get_breaker('ctjot.com', slow_call_duration=60)
@@ -36,10 +36,10 @@ class AuditMessages(Model):
 
     id = fields.IntField(pk=True)
     guild_id = fields.BigIntField(null=True)
-    message_id = fields.BigIntField(null=True)
+    message_id = fields.BigIntField(null=True, index=True)
     user_id = fields.BigIntField(null=True)
     channel_id = fields.BigIntField(null=True)
-    message_date = fields.DatetimeField(null=True)
+    message_date = fields.DatetimeField(null=True, index=True)
     content = fields.CharField(4000, null=True)
     attachment = fields.CharField(1000, null=True)
     deleted = fields.IntField(default=0)
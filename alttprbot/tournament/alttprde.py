@@ -8,6 +8,7 @@
 
 # from alttprbot import models
 from alttprbot.alttprgen.generator import ALTTPRPreset
+from alttprbot.alttprgen.scheduler import Priority
 from alttprbot.tournament.alttpr import ALTTPRTournamentRace
 from alttprbot.tournament.core import TournamentConfig
 from alttprbot_discord.bot import discordbot
@@ -38,7 +39,8 @@ class ALTTPRDETournament(ALTTPRTournamentRace):
             await self.rtgg_handler.send_message(
                 "Invalid mode chosen, please contact a tournament admin for assistance.")
             raise
-        self.seed = await ALTTPRPreset(preset).generate(hints=False, spoilers="off", allow_quickswap=True)
+        self.seed = await ALTTPRPreset(preset).generate(hints=False, spoilers="off", allow_quickswap=True,
+                                                          priority=Priority.TOURNAMENT)
 
     async def configuration(self):
         guild = discordbot.get_guild(469300113290821632)
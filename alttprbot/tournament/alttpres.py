@@ -3,6 +3,7 @@ import logging
 import discord
 
 from alttprbot import models
+from alttprbot.alttprgen.scheduler import Priority, generation_scheduler
 from alttprbot.alttprgen import preset
 from alttprbot.tournament.alttpr import ALTTPRTournamentRace
 from alttprbot.tournament.core import TournamentConfig
@@ -16,10 +17,11 @@ class ALTTPRESTournament(ALTTPRTournamentRace):
             raise Exception('Missing bracket settings.  Please submit!')
 
         self.preset_dict = None
-        self.seed = await alttpr_discord.ALTTPRDiscord.generate(
-            settings=self.bracket_settings,
-            endpoint='/api/customizer' if 'eq' in self.bracket_settings else '/api/randomizer',
-        )
+        async with generation_scheduler.slot('alttpr', Priority.TOURNAMENT):
+            self.seed = await alttpr_discord.ALTTPRDiscord.generate(
+                settings=self.bracket_settings,
+                endpoint='/api/customizer' if 'eq' in self.bracket_settings else '/api/randomizer',
+            )
 
     async def configuration(self):
         guild = discordbot.get_guild(477850508368019486)
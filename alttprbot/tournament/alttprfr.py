@@ -3,6 +3,7 @@ import logging
 import discord
 
 from alttprbot import models
+from alttprbot.alttprgen.scheduler import Priority, generation_scheduler
 from alttprbot.tournament.alttpr import ALTTPRTournamentRace
 from alttprbot.tournament.core import TournamentConfig
 from alttprbot_discord.bot import discordbot
@@ -15,7 +16,8 @@ class ALTTPRFRTournament(ALTTPRTournamentRace):
             raise Exception('Missing bracket settings.  Please submit!')
 
         self.preset_dict = None
-        self.seed = await alttpr_discord.ALTTPRDiscord.generate(settings=self.bracket_settings)
+        async with generation_scheduler.slot('alttpr', Priority.TOURNAMENT):
+            self.seed = await alttpr_discord.ALTTPRDiscord.generate(settings=self.bracket_settings)
 
     async def configuration(self):
         guild = discordbot.get_guild(470200169841950741)
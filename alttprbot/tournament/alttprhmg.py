@@ -1,4 +1,5 @@
 from alttprbot.alttprgen import generator
+from alttprbot.alttprgen.scheduler import Priority
 from alttprbot.tournament.alttpr import ALTTPRTournamentRace
 from alttprbot.tournament.core import TournamentConfig
 from alttprbot_discord.bot import discordbot
@@ -7,7 +8,8 @@ from alttprbot_discord.bot import discordbot
 class ALTTPRHMGTournament(ALTTPRTournamentRace):
     async def roll(self):
         self.seed = await generator.ALTTPRPreset('hmg').generate(allow_quickswap=True, tournament=True, hints=False,
-                                                                 spoilers="off", branch='tournament')
+                                                                 spoilers="off", branch='tournament',
+                                                                 priority=Priority.TOURNAMENT)
 
     async def configuration(self):
         guild = discordbot.get_guild(535946014037901333)
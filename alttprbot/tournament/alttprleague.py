@@ -5,6 +5,7 @@ import aiohttp
 from alttprbot import models
 from alttprbot.alttprgen import generator
 from alttprbot.alttprgen import spoilers
+from alttprbot.alttprgen.scheduler import Priority
 from alttprbot.tournament.alttpr import ALTTPRTournamentRace
 from alttprbot.tournament.core import TournamentConfig
 from alttprbot_discord.bot import discordbot
@@ -15,13 +16,14 @@ class ALTTPRLeague(ALTTPRTournamentRace):
 
     async def roll(self):
         if self.league_data.get('spoiler', False):
-            spoiler = await spoilers.generate_spoiler_game(self.league_data['preset'])
+            spoiler = await spoilers.generate_spoiler_game(self.league_data['preset'], priority=Priority.TOURNAMENT)
             self.seed = spoiler.seed
             await self.rtgg_handler.schedule_spoiler_race(spoiler.spoiler_log_url, 0)
         else:
             self.seed = await generator.ALTTPRPreset(self.league_data['preset']).generate(allow_quickswap=True,
                                                                                           tournament=True, hints=False,
-                                                                                          spoilers="off")
+                                                                                          spoilers="off",
+                                                                                          priority=Priority.TOURNAMENT)
 
         await self.create_embeds()
 
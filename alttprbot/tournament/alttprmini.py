@@ -1,4 +1,5 @@
 from alttprbot.alttprgen.generator import ALTTPRPreset
+from alttprbot.alttprgen.scheduler import Priority
 from alttprbot.tournament.alttpr import ALTTPRTournamentRace
 from alttprbot.tournament.core import TournamentConfig
 from alttprbot_discord.bot import discordbot
@@ -22,7 +23,8 @@ class ALTTPRMiniTournament(ALTTPRTournamentRace):
             await self.rtgg_handler.send_message(
                 "Invalid mode chosen, please contact a tournament admin for assistance.")
             raise
-        self.seed = await ALTTPRPreset(preset).generate(hints=False, spoilers="off", allow_quickswap=True)
+        self.seed = await ALTTPRPreset(preset).generate(hints=False, spoilers="off", allow_quickswap=True,
+                                                          priority=Priority.TOURNAMENT)
 
     async def configuration(self):
         guild = discordbot.get_guild(469300113290821632)
@@ -1,5 +1,6 @@
 from alttprbot import models
 from alttprbot.alttprgen import spoilers
+from alttprbot.alttprgen.scheduler import Priority
 from alttprbot.tournament.alttpr import ALTTPRTournamentRace
 from alttprbot.tournament.core import TournamentConfig
 from alttprbot_discord.bot import discordbot
@@ -11,7 +12,7 @@ class ALTTPRSGLive(ALTTPRTournamentRace):
     settings_data: models.TournamentGames = None
 
     async def roll(self):
-        spoiler = await spoilers.generate_spoiler_game('open')
+        spoiler = await spoilers.generate_spoiler_game('open', priority=Priority.TOURNAMENT)
         self.seed = spoiler.seed
         await self.rtgg_handler.schedule_spoiler_race(spoiler.spoiler_log_url, 900)
 
@@ -1,4 +1,5 @@
 from alttprbot.alttprgen import generator
+from alttprbot.alttprgen.scheduler import Priority
 from alttprbot.tournament.alttpr import ALTTPRTournamentRace
 from alttprbot.tournament.core import TournamentConfig
 from alttprbot_discord.bot import discordbot
@@ -6,7 +7,8 @@ from alttprbot_discord.bot import discordbot
 
 class ALTTPRCASBootsTournamentRace(ALTTPRTournamentRace):
     async def roll(self):
-        self.seed = await generator.ALTTPRPreset('casualboots').generate(allow_quickswap=True)
+        self.seed = await generator.ALTTPRPreset('casualboots').generate(allow_quickswap=True,
+                                                                      priority=Priority.TOURNAMENT)
 
     async def configuration(self):
         guild = discordbot.get_guild(973765801528139837)
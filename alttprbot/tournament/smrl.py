@@ -5,6 +5,7 @@ from racetime_bot import msg_actions
 
 from alttprbot import models
 from alttprbot.alttprgen import smz3multi
+from alttprbot.alttprgen.scheduler import Priority
 from alttprbot.alttprgen.randomizer import smdash
 from alttprbot.tournament.core import TournamentConfig, TournamentRace
 from alttprbot_discord.bot import discordbot
@@ -102,7 +103,8 @@ class SMRandoLeague(TournamentRace):
 
         elif WEEKS[WEEK].get('randomizer') == 'smdash':
             self.seed = await smdash.create_smdash(
-                mode=WEEKS[WEEK].get('preset')
+                mode=WEEKS[WEEK].get('preset'),
+                priority=Priority.TOURNAMENT
             )
             await self.rtgg_handler.send_message(self.seed)
             await self.rtgg_handler.set_bot_raceinfo(self.seed)
@@ -128,6 +130,7 @@ class SMRandoLeague(TournamentRace):
                 randomizer='sm',
                 seed_number=seed_number,
                 players=team,
+                priority=Priority.TOURNAMENT,
             )
             await self.rtgg_handler.send_message(f"{', '.join(team)}: {seed.url}")
             await self.rtgg_handler.send_message("-------------------")
@@ -5,6 +5,7 @@ from racetime_bot import msg_actions
 from werkzeug.datastructures import MultiDict
 
 from alttprbot import models
+from alttprbot.alttprgen.scheduler import Priority
 from alttprbot.alttprgen.randomizer import smdash
 from alttprbot.tournament.core import TournamentConfig, TournamentRace
 from alttprbot_discord.bot import discordbot
@@ -53,7 +54,8 @@ class SMRLPlayoffs(TournamentRace):
 
         elif randomizer == 'smdash':
             self.seed = await smdash.create_smdash(
-                mode=preset
+                mode=preset,
+                priority=Priority.TOURNAMENT
             )
             await self.rtgg_handler.send_message(self.seed)
             await self.rtgg_handler.set_bot_raceinfo(self.seed)
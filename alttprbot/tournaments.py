@@ -13,6 +13,7 @@ import config
 from alttprbot import models
 from alttprbot.tournament import test, boots, dailies, smwde, smrl_playoff, nologic, alttprhmg, alttprleague, alttprmini, alttprde, alttprsglive, alttpr
 from alttprbot.util import gsheet
+from alttprbot.util.circuitbreaker import CircuitOpen, get_breaker
 from alttprbot_racetime import bot as racetimebot
 
 RACETIME_URL = config.RACETIME_URL
@@ -20,6 +21,8 @@ RACETIME_URL = config.RACETIME_URL
 RACETIME_SESSION_TOKEN = config.RACETIME_SESSION_TOKEN
 RACETIME_CSRF_TOKEN = config.RACETIME_CSRF_TOKEN
 
+racetime_breaker = get_breaker('racetime.gg')
+
 if config.DEBUG:
     TOURNAMENT_DATA = {
         'test': test.TestTournament
@@ -66,9 +69,10 @@ async def create_tournament_race_room(event, episodeid):
     rtgg_bot = racetimebot.racetime_bots[event_data.data.racetime_category]
     race = await models.TournamentResults.get_or_none(episode_id=episodeid)
     if race:
-        async with aiohttp.request(method='get', url=rtgg_bot.http_uri(f"/{race.srl_id}/data"),
-                                   raise_for_status=True) as resp:
-            race_data = json.loads(await resp.read())
+        async with racetime_breaker.guard():
+            async with aiohttp.request(method='get', url=rtgg_bot.http_uri(f"/{race.srl_id}/data"),
+                                       raise_for_status=True) as resp:
+                race_data = json.loads(await resp.read())
         status = race_data.get('status', {}).get('value')
         if not status == 'cancelled':
             return
@@ -113,11 +117,12 @@ async def race_recording_task():
         for race in races:
             logging.info(f"Recording {race.episode_id} for {event} to {event_data.data.gsheet_id}")
             try:
-                async with aiohttp.request(
-                        method='get',
-                        url=f"{RACETIME_URL}/{race.srl_id}/data",
-                        raise_for_status=True) as resp:
-                    race_data = json.loads(await resp.read())
+                async with racetime_breaker.guard():
+                    async with aiohttp.request(
+                            method='get',
+                            url=f"{RACETIME_URL}/{race.srl_id}/data",
+                            raise_for_status=True) as resp:
+                        race_data = json.loads(await resp.read())
 
                 if race_data['status']['value'] == 'finished':
                     winner = [e for e in race_data['entrants'] if e['place'] == 1][
@@ -156,6 +161,9 @@ async def race_recording_task():
                     await race.delete()
                 else:
                     continue
+            except CircuitOpen as e:
+                logging.warning("Skipping race recording for %s until the next run. %s", event, e)
+                break
             except Exception as e:
                 logging.exception("Encountered a problem when attempting to record a race.")
 
@@ -0,0 +1,219 @@
+import asyncio
+import contextlib
+import enum
+import logging
+import math
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple, Type
+
+import aiohttp
+
+from alttprbot.exceptions import SahasrahBotException
+
+WINDOW_SIZE = 20  # recent calls remembered per upstream
+MIN_CALLS = 5  # calls needed before the breaker will open
+FAILURE_RATE_THRESHOLD = 0.5
+SLOW_CALL_DURATION = 30  # seconds
+SLOW_CALL_RATE_THRESHOLD = 0.8
+OPEN_DURATION = 30  # seconds
+MAX_OPEN_DURATION = 600  # seconds
+HALF_OPEN_PROBES = 1
+
+
+class BreakerState(enum.Enum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+
+class CircuitOpen(SahasrahBotException):
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(
+            f"{name} appears to be having problems right now, so the request was not sent.  "
+            f"Please try again in {math.ceil(retry_after)} seconds."
+        )
+
+
+def is_upstream_failure(e: BaseException) -> bool:
+    """
+    Errors that mean the upstream itself is unhealthy, as opposed to it rejecting a bad request.
+    """
+    if isinstance(e, aiohttp.ClientResponseError):
+        return e.status >= 500 or e.status == 429
+    return isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+class CircuitBreaker():
+    """
+    Tracks the health of an upstream API from its recent calls.
+
+    While closed, calls go through as normal.  Once enough of the recent calls have failed or been slow, the breaker
+    opens and calls fail immediately with CircuitOpen, instead of each waiting for its own timeout.  After a while a
+    single probe call is let through (half-open); if it succeeds the breaker closes again, otherwise it stays open for
+    longer.
+
+        async with alttpr_breaker.guard():
+            seed = await ALTTPRDiscord.generate(...)
+    """
+
+    def __init__(self, name: str, failures: Tuple[Type[BaseException], ...] = (),
+                 window_size: int = WINDOW_SIZE, min_calls: int = MIN_CALLS,
+                 failure_rate_threshold: float = FAILURE_RATE_THRESHOLD,
+                 slow_call_duration: float = SLOW_CALL_DURATION,
+                 slow_call_rate_threshold: float = SLOW_CALL_RATE_THRESHOLD,
+                 open_duration: float = OPEN_DURATION, max_open_duration: float = MAX_OPEN_DURATION):
+        self.name = name
+        self.failures = failures
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_duration = open_duration
+        self.max_open_duration = max_open_duration
+
+        self.state = BreakerState.CLOSED
+        # (failed, slow) for each recent call
+        self.calls: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self.opened_at: Optional[float] = None
+        self.open_until: float = 0.0
+        self.current_open_duration = open_duration
+        self.probes = 0
+        self.trips = 0
+        self.rejected = 0
+        self.last_failure: Optional[str] = None
+
+    def is_failure(self, e: BaseException) -> bool:
+        return isinstance(e, self.failures) or is_upstream_failure(e)
+
+    @property
+    def failure_rate(self) -> Optional[float]:
+        if len(self.calls) < self.min_calls:
+            return None
+        return sum(1 for failed, _ in self.calls if failed) / len(self.calls)
+
+    @property
+    def slow_call_rate(self) -> Optional[float]:
+        if len(self.calls) < self.min_calls:
+            return None
+        return sum(1 for _, slow in self.calls if slow) / len(self.calls)
+
+    @property
+    def is_open(self) -> bool:
+        """
+        True if a call made now would be rejected.
+        """
+        if self.state == BreakerState.OPEN:
+            return time.monotonic() < self.open_until
+        if self.state == BreakerState.HALF_OPEN:
+            return self.probes >= HALF_OPEN_PROBES
+        return False
+
+    def before_call(self) -> bool:
+        """
+        Raises CircuitOpen if the call should not be made.  Returns True if the call is a half-open probe.
+        """
+        now = time.monotonic()
+        if self.state == BreakerState.OPEN and now >= self.open_until:
+            logging.info("Circuit breaker for %s is half-open, sending a probe.", self.name)
+            self.state = BreakerState.HALF_OPEN
+            self.probes = 0
+
+        if self.state == BreakerState.OPEN or (
+                self.state == BreakerState.HALF_OPEN and self.probes >= HALF_OPEN_PROBES):
+            self.rejected += 1
+            raise CircuitOpen(self.name, max(self.open_until - now, 1))
+
+        if self.state == BreakerState.HALF_OPEN:
+            self.probes += 1
+            return True
+        return False
+
+    def record(self, failed: bool, duration: float, probe: bool = False):
+        slow = duration >= self.slow_call_duration
+
+        if probe:
+            self.probes -= 1
+            if failed or slow:
+                self._open()
+            else:
+                logging.info("Circuit breaker for %s closed.", self.name)
+                self.state = BreakerState.CLOSED
+                self.calls.clear()
+                self.current_open_duration = self.open_duration
+            return
+
+        self.calls.append((failed, slow))
+        if self.state != BreakerState.CLOSED:
+            return
+        if (self.failure_rate or 0) >= self.failure_rate_threshold or \
+                (self.slow_call_rate or 0) >= self.slow_call_rate_threshold:
+            self._open()
+
+    def _open(self):
+        now = time.monotonic()
+        if self.state == BreakerState.HALF_OPEN:
+            # still unhealthy, so back off further before probing again
+            self.current_open_duration = min(self.current_open_duration * 2, self.max_open_duration)
+        else:
+            self.trips += 1
+        logging.warning("Circuit breaker for %s opened for %s seconds (failure rate %s, slow call rate %s).",
+                        self.name, self.current_open_duration, self.failure_rate, self.slow_call_rate)
+        self.state = BreakerState.OPEN
+        self.opened_at = now
+        self.open_until = now + self.current_open_duration
+
+    @contextlib.asynccontextmanager
+    async def guard(self):
+        """
+        Run the block as a call to the upstream, failing immediately with CircuitOpen if the breaker is open.
+        """
+        probe = self.before_call()
+        start = time.monotonic()
+        try:
+            yield
+        except asyncio.CancelledError:
+            if probe:
+                self.probes -= 1
+            raise
+        except BaseException as e:
+            failed = self.is_failure(e)
+            if failed:
+                self.last_failure = f"{type(e).__name__}: {e}"
+            self.record(failed, time.monotonic() - start, probe)
+            raise
+        self.record(False, time.monotonic() - start, probe)
+
+    async def call(self, func: Callable, *args, **kwargs):
+        async with self.guard():
+            return await func(*args, **kwargs)
+
+    def stats(self) -> dict:
+        return {
+            'state': self.state.value,
+            'failure_rate': self.failure_rate,
+            'slow_call_rate': self.slow_call_rate,
+            'calls': len(self.calls),
+            'retry_after': round(max(self.open_until - time.monotonic(), 0), 1) if self.is_open else 0,
+            'trips': self.trips,
+            'rejected': self.rejected,
+            'last_failure': self.last_failure,
+        }
+
+
+breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """
+    Returns the breaker for an upstream, creating it with kwargs the first time it is asked for.
+    """
+    if name not in breakers:
+        breakers[name] = CircuitBreaker(name, **kwargs)
+    return breakers[name]
+
+
+def breaker_stats() -> Dict[str, dict]:
+    return {name: breaker.stats() for name, breaker in breakers.items()}
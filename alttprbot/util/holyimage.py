@@ -1,11 +1,12 @@
-import json
 from urllib.parse import urljoin
 
-import aiohttp
 import discord
 import html2markdown
 
 from alttprbot.exceptions import SahasrahBotException
+from alttprbot.util.httpcache import http_cache
+
+HOLY_IMAGES_URL = 'http://alttp.mymm1.com/holyimage/holyimages.json'
 
 
 async def holy(slug, game='z3r'):
@@ -28,7 +29,7 @@ class HolyImage():
             raise HolyImageNotFound(
                 'You must specify a holy image.  Check out <http://alttp.mymm1.com/holyimage/>')
 
-        images = await get_json('http://alttp.mymm1.com/holyimage/holyimages.json')
+        images = await get_holy_images()
         i = images[self.game]
 
         try:
@@ -70,9 +71,5 @@ class HolyImage():
         return embed
 
 
-async def get_json(url):
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as resp:
-            text = await resp.read()
-
-    return json.loads(text)
+async def get_holy_images() -> dict:
+    return await http_cache.get(HOLY_IMAGES_URL, max_age=5 * 60)
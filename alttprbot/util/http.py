@@ -1,43 +1,96 @@
 import json
+import logging
+from typing import Optional
 
 import aiohttp
 import yaml
 
+# connection pool settings for the process-wide client session
+CONNECTION_LIMIT = 100
+CONNECTION_LIMIT_PER_HOST = 10
+DNS_CACHE_TTL = 300  # seconds
+KEEPALIVE_TIMEOUT = 30  # seconds
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=120, connect=15)
+
+_connector: Optional[aiohttp.TCPConnector] = None
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_connector() -> aiohttp.TCPConnector:
+    global _connector
+    if _connector is None or _connector.closed:
+        _connector = aiohttp.TCPConnector(
+            limit=CONNECTION_LIMIT,
+            limit_per_host=CONNECTION_LIMIT_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+        )
+    return _connector
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Returns the process-wide client session, so connections to a host are kept alive and reused between requests.
+
+    The session does not store cookies and does not raise for status by default; pass raise_for_status=True
+    per request where needed.  Callers must not close it.
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=get_connector(),
+            connector_owner=False,
+            timeout=DEFAULT_TIMEOUT,
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+    return _session
+
+
+def new_session(**kwargs) -> aiohttp.ClientSession:
+    """
+    Create a short-lived session that still shares the process-wide connection pool.  Use this when a request flow
+    needs its own state, such as a cookie jar, and close it when done (e.g. with "async with").
+    """
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    return aiohttp.ClientSession(connector=get_connector(), connector_owner=False, **kwargs)
+
+
+async def close():
+    """
+    Close the process-wide session and connection pool.  Called on shutdown.
+    """
+    global _session, _connector
+    if _session is not None and not _session.closed:
+        await _session.close()
+    if _connector is not None and not _connector.closed:
+        await _connector.close()
+    _session = None
+    _connector = None
+    logging.info("Closed shared HTTP client session.")
+
+
+async def _read_response(resp: aiohttp.ClientResponse, returntype: str):
+    if returntype == 'text':
+        return await resp.text()
+    elif returntype == 'json':
+        return json.loads(await resp.text())
+    elif returntype == 'binary':
+        return await resp.read()
+    elif returntype == 'yaml':
+        return yaml.safe_load(await resp.read())
+
 
 async def request_generic(url, method='get', reqparams=None, data=None, header=None, auth=None, returntype='text'):
-    async with aiohttp.ClientSession(auth=None, raise_for_status=True) as session:
-        async with session.request(method.upper(), url, params=reqparams, data=data, headers=header, auth=auth) as resp:
-            if returntype == 'text':
-                return await resp.text()
-            elif returntype == 'json':
-                return json.loads(await resp.text())
-            elif returntype == 'binary':
-                return await resp.read()
-            elif returntype == 'yaml':
-                return yaml.safe_load(await resp.read())
+    async with get_session().request(method.upper(), url, params=reqparams, data=data, headers=header, auth=auth,
+                                     raise_for_status=True) as resp:
+        return await _read_response(resp, returntype)
 
 
 async def request_json_post(url, data, auth=None, returntype='text'):
-    async with aiohttp.ClientSession(auth=auth, raise_for_status=True) as session:
-        async with session.post(url=url, json=data, auth=auth) as resp:
-            if returntype == 'text':
-                return await resp.text()
-            elif returntype == 'json':
-                return json.loads(await resp.text())
-            elif returntype == 'binary':
-                return await resp.read()
-            elif returntype == 'yaml':
-                return yaml.safe_load(await resp.read())
+    async with get_session().post(url=url, json=data, auth=auth, raise_for_status=True) as resp:
+        return await _read_response(resp, returntype)
 
 
 async def request_json_put(url, data, auth=None, returntype='text'):
-    async with aiohttp.ClientSession(auth=auth, raise_for_status=True) as session:
-        async with session.put(url=url, json=data, auth=auth) as resp:
-            if returntype == 'text':
-                return await resp.text()
-            elif returntype == 'json':
-                return json.loads(await resp.text())
-            elif returntype == 'binary':
-                return await resp.read()
-            elif returntype == 'yaml':
-                return yaml.safe_load(await resp.read())
+    async with get_session().put(url=url, json=data, auth=auth, raise_for_status=True) as resp:
+        return await _read_response(resp, returntype)
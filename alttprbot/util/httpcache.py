@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
+
+import aiofiles
+import yaml
+
+import config
+from alttprbot.util import http
+from alttprbot.util.singleflight import SingleFlight
+
+HTTP_CACHE_PATH = os.path.join("data", "httpcache")
+DEFAULT_MAX_AGE = 60 * 60  # seconds
+DEFAULT_STALE_WHILE_REVALIDATE = 24 * 60 * 60  # seconds
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    body: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0  # wall clock, so the age survives a restart
+    parsed: Dict[str, object] = field(default_factory=dict)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def value(self, returntype: str):
+        if returntype not in self.parsed:
+            if returntype == 'json':
+                self.parsed[returntype] = json.loads(self.body)
+            elif returntype == 'yaml':
+                self.parsed[returntype] = yaml.safe_load(self.body)
+            elif returntype == 'text':
+                self.parsed[returntype] = self.body.decode()
+            else:
+                return self.body
+        return self.parsed[returntype]
+
+
+class HTTPCache():
+    """
+    A disk-backed cache for slow-changing resources fetched with GET.
+
+    A response younger than max_age is served without a request.  An older one, up to stale_while_revalidate seconds
+    past max_age, is served straight away while it is revalidated in the background.  Anything older waits for the
+    revalidation.  Revalidation is a conditional GET using the ETag and Last-Modified headers, so an unchanged
+    resource costs a 304.  If the request fails, the cached copy is served regardless of its age.
+
+    Responses are written to disk, so the cache is warm after a restart.
+    """
+
+    def __init__(self, path: str = HTTP_CACHE_PATH):
+        self.path = path
+        self.entries: Dict[str, CachedResponse] = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.hits = 0
+        self._flight = SingleFlight()
+        self._background: Set[asyncio.Task] = set()
+
+    async def get(self, url: str, returntype: str = 'json', max_age: float = DEFAULT_MAX_AGE,
+                  stale_while_revalidate: float = DEFAULT_STALE_WHILE_REVALIDATE, **kwargs):
+        """
+        GET url through the cache.  Extra keyword arguments, e.g. auth or ssl, are passed on to the request.
+        """
+        entry = self.entries.get(url)
+        if entry is None:
+            entry = await self._load(url)
+
+        if entry is not None and entry.age < max_age:
+            self.hits += 1
+            return entry.value(returntype)
+
+        if entry is not None and entry.age < max_age + stale_while_revalidate:
+            self.hits += 1
+            if not self._flight.in_flight(url):
+                task = asyncio.create_task(self._flight.run(url, self._revalidate, url, kwargs))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+            return entry.value(returntype)
+
+        entry = await self._flight.run(url, self._revalidate, url, kwargs)
+        return entry.value(returntype)
+
+    async def _revalidate(self, url: str, kwargs: dict) -> CachedResponse:
+        entry = self.entries.get(url)
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        self.requests += 1
+        try:
+            async with http.get_session().get(url, headers=headers, **kwargs) as resp:
+                if resp.status == 304 and entry is not None:
+                    self.not_modified += 1
+                    entry.fetched_at = time.time()
+                else:
+                    resp.raise_for_status()
+                    entry = CachedResponse(
+                        url=url,
+                        body=await resp.read(),
+                        etag=resp.headers.get('ETag'),
+                        last_modified=resp.headers.get('Last-Modified'),
+                        fetched_at=time.time(),
+                    )
+        except Exception:
+            if entry is None:
+                raise
+            logging.warning("Unable to refresh %s, serving a copy from %.0f seconds ago.", url, entry.age,
+                            exc_info=True)
+            return entry
+
+        self.entries[url] = entry
+        await self._save(entry)
+        return entry
+
+    def _filename(self, url: str) -> str:
+        return os.path.join(self.path, hashlib.sha256(url.encode()).hexdigest())
+
+    async def _load(self, url: str) -> Optional[CachedResponse]:
+        filename = self._filename(url)
+        try:
+            async with aiofiles.open(filename + '.json', 'r') as f:
+                meta = json.loads(await f.read())
+            async with aiofiles.open(filename + '.body', 'rb') as f:
+                body = await f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url:
+            return None
+
+        entry = CachedResponse(
+            url=url,
+            body=body,
+            etag=meta.get('etag'),
+            last_modified=meta.get('last_modified'),
+            fetched_at=meta.get('fetched_at', 0.0),
+        )
+        self.entries[url] = entry
+        return entry
+
+    async def _save(self, entry: CachedResponse):
+        filename = self._filename(entry.url)
+        meta = {
+            'url': entry.url,
+            'etag': entry.etag,
+            'last_modified': entry.last_modified,
+            'fetched_at': entry.fetched_at,
+        }
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            # write to temporary files first, so a crash never leaves a partly written file behind
+            async with aiofiles.open(filename + '.body.tmp', 'wb') as f:
+                await f.write(entry.body)
+            async with aiofiles.open(filename + '.json.tmp', 'w') as f:
+                await f.write(json.dumps(meta))
+            os.replace(filename + '.body.tmp', filename + '.body')
+            os.replace(filename + '.json.tmp', filename + '.json')
+        except OSError:
+            logging.exception("Unable to write %s to the http cache.", entry.url)
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'requests': self.requests,
+            'not_modified': self.not_modified,
+        }
+
+
+http_cache = HTTPCache(getattr(config, 'HTTP_CACHE_PATH', HTTP_CACHE_PATH))
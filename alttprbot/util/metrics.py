@@ -0,0 +1,65 @@
+import contextlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass
+class TimerStats:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    last: float = 0.0
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class Metrics():
+    """
+    Process-wide timings, by name.  Safe to record from executor threads.
+    """
+
+    def __init__(self):
+        self.timers: Dict[str, TimerStats] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            stats = self.timers.setdefault(name, TimerStats())
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.last = seconds
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextlib.contextmanager
+    def timed(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'timers': {
+                    name: {
+                        'count': s.count,
+                        'average': round(s.average, 4),
+                        'max': round(s.max, 4),
+                        'last': round(s.last, 4),
+                    } for name, s in self.timers.items()
+                },
+                'counters': dict(self.counters),
+            }
+
+
+metrics = Metrics()
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from alttprbot.exceptions import SahasrahBotException
+
+FIRST_DELAY = 1  # seconds
+BACKOFF_FACTOR = 1.5
+MAX_DELAY = 10  # seconds
+DEFAULT_DEADLINE = 120  # seconds
+MAX_CONCURRENT_CHECKS = 10
+
+
+class PollTimeout(SahasrahBotException):
+    pass
+
+
+@dataclass
+class PollJob:
+    future: asyncio.Future
+    deadline: float
+    delay: float = FIRST_DELAY
+    next_check: float = field(default_factory=time.monotonic)
+    checks: int = 0
+
+
+class Poller():
+    """
+    Polls many in-flight jobs against a backend from a single task.
+
+    check(key) is called for each job, returning None while the job is still pending, or its result once it has
+    finished.  Exceptions raised by check are passed to the waiter.  Each job is checked quickly at first, then
+    less often, until it finishes or its deadline passes.
+    """
+
+    def __init__(self, name: str, check: Callable[[Hashable], Awaitable[Optional[Any]]],
+                 first_delay: float = FIRST_DELAY, backoff_factor: float = BACKOFF_FACTOR,
+                 max_delay: float = MAX_DELAY, deadline: float = DEFAULT_DEADLINE,
+                 max_concurrent_checks: int = MAX_CONCURRENT_CHECKS):
+        self.name = name
+        self.check = check
+        self.first_delay = first_delay
+        self.backoff_factor = backoff_factor
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.max_concurrent_checks = max_concurrent_checks
+        self.jobs: Dict[Hashable, PollJob] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def wait(self, key: Hashable, deadline: float = None):
+        """
+        Wait for the job to finish, and return its result.  Raises PollTimeout if it does not finish in time.
+        """
+        job = self.jobs.get(key)
+        if job is None:
+            now = time.monotonic()
+            job = PollJob(
+                future=asyncio.get_running_loop().create_future(),
+                deadline=now + (self.deadline if deadline is None else deadline),
+                delay=self.first_delay,
+                next_check=now + self.first_delay,
+            )
+            self.jobs[key] = job
+            self._ensure_running()
+            self._wakeup.set()
+
+        return await asyncio.shield(job.future)
+
+    def _ensure_running(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        semaphore = asyncio.Semaphore(self.max_concurrent_checks)
+        while self.jobs:
+            now = time.monotonic()
+            due = [(key, job) for key, job in self.jobs.items() if job.next_check <= now]
+            if due:
+                await asyncio.gather(*[self._check(semaphore, key, job) for key, job in due])
+                continue
+
+            next_check = min(job.next_check for job in self.jobs.values())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0, next_check - now))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _check(self, semaphore: asyncio.Semaphore, key: Hashable, job: PollJob):
+        async with semaphore:
+            try:
+                result = await self.check(key)
+            except Exception as e:
+                self._finish(key, job, exception=e)
+                return
+
+        job.checks += 1
+        if result is not None:
+            logging.debug("%s poller: %s finished after %s checks", self.name, key, job.checks)
+            self._finish(key, job, result=result)
+            return
+
+        now = time.monotonic()
+        if now >= job.deadline:
+            self._finish(key, job, exception=PollTimeout(
+                f"Timed out waiting for {self.name} to finish {key} after {job.checks} checks."))
+            return
+
+        job.next_check = min(now + job.delay, job.deadline)
+        job.delay = min(job.delay * self.backoff_factor, self.max_delay)
+
+    def _finish(self, key: Hashable, job: PollJob, result=None, exception: Exception = None):
+        if self.jobs.get(key) is job:
+            del self.jobs[key]
+        if job.future.done():
+            return
+        if exception is not None:
+            job.future.set_exception(exception)
+        else:
+            job.future.set_result(result)
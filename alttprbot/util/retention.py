@@ -0,0 +1,180 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Type
+
+import aiofiles
+from tortoise.models import Model
+
+import config
+from alttprbot import models
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_PAUSE = 0.5  # seconds
+PROGRESS_LOG_INTERVAL = 60  # seconds
+RETENTION_ARCHIVE_PATH = os.path.join("data", "archive")
+
+
+@dataclass
+class RetentionPolicy:
+    name: str
+    model: Type[Model]
+    date_field: str
+    days: Optional[int] = None  # None keeps rows forever
+    batch_size: int = DEFAULT_BATCH_SIZE
+    pause: float = DEFAULT_PAUSE
+    archive: bool = False
+
+
+@dataclass
+class PurgeProgress:
+    policy: str
+    cutoff: datetime.datetime
+    started: float
+    finished: Optional[float] = None
+    batches: int = 0
+    deleted: int = 0
+    archived: int = 0
+    last_id: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self.finished is None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+
+def default_policies() -> List[RetentionPolicy]:
+    policies = [
+        RetentionPolicy('audit_messages', models.AuditMessages, 'message_date', days=30),
+        RetentionPolicy('audit_generated_games', models.AuditGeneratedGames, 'timestamp'),
+        RetentionPolicy('async_tournament_audit_log', models.AsyncTournamentAuditLog, 'created'),
+    ]
+    # e.g. RETENTION_POLICIES = {'audit_generated_games': {'days': 365, 'archive': True}}
+    overrides: Dict[str, dict] = getattr(config, 'RETENTION_POLICIES', {})
+    for policy in policies:
+        for key, value in overrides.get(policy.name, {}).items():
+            setattr(policy, key, value)
+    return policies
+
+
+class RetentionEngine():
+    """
+    Deletes rows past their policy's age in small batches, walking the table by primary key range and pausing
+    between batches, so no single statement holds locks for long.  New rows are always inserted past the range
+    being purged, so inserts never wait on a purge.
+
+    Ids are assumed to increase with the date column, so the walk stops at the first range holding rows that are
+    still too new.  Rows written out of order are picked up by a later run.
+    """
+
+    def __init__(self, policies: List[RetentionPolicy], archive_path: str = RETENTION_ARCHIVE_PATH):
+        self.policies = policies
+        self.archive_path = archive_path
+        self.progress: Dict[str, PurgeProgress] = {}
+        self._lock = asyncio.Lock()
+
+    async def purge_all(self):
+        # one table at a time, so the purges don't compete with each other for the database
+        async with self._lock:
+            for policy in self.policies:
+                if policy.days is None:
+                    continue
+                try:
+                    await self.purge(policy)
+                except Exception:
+                    logging.exception("Retention purge of %s failed.", policy.name)
+
+    async def purge(self, policy: RetentionPolicy) -> PurgeProgress:
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=policy.days)
+        progress = PurgeProgress(policy=policy.name, cutoff=cutoff, started=time.monotonic())
+        self.progress[policy.name] = progress
+
+        try:
+            await self._purge(policy, progress)
+        except Exception as e:
+            progress.error = repr(e)
+            raise
+        finally:
+            progress.finished = time.monotonic()
+            logging.info("Retention purge of %s finished: %s rows deleted in %s batches over %.0f seconds.",
+                         policy.name, progress.deleted, progress.batches, progress.elapsed)
+        return progress
+
+    async def _purge(self, policy: RetentionPolicy, progress: PurgeProgress):
+        model = policy.model
+        older = {f"{policy.date_field}__lte": progress.cutoff}
+        newer = {f"{policy.date_field}__gt": progress.cutoff}
+
+        first = await model.all().order_by('id').limit(1).values_list('id', flat=True)
+        last = await model.all().order_by('-id').limit(1).values_list('id', flat=True)
+        if not first:
+            return
+
+        low, highest = first[0], last[0]
+        last_logged = time.monotonic()
+        while low <= highest:
+            high = low + policy.batch_size
+            in_range = {'id__gte': low, 'id__lt': high}
+
+            if policy.archive:
+                rows = await model.filter(**in_range, **older).values()
+                if rows:
+                    await self._archive(policy, rows)
+                    progress.archived += len(rows)
+                ids = [row['id'] for row in rows]
+            else:
+                ids = await model.filter(**in_range, **older).values_list('id', flat=True)
+
+            if ids:
+                progress.deleted += await model.filter(id__in=ids).delete()
+                progress.batches += 1
+            progress.last_id = high - 1
+
+            # the rest of the table is newer than this, nothing left to do
+            if await model.filter(**in_range, **newer).exists():
+                break
+
+            if time.monotonic() - last_logged >= PROGRESS_LOG_INTERVAL:
+                last_logged = time.monotonic()
+                logging.info("Retention purge of %s: %s rows deleted, up to id %s of %s.",
+                             policy.name, progress.deleted, progress.last_id, highest)
+
+            low = high
+            if ids:
+                await asyncio.sleep(policy.pause)
+
+    async def _archive(self, policy: RetentionPolicy, rows: List[dict]):
+        # a file per day the purge ran, holding the rows as json lines
+        directory = os.path.join(self.archive_path, policy.name)
+        os.makedirs(directory, exist_ok=True)
+        filename = os.path.join(directory, f"{datetime.datetime.utcnow():%Y-%m-%d}.jsonl")
+        async with aiofiles.open(filename, 'a') as f:
+            await f.write(''.join(json.dumps(row, default=str) + '\n' for row in rows))
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            name: {
+                'running': progress.running,
+                'cutoff': progress.cutoff.isoformat(),
+                'elapsed': round(progress.elapsed, 1),
+                'batches': progress.batches,
+                'deleted': progress.deleted,
+                'archived': progress.archived,
+                'last_id': progress.last_id,
+                'error': progress.error,
+            } for name, progress in self.progress.items()
+        }
+
+
+retention_engine = RetentionEngine(
+    default_policies(),
+    archive_path=getattr(config, 'RETENTION_ARCHIVE_PATH', RETENTION_ARCHIVE_PATH)
+)
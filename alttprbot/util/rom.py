@@ -1,6 +1,192 @@
+import asyncio
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+
 def snes_to_pc_lorom(snes_address):
     return (snes_address & 0x7F0000) >> 1 | (snes_address & 0x7FFF)
 
 
 def pc_to_snes_lorom(pc_address):
     return ((pc_address << 1) & 0x7F0000) | (pc_address & 0x7FFF) | 0x8000
+
+
+# BPS delta patch creation, see https://www.romhacking.net/documents/746/
+BPS_SOURCE_READ = 0
+BPS_TARGET_READ = 1
+BPS_SOURCE_COPY = 2
+BPS_TARGET_COPY = 3
+
+BPS_BLOCK_SIZE = 8  # length of the blocks used to find copies
+BPS_INDEX_STRIDE = 4  # the source is indexed every BPS_INDEX_STRIDE bytes
+BPS_MIN_MATCH = 4
+
+_bps_sources = {}
+_bps_sources_lock = threading.Lock()
+
+
+def _bps_number(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        x = value & 0x7F
+        value >>= 7
+        if value == 0:
+            out.append(0x80 | x)
+            return bytes(out)
+        out.append(x)
+        value -= 1
+
+
+def _bps_signed(value: int) -> bytes:
+    return _bps_number((abs(value) << 1) | (value < 0))
+
+
+def _match_length(a, a_offset: int, b, b_offset: int, limit: int) -> int:
+    """
+    Returns how many bytes of a (from a_offset) and b (from b_offset) are equal, up to limit.
+    Compares in growing then shrinking chunks, so long runs only take a handful of slice comparisons.
+    """
+    length = 0
+    chunk = 16
+    while length < limit:
+        n = min(chunk, limit - length)
+        if a[a_offset + length:a_offset + length + n] == b[b_offset + length:b_offset + length + n]:
+            length += n
+            chunk = min(chunk * 2, 1 << 20)
+        elif n == 1:
+            break
+        else:
+            chunk = n // 2
+    return length
+
+
+class BpsSource():
+    """
+    A base ROM kept memory-mapped, along with its CRC32 and an index of where each block of it appears.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime = os.stat(path).st_mtime
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.crc32 = zlib.crc32(self.data)
+        self.index = {}
+        for offset in range(0, len(self.data) - BPS_BLOCK_SIZE + 1, BPS_INDEX_STRIDE):
+            self.index.setdefault(self.data[offset:offset + BPS_BLOCK_SIZE], offset)
+
+    def create_patch(self, target: bytes) -> bytes:
+        """
+        Create a BPS delta patch that turns this ROM into target.
+        """
+        source = self.data
+        source_length = len(source)
+        target_length = len(target)
+        target_index = {}
+
+        patch = bytearray(b'BPS1')
+        patch += _bps_number(source_length)
+        patch += _bps_number(target_length)
+        patch += _bps_number(0)  # no metadata
+
+        source_relative = 0
+        target_relative = 0
+        literal_start = None
+
+        def index_target(start, end):
+            for offset in range(start + (-start % BPS_INDEX_STRIDE), min(end, target_length - BPS_BLOCK_SIZE + 1),
+                                BPS_INDEX_STRIDE):
+                target_index.setdefault(target[offset:offset + BPS_BLOCK_SIZE], offset)
+
+        def flush_literal(end):
+            nonlocal literal_start
+            if literal_start is None:
+                return
+            patch.extend(_bps_number(((end - literal_start - 1) << 2) | BPS_TARGET_READ))
+            patch.extend(target[literal_start:end])
+            index_target(literal_start, end)
+            literal_start = None
+
+        position = 0
+        while position < target_length:
+            best_length, best_action, best_offset = 0, None, None
+
+            if position < source_length and source[position] == target[position]:
+                best_length = _match_length(source, position, target, position,
+                                            min(source_length, target_length) - position)
+                best_action = BPS_SOURCE_READ
+
+            if best_length < BPS_BLOCK_SIZE:
+                block = target[position:position + BPS_BLOCK_SIZE]
+                if len(block) == BPS_BLOCK_SIZE:
+                    offset = self.index.get(block)
+                    if offset is not None:
+                        length = _match_length(source, offset, target, position,
+                                               min(source_length - offset, target_length - position))
+                        if length > best_length:
+                            best_length, best_action, best_offset = length, BPS_SOURCE_COPY, offset
+
+                    offset = target_index.get(block)
+                    if offset is not None and offset < position:
+                        length = _match_length(target, offset, target, position, target_length - position)
+                        if length > best_length:
+                            best_length, best_action, best_offset = length, BPS_TARGET_COPY, offset
+
+                if position > 0 and target[position] == target[position - 1]:
+                    # a run of the same byte, copied from the byte before it
+                    length = _match_length(target, position - 1, target, position, target_length - position)
+                    if length > best_length:
+                        best_length, best_action, best_offset = length, BPS_TARGET_COPY, position - 1
+
+            if best_length < BPS_MIN_MATCH:
+                if literal_start is None:
+                    literal_start = position
+                position += 1
+                continue
+
+            flush_literal(position)
+            patch.extend(_bps_number(((best_length - 1) << 2) | best_action))
+            if best_action == BPS_SOURCE_COPY:
+                patch.extend(_bps_signed(best_offset - source_relative))
+                source_relative = best_offset + best_length
+            elif best_action == BPS_TARGET_COPY:
+                patch.extend(_bps_signed(best_offset - target_relative))
+                target_relative = best_offset + best_length
+            if best_action != BPS_SOURCE_READ:
+                index_target(position, position + best_length)
+            position += best_length
+
+        flush_literal(position)
+
+        patch += struct.pack('<I', self.crc32)
+        patch += struct.pack('<I', zlib.crc32(target))
+        patch += struct.pack('<I', zlib.crc32(patch))
+        return bytes(patch)
+
+
+def get_bps_source(path: str) -> BpsSource:
+    """
+    Returns the memory-mapped and indexed copy of the ROM at path, building it the first time it is used or
+    whenever the file changes.
+    """
+    with _bps_sources_lock:
+        source = _bps_sources.get(path)
+        if source is None or source.mtime != os.stat(path).st_mtime:
+            source = BpsSource(path)
+            _bps_sources[path] = source
+        return source
+
+
+def create_bps_patch(source_path: str, target: bytes) -> bytes:
+    return get_bps_source(source_path).create_patch(target)
+
+
+async def create_bps_patch_async(source_path: str, target: bytes, executor=None) -> bytes:
+    """
+    Create a BPS delta patch from the ROM at source_path to the target bytes, without blocking the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, create_bps_patch, source_path, target)
@@ -0,0 +1,46 @@
+import asyncio
+import functools
+import logging
+from typing import Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight():
+    """
+    Coalesces concurrent calls that share a key.  While a call is in flight, callers with the same key await its
+    result instead of starting their own.  Once it finishes, successfully or not, the next call with the key runs
+    again.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def run(self, key: Hashable, func: Callable[..., Awaitable], *args, **kwargs):
+        future = self._inflight.get(key)
+        if future is None or future.done():
+            future = asyncio.ensure_future(func(*args, **kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(functools.partial(self._done, key))
+        else:
+            logging.info("Joining in-flight call for %s", key)
+
+        # shielded, so a caller that goes away doesn't cancel the call for everyone else
+        return await asyncio.shield(future)
+
+    def _done(self, key: Hashable, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+
+def single_flight(flight: SingleFlight, key: Callable[..., Hashable]):
+    """
+    Decorator that runs the coroutine function through a SingleFlight, using key(*args, **kwargs) as the key.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await flight.run(key(*args, **kwargs), func, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,78 @@
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+
+class SizedLRUCache():
+    """
+    An LRU cache bounded by the total size of its values, in bytes, rather than by their count.  The least recently
+    used entries are evicted until a new value fits.  Values larger than the whole budget are not cached.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int = None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, Tuple[int, object]] = OrderedDict()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: Hashable, value, size: int) -> bool:
+        """
+        Cache value, which takes up size bytes.  Returns False if it is too big to cache.
+        """
+        self.pop(key)
+        if size > self.max_bytes:
+            return False
+
+        while self._entries and (self.size + size > self.max_bytes or
+                                 (self.max_entries is not None and len(self._entries) >= self.max_entries)):
+            _, (evicted_size, _) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+            self.evictions += 1
+
+        self._entries[key] = (size, value)
+        self.size += size
+        return True
+
+    def pop(self, key: Hashable, default=None):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        self.size -= entry[0]
+        return entry[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'evictions': self.evictions,
+        }
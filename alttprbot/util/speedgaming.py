@@ -1,14 +1,26 @@
 import json
 import logging
+import time
 from datetime import timedelta, datetime
-from typing import List
+from typing import Dict, Hashable, List, Tuple
 
 import aiofiles
-import aiohttp
 import pytz
 
 import config
 from alttprbot.exceptions import SahasrahBotException
+from alttprbot.util import http
+from alttprbot.util.circuitbreaker import CircuitOpen, get_breaker
+
+# how old a cached response can be and still be served while the SpeedGaming API is unavailable
+SCHEDULE_STALE_MAX_AGE = 30 * 60  # seconds
+EPISODE_STALE_MAX_AGE = 6 * 60 * 60  # seconds
+LAST_GOOD_MAX_ENTRIES = 500
+
+speedgaming_breaker = get_breaker('SpeedGaming')
+
+# last good response for each request, served while the breaker is open
+_last_good: Dict[Hashable, Tuple[float, object]] = {}
 
 
 class SGEpisodeNotFoundException(SahasrahBotException):
@@ -38,22 +50,66 @@ async def get_upcoming_episodes_by_event(event, hours_past=4, hours_future=4, st
         'from': sched_from.isoformat(),
         'to': sched_to.isoformat()
     }
-    async with aiohttp.request(
-            method='get',
-            url=f'{config.SG_API_ENDPOINT}/schedule',
-            params=params,
-    ) as resp:
-        schedule: List[dict] = await resp.json(content_type='text/html')
-        episode_ids = [episode['id'] for episode in schedule]
-        logging.info(
-            f'Retrieved schedule for {event} ({resp.status} {resp.reason}).  Received {len(schedule)} matches.  From: {sched_from} To: {sched_to}.  Match IDs: {", ".join(map(str, episode_ids))}')
+    # the window moves with the clock, so a cached schedule is only ever served for a short while
+    cache_key = ('schedule', event, hours_past, hours_future)
+    try:
+        async with speedgaming_breaker.guard():
+            async with http.get_session().request(
+                    method='get',
+                    url=f'{config.SG_API_ENDPOINT}/schedule',
+                    params=params,
+            ) as resp:
+                schedule: List[dict] = await resp.json(content_type='text/html')
+                episode_ids = [episode['id'] for episode in schedule]
+                logging.info(
+                    f'Retrieved schedule for {event} ({resp.status} {resp.reason}).  Received {len(schedule)} matches.  From: {sched_from} To: {sched_to}.  Match IDs: {", ".join(map(str, episode_ids))}')
+    except CircuitOpen as e:
+        return _stale(cache_key, SCHEDULE_STALE_MAX_AGE, e)
 
     if 'error' in schedule:
         raise SGEventNotFoundException(f"Unable to retrieve schedule for {event}. {schedule.get('error')}")
 
+    _remember(cache_key, schedule)
     return schedule
 
 
+def _remember(key: Hashable, value):
+    _last_good.pop(key, None)
+    _last_good[key] = (time.monotonic(), value)
+    while len(_last_good) > LAST_GOOD_MAX_ENTRIES:
+        del _last_good[next(iter(_last_good))]
+
+
+def _stale(key: Hashable, max_age: float, error: CircuitOpen):
+    """
+    Returns the last good response for key while the breaker is open, or raises the CircuitOpen error if there isn't
+    a recent enough one.
+    """
+    cached = _last_good.get(key)
+    if cached is None or time.monotonic() - cached[0] > max_age:
+        raise error
+    logging.warning("SpeedGaming API unavailable, serving a cached response for %s", key)
+    return cached[1]
+
+
+async def _fetch_episode(episodeid: int):
+    cache_key = ('episode', episodeid)
+    try:
+        async with speedgaming_breaker.guard():
+            async with http.get_session().request(
+                    method='get',
+                    url=f'{config.SG_API_ENDPOINT}/episode',
+                    params={'id': episodeid},
+            ) as resp:
+                result = await resp.json(content_type='text/html')
+    except CircuitOpen as e:
+        return _stale(cache_key, EPISODE_STALE_MAX_AGE, e)
+
+    if 'error' not in result:
+        _remember(cache_key, result)
+    return result
+
+
 async def get_episode(episodeid: int, complete=False):
     # if we're developing locally, we want to have some artifical data to use that isn't from SpeedGaming
     if config.DEBUG:
@@ -69,19 +125,9 @@ async def get_episode(episodeid: int, complete=False):
         elif episodeid == 0:
             result = {"error": "Failed to find episode with id 0."}
         else:
-            async with aiohttp.request(
-                    method='get',
-                    url=f'{config.SG_API_ENDPOINT}/episode',
-                    params={'id': episodeid},
-            ) as resp:
-                result = await resp.json(content_type='text/html')
+            result = await _fetch_episode(episodeid)
     else:
-        async with aiohttp.request(
-                method='get',
-                url=f'{config.SG_API_ENDPOINT}/episode',
-                params={'id': episodeid},
-        ) as resp:
-            result = await resp.json(content_type='text/html')
+        result = await _fetch_episode(episodeid)
 
     if 'error' in result:
         raise SGEpisodeNotFoundException(result["error"])
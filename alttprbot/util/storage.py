@@ -0,0 +1,185 @@
+import abc
+import asyncio
+import contextlib
+import dataclasses
+import logging
+import os
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional
+
+import aioboto3
+import aiofiles
+
+import config
+
+LOCAL_STORAGE_PATH = os.path.join("data", "storage")
+S3_MIN_PART_SIZE = 5 * 1024 * 1024  # bytes, smaller objects are uploaded in one request
+
+
+@dataclass
+class StorageObject:
+    key: str
+    body: bytes = b''
+    public: bool = False
+    content_encoding: Optional[str] = None
+    content_disposition: Optional[str] = None
+
+
+class StorageBackend(abc.ABC):
+    @abc.abstractmethod
+    async def put(self, bucket: str, obj: StorageObject) -> None:
+        pass
+
+    async def put_many(self, bucket: str, objects: List[StorageObject]) -> None:
+        """
+        Upload several objects concurrently.
+        """
+        await asyncio.gather(*[self.put(bucket, obj) for obj in objects])
+
+    async def put_stream(self, bucket: str, obj: StorageObject, chunks: AsyncIterator[bytes]) -> int:
+        """
+        Upload an object whose body arrives in chunks, ignoring obj.body.  Returns the size of the object.
+        """
+        body = bytearray()
+        async for chunk in chunks:
+            body += chunk
+        await self.put(bucket, dataclasses.replace(obj, body=bytes(body)))
+        return len(body)
+
+    async def close(self) -> None:
+        pass
+
+
+class S3Storage(StorageBackend):
+    """
+    Uploads to S3 using one long-lived client, as creating a client is expensive.
+    """
+
+    def __init__(self):
+        self._session = aioboto3.Session()
+        self._stack = contextlib.AsyncExitStack()
+        self._client = None
+        self._lock = asyncio.Lock()
+
+    async def client(self):
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    self._client = await self._stack.enter_async_context(self._session.client('s3'))
+        return self._client
+
+    @staticmethod
+    def _object_args(obj: StorageObject) -> dict:
+        kwargs = {'ACL': 'public-read' if obj.public else 'private'}
+        if obj.content_encoding:
+            kwargs['ContentEncoding'] = obj.content_encoding
+        if obj.content_disposition:
+            kwargs['ContentDisposition'] = obj.content_disposition
+        return kwargs
+
+    async def put(self, bucket: str, obj: StorageObject) -> None:
+        s3 = await self.client()
+        await s3.put_object(
+            Bucket=bucket,
+            Key=obj.key,
+            Body=obj.body,
+            **self._object_args(obj)
+        )
+
+    async def put_stream(self, bucket: str, obj: StorageObject, chunks: AsyncIterator[bytes]) -> int:
+        """
+        Streams the object to S3 as a multipart upload once it grows past the minimum part size, otherwise uploads it
+        in a single request.
+        """
+        s3 = await self.client()
+        buffer = bytearray()
+        size = 0
+        upload_id = None
+        parts = []
+
+        async def upload_part():
+            number = len(parts) + 1
+            response = await s3.upload_part(Bucket=bucket, Key=obj.key, UploadId=upload_id,
+                                            PartNumber=number, Body=bytes(buffer))
+            parts.append({'ETag': response['ETag'], 'PartNumber': number})
+            buffer.clear()
+
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                size += len(chunk)
+                if len(buffer) >= S3_MIN_PART_SIZE:
+                    if upload_id is None:
+                        response = await s3.create_multipart_upload(Bucket=bucket, Key=obj.key,
+                                                                    **self._object_args(obj))
+                        upload_id = response['UploadId']
+                    await upload_part()
+
+            if upload_id is None:
+                await self.put(bucket, dataclasses.replace(obj, body=bytes(buffer)))
+                return size
+
+            if buffer:
+                await upload_part()
+            await s3.complete_multipart_upload(Bucket=bucket, Key=obj.key, UploadId=upload_id,
+                                               MultipartUpload={'Parts': parts})
+        except BaseException:
+            if upload_id is not None:
+                await s3.abort_multipart_upload(Bucket=bucket, Key=obj.key, UploadId=upload_id)
+            raise
+        return size
+
+    async def close(self) -> None:
+        await self._stack.aclose()
+        self._client = None
+
+
+class LocalStorage(StorageBackend):
+    """
+    Writes objects to the local filesystem, under <path>/<bucket>/<key>.  Useful for development and benchmarking.
+    """
+
+    def __init__(self, path: str = LOCAL_STORAGE_PATH):
+        self.path = path
+
+    async def put(self, bucket: str, obj: StorageObject) -> None:
+        filepath = os.path.join(self.path, bucket or "default", obj.key)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        async with aiofiles.open(filepath, "wb") as f:
+            await f.write(obj.body)
+        logging.debug("Wrote %s bytes to %s", len(obj.body), filepath)
+
+    async def put_stream(self, bucket: str, obj: StorageObject, chunks: AsyncIterator[bytes]) -> int:
+        filepath = os.path.join(self.path, bucket or "default", obj.key)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        size = 0
+        async with aiofiles.open(filepath + ".part", "wb") as f:
+            async for chunk in chunks:
+                await f.write(chunk)
+                size += len(chunk)
+        os.replace(filepath + ".part", filepath)
+        logging.debug("Wrote %s bytes to %s", size, filepath)
+        return size
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """
+    Returns the storage backend for the process.  Set STORAGE_BACKEND = 'local' in config.py to keep uploads on disk.
+    """
+    global _storage
+    if _storage is None:
+        if getattr(config, 'STORAGE_BACKEND', 's3') == 'local':
+            _storage = LocalStorage(getattr(config, 'STORAGE_LOCAL_PATH', LOCAL_STORAGE_PATH))
+        else:
+            _storage = S3Storage()
+    return _storage
+
+
+async def close():
+    global _storage
+    if _storage is not None:
+        await _storage.close()
+        _storage = None
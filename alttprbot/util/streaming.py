@@ -0,0 +1,109 @@
+import asyncio
+import json
+import threading
+import time
+import zlib
+from typing import AsyncIterator, Callable, Iterable
+
+from alttprbot.util.metrics import metrics
+
+CHUNK_SIZE = 256 * 1024  # compressed bytes handed to the uploader at a time
+MAX_BUFFERED_CHUNKS = 4
+GZIP_LEVEL = 6
+
+
+def gzip_chunks(pieces: Iterable[bytes], chunk_size: int = CHUNK_SIZE, level: int = GZIP_LEVEL) -> Iterable[bytes]:
+    """
+    Compress a stream of byte strings into a gzip stream, yielding it in chunks of about chunk_size bytes.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    buffer = bytearray()
+    for piece in pieces:
+        buffer += compressor.compress(piece)
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += compressor.flush()
+    if buffer:
+        yield bytes(buffer)
+
+
+def byte_slices(data: bytes, size: int = CHUNK_SIZE) -> Iterable[bytes]:
+    view = memoryview(data)
+    for offset in range(0, len(view), size):
+        yield view[offset:offset + size]
+
+
+def json_pieces(obj, indent=4, batch_size: int = 64 * 1024) -> Iterable[bytes]:
+    """
+    Serialize obj as json, a batch of encoded bytes at a time, without building the whole document in memory.
+    """
+    batch = []
+    size = 0
+    for piece in json.JSONEncoder(indent=indent).iterencode(obj):
+        batch.append(piece)
+        size += len(piece)
+        if size >= batch_size:
+            yield ''.join(batch).encode('utf-8')
+            batch.clear()
+            size = 0
+    if batch:
+        yield ''.join(batch).encode('utf-8')
+
+
+async def stream_in_executor(produce: Callable[[], Iterable[bytes]], metric: str = None,
+                             max_buffered: int = MAX_BUFFERED_CHUNKS) -> AsyncIterator[bytes]:
+    """
+    Run produce() in the default executor, yielding the chunks it generates as they become ready, so CPU heavy
+    serialization and compression never runs on the event loop.  At most max_buffered chunks are held waiting for
+    the consumer, after which the producer thread waits.
+
+    The time spent producing, not counting time spent waiting for the consumer, is recorded under metric.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered)
+    cancelled = threading.Event()
+    done = object()
+
+    def put(item):
+        # wait for room in the queue, so the producer can't run ahead of a slow upload
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    def run():
+        # only time spent producing counts, not time spent waiting for the consumer
+        busy = 0.0
+        start = time.perf_counter()
+        try:
+            for chunk in produce():
+                busy += time.perf_counter() - start
+                if cancelled.is_set():
+                    return
+                put(chunk)
+                start = time.perf_counter()
+            busy += time.perf_counter() - start
+        except BaseException as e:
+            if not cancelled.is_set():
+                put(e)
+            return
+        finally:
+            if metric:
+                metrics.record(metric, busy)
+        if not cancelled.is_set():
+            put(done)
+
+    future = loop.run_in_executor(None, run)
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+        await future
+    finally:
+        cancelled.set()
+        # unblock a producer waiting for room, so the thread can finish
+        while not queue.empty():
+            queue.get_nowait()
+
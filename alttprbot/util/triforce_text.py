@@ -1,7 +1,12 @@
+import asyncio
+import logging
 import random
 
+import config
 from alttprbot import models
 from alttprbot.alttprgen import generator
+from alttprbot.alttprgen.scheduler import Priority
+from alttprbot.alttprgen.seedpool import seed_pool_manager
 
 
 async def get_triforce_text_balanced(pool_name: str):
@@ -34,12 +39,83 @@ async def get_triforce_text_random(pool_name: str):
     return triforce_text.text
 
 
-async def generate_with_triforce_text(pool_name: str, preset: str, settings: dict = None, branch: str = "live",
-                                      balanced=True):
+# the triforce text pool used by the qualifier live races
+QUALIFIER_POOL_NAME = "alttpr2024"
+QUALIFIER_SEED_POOL_SIZE = 2
+SEED_POOL_REFRESH_INTERVAL = 300  # seconds
+
+
+def _seed_pool_key(pool_name: str, preset: str, branch: str, balanced: bool):
+    return ('triforce_text', pool_name, preset, branch, balanced)
+
+
+async def seed_pool_definitions():
     """
-    Generate a game with a triforce text.
+    The pools to pre-roll, as (pool_name, preset, branch, balanced, size).  These are the ones listed in
+    config.TRIFORCE_TEXT_SEED_POOLS, plus one for each preset an upcoming qualifier live race will use.
     """
+    definitions = list(getattr(config, 'TRIFORCE_TEXT_SEED_POOLS', []))
+    presets = await models.AsyncTournamentLiveRace.filter(
+        status='scheduled',
+        tournament__active=True,
+        pool__preset__isnull=False,
+    ).distinct().values_list('pool__preset', flat=True)
+    for preset in presets:
+        definitions.append((QUALIFIER_POOL_NAME, preset, "live", True, QUALIFIER_SEED_POOL_SIZE))
+    return definitions
+
 
+async def register_seed_pools():
+    """
+    Bring the seed pool manager in line with seed_pool_definitions(), registering and starting pools for new
+    definitions, and removing the pools of races that are no longer scheduled.
+    """
+    keys = set()
+    for pool_name, preset, branch, balanced, size in await seed_pool_definitions():
+        key = _seed_pool_key(pool_name, preset, branch, balanced)
+        keys.add(key)
+        if key in seed_pool_manager.pools:
+            continue
+
+        async def factory(pool_name=pool_name, preset=preset, branch=branch, balanced=balanced):
+            data = await _roll_with_triforce_text(pool_name, preset, branch=branch, balanced=balanced, audit=False,
+                                                  priority=Priority.BACKGROUND)
+            return data.seed, data.audit_data
+
+        seed_pool_manager.register(key, factory, size=size)
+        logging.info("Registered seed pool %s", key)
+
+    for key in list(seed_pool_manager.pools):
+        if key[0] == 'triforce_text' and key not in keys:
+            seed_pool_manager.unregister(key)
+            logging.info("Unregistered seed pool %s", key)
+
+    seed_pool_manager.start()
+
+
+async def refresh_seed_pools(interval: int = SEED_POOL_REFRESH_INTERVAL):
+    """
+    Re-register the seed pools every interval seconds, so qualifier races scheduled while the bot is running get a
+    pool, and finished ones give theirs up.
+    """
+    while True:
+        try:
+            await register_seed_pools()
+        except Exception:
+            logging.exception("Unable to refresh the triforce text seed pools.")
+        await asyncio.sleep(interval)
+
+
+async def take_pooled_seed(pool_name: str, preset: str, branch: str = "live", balanced=True):
+    """
+    Take a pre-rolled game from the seed pool, or None if one isn't available.
+    """
+    return await seed_pool_manager.take(_seed_pool_key(pool_name, preset, branch, balanced))
+
+
+async def _roll_with_triforce_text(pool_name: str, preset: str, settings: dict = None, branch: str = "live",
+                                   balanced=True, audit=True,
+                                   priority: Priority = Priority.CASUAL) -> generator.ALTTPRPreset:
     data = generator.ALTTPRPreset(preset)
     await data.fetch()
     if balanced:
@@ -54,4 +130,22 @@ async def generate_with_triforce_text(pool_name: str, preset: str, settings: dic
     if settings is not None and isinstance(settings, dict):
         data.preset_data['settings'] = {**data.preset_data['settings'], **settings}
 
-    return await data.generate(allow_quickswap=True, tournament=True, hints=False, spoilers="off", branch=branch)
+    data.seed = await data.generate(allow_quickswap=True, tournament=True, hints=False, spoilers="off",
+                                    branch=branch, audit=audit, priority=priority)
+    return data
+
+
+async def generate_with_triforce_text(pool_name: str, preset: str, settings: dict = None, branch: str = "live",
+                                      balanced=True, use_pool=True, priority: Priority = Priority.TOURNAMENT):
+    """
+    Generate a game with a triforce text.  A pre-rolled game is used if one is available.
+    """
+
+    if use_pool and settings is None:
+        seed = await take_pooled_seed(pool_name, preset, branch=branch, balanced=balanced)
+        if seed is not None:
+            return seed
+
+    data = await _roll_with_triforce_text(pool_name, preset, settings=settings, branch=branch, balanced=balanced,
+                                          priority=priority)
+    return data.seed
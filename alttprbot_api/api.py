@@ -8,6 +8,7 @@ from quart_discord import (AccessDenied, DiscordOAuth2Session, Unauthorized,
 
 import config
 from alttprbot import models
+from alttprbot.util.circuitbreaker import breaker_stats
 from alttprbot_discord.bot import discordbot
 
 sahasrahbotapi = Quart(__name__)
@@ -115,7 +116,12 @@ async def healthcheck():
     await discordbot.fetch_user(appinfo.owner.id)
 
     return jsonify(
-        success=True
+        success=True,
+        # last_failure is left out, as error messages can include request urls with api keys
+        upstreams={
+            name: {key: value for key, value in stats.items() if key != 'last_failure'}
+            for name, stats in breaker_stats().items()
+        },
     )
 
 
@@ -7,6 +7,8 @@ from tortoise.query_utils import Prefetch
 
 from alttprbot import models
 from alttprbot.alttprgen import generator
+from alttprbot.alttprgen.preset_index import preset_autocomplete
+from alttprbot.alttprgen.preset_registry import namespaced_preset_cache
 from alttprbot_api.api import discord
 
 presets_blueprint = Blueprint('presets', __name__)
@@ -74,6 +76,8 @@ async def new_preset_submit(namespace):
             'content': request_files['presetfile'].read().decode()
         }
     )
+    namespaced_preset_cache.invalidate(ns_data.name, preset_data.randomizer, preset_data.preset_name)
+    preset_autocomplete.add_namespaced(ns_data.name, preset_data.randomizer, preset_data.preset_name)
 
     return redirect(
         url_for('presets.presets_for_namespace_randomizer', namespace=ns_data.name, preset=preset_data.preset_name,
@@ -168,6 +172,8 @@ async def update_preset(namespace, randomizer, preset):
 
     if 'delete' in payload:
         await preset_data.delete()
+        namespaced_preset_cache.invalidate(namespace, randomizer, preset)
+        preset_autocomplete.remove_namespaced(namespace, randomizer, preset)
         return redirect(url_for('presets.presets_for_namespace', namespace=namespace))
 
     preset_data.content = request_files['presetfile'].read().decode()
@@ -176,6 +182,7 @@ async def update_preset(namespace, randomizer, preset):
         return await render_template('error.html', user=user, title="Oops!",
                                      message="Empty or missing preset file provided.")
     await preset_data.save()
+    namespaced_preset_cache.invalidate(namespace, randomizer, preset)
 
     return redirect(url_for('presets.get_preset', namespace=namespace, randomizer=randomizer, preset=preset))
 
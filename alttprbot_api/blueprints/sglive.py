@@ -13,6 +13,7 @@ from alttprbot import models
 from alttprbot.alttprgen import generator
 from alttprbot.alttprgen.randomizer import roll_ffr, roll_ootr
 from alttprbot.alttprgen.randomizer.smdash import create_smdash
+from alttprbot.alttprgen.scheduler import Priority
 from alttprbot.util import triforce_text, speedgaming
 from alttprbot_api.api import discord
 
@@ -106,9 +107,12 @@ async def sglive_dashboard():
 async def sglive_generate_alttpr():
     preset = "sglive2024"
     # seed = await generator.ALTTPRPreset(preset).generate(allow_quickswap=True, tournament=True, hints=False, spoilers="off", branch="tournament")
-    seed = await triforce_text.generate_with_triforce_text(pool_name="sgl24", preset=preset, balanced=False)
+    seed = await triforce_text.take_pooled_seed(pool_name="sgl24", preset=preset, balanced=False)
+    if seed is None:
+        seed = await triforce_text.generate_with_triforce_text(pool_name="sgl24", preset=preset, balanced=False,
+                                                               use_pool=False)
+        await asyncio.sleep(2)  # workaround for tournament branch seeds not being available immediately
     logging.info("sglive - Generated ALTTPR seed %s", seed.url)
-    await asyncio.sleep(2)  # workaround for tournament branch seeds not being available immediately
     await models.SGL2023OnsiteHistory.create(
         tournament="alttpr",
         url=seed.url,
@@ -227,7 +231,8 @@ async def sglive_generate_ootr():
         "adult_trade_shuffle": False,
         "adult_trade_start": ["Claim Check"]
     }
-    seed = await roll_ootr(settings=settings, version='devSGLive22_8.1.49-40', encrypt=True)
+    seed = await roll_ootr(settings=settings, version='devSGLive22_8.1.49-40', encrypt=True,
+                          priority=Priority.TOURNAMENT)
     logging.info("sglive - Generated OOTR seed %s", seed['id'])
     url = f"https://ootrandomizer.com/seed/get?id={seed['id']}"
     await models.SGL2023OnsiteHistory.create(
@@ -239,7 +244,7 @@ async def sglive_generate_ootr():
 
 @sglive_blueprint.route('/generate/smz3')  # updated
 async def sglive_generate_smz3():
-    seed = await generator.SMZ3Preset("mm2nescartridge/sgl2024").generate(tournament=True)
+    seed = await generator.SMZ3Preset("mm2nescartridge/sgl2024").generate(tournament=True, priority=Priority.TOURNAMENT)
     await models.SGL2023OnsiteHistory.create(
         tournament="smz3",
         url=seed.url,
@@ -250,7 +255,7 @@ async def sglive_generate_smz3():
 # updated for SGL24
 @sglive_blueprint.route("/generate/smr")  # updated
 async def sglive_generate_smr():
-    seed_url = await create_smdash(mode="sgl24")
+    seed_url = await create_smdash(mode="sgl24", priority=Priority.TOURNAMENT)
     await models.SGL2023OnsiteHistory.create(
         tournament="smr",
         url=seed_url,
@@ -273,7 +278,7 @@ async def sglive_generate_ffr():
 #updated for sgl24
 @sglive_blueprint.route("/generate/smz3/main")
 async def sglive_generate_smz3_main():
-    seed = await generator.SMZ3Preset("mm2nescartridge/sgl2024").generate(tournament=True)
+    seed = await generator.SMZ3Preset("mm2nescartridge/sgl2024").generate(tournament=True, priority=Priority.TOURNAMENT)
     await models.SGL2023OnsiteHistory.create(
         tournament="smz3_main",
         url=seed.url,
@@ -1,12 +1,17 @@
 import csv
-import datetime
 import io
+from collections import Counter
 from contextlib import closing
 
 import discord
 from discord.ext import commands, tasks
 
 from alttprbot import models
+from alttprbot.util.retention import retention_engine
+from alttprbot_audit.util.recent import recent_messages
+from alttprbot_audit.util.recorder import audit_recorder, audit_row
+
+BULK_DELETE_AUTHORS = 10
 
 
 class Audit(commands.Cog):
@@ -14,15 +19,40 @@ class Audit(commands.Cog):
         self.bot = bot
         self.clean_history.start()
 
+    async def cog_load(self):
+        audit_recorder.start()
+
+    async def cog_unload(self):
+        await audit_recorder.stop()
+
     @tasks.loop(hours=24, reconnect=True)
     async def clean_history(self):
-        thirty_days_ago = datetime.datetime.utcnow() - datetime.timedelta(days=30)
-        await models.AuditMessages.filter(message_date__lte=thirty_days_ago).delete()
+        await retention_engine.purge_all()
 
     @clean_history.before_loop
     async def before_clean_history(self):
         await self.bot.wait_until_ready()
 
+    @commands.command()
+    @commands.is_owner()
+    async def retention(self, ctx):
+        stats = retention_engine.stats()
+        if not stats:
+            await ctx.reply("No retention purges have run yet.")
+            return
+
+        lines = []
+        for name, progress in stats.items():
+            state = 'running' if progress['running'] else 'finished'
+            line = f"{name}: {state}, {progress['deleted']} rows deleted in {progress['batches']} batches " \
+                   f"over {progress['elapsed']}s (older than {progress['cutoff']})"
+            if progress['archived']:
+                line += f", {progress['archived']} archived"
+            if progress['error']:
+                line += f", failed: {progress['error'][:200]}"
+            lines.append(line)
+        await ctx.reply('\n'.join(lines))
+
     @commands.command()
     @commands.has_guild_permissions(manage_messages=True)
     async def messagehistory(self, ctx, member: discord.Member, limit=500):
@@ -85,52 +115,49 @@ class Audit(commands.Cog):
 
             await audit_channel.send(embed=embed)
 
-            cached_messages = await models.AuditMessages.filter(message_id=payload.message_id)
-            if cached_messages:
-                for msg in cached_messages:
-                    msg.deleted = 1
-                    await msg.save(update_fields=['deleted'])
+            recent_messages.pop(payload.guild_id, payload.message_id)
+            audit_recorder.mark_deleted(payload.message_id)
+            await models.AuditMessages.filter(message_id=payload.message_id).update(deleted=1)
 
     @commands.Cog.listener()
-    async def on_raw_bulk_message_delete(self, payload):
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
         if payload.guild_id is None:
             return
         guild = self.bot.get_guild(payload.guild_id)
         channel = self.bot.get_channel(payload.channel_id)
 
-        # message = await channel.fetch_message(payload.message_id)
-        # if message.author.bot:
-        #     return
-
         audit_channel_id = await guild.config_get('AuditLogChannel')
         if not audit_channel_id:
             return
 
         audit_channel = discord.utils.get(guild.channels, id=int(audit_channel_id))
 
-        for message_id in payload.message_ids:
-            embed = await audit_embed_delete(guild, channel, message_id)
+        # one log entry and one query for the whole purge, rather than one of each per message
+        message_ids = sorted(payload.message_ids)
+        history = await bulk_message_history(payload.guild_id, message_ids)
+        embed = await audit_embed_bulk_delete(guild, channel, message_ids, history)
+        await audit_channel.send(embed=embed, file=bulk_delete_transcript(guild, channel, message_ids, history))
 
-            await audit_channel.send(embed=embed)
-            cached_message = await models.AuditMessages.get(message_id=message_id)
-            cached_message.deleted = 1
-            await cached_message.save()
+        for message_id in message_ids:
+            recent_messages.pop(payload.guild_id, message_id)
+            audit_recorder.mark_deleted(message_id)
+        await models.AuditMessages.filter(message_id__in=message_ids).update(deleted=1)
 
     @commands.Cog.listener()
-    async def on_raw_message_edit(self, payload):
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
         channel = self.bot.get_channel(payload.channel_id)
-        if isinstance(channel, discord.DMChannel):
+        if channel is None or isinstance(channel, discord.DMChannel):
             return
 
         # ignore these channels for reasons
-        if channel and channel.id in [694710452478803968, 694710286455930911, 606873327839215616]:
+        if channel.id in [694710452478803968, 694710286455930911, 606873327839215616]:
             return
 
-        message = await channel.fetch_message(payload.message_id)
-        if message.author.bot:
+        message = await edited_message(channel, payload)
+        if message is None or message.author.bot:
             return
 
-        old_message = await models.AuditMessages.filter(message_id=message.id).order_by('id').values()
+        old_message = await message_history(payload.guild_id, message.id)
         if old_message and old_message[-1]['content'] == message.content:
             return
         audit_channel_id = await message.guild.config_get('AuditLogChannel')
@@ -317,9 +344,9 @@ async def audit_embed_edit(old_message, message):
     return embed
 
 
-async def audit_embed_delete(guild: discord.Guild, channel, message_id, bulk=False):
-    old_message = await models.AuditMessages.filter(message_id=message_id).order_by('id').values()
-    if old_message is None:
+async def audit_embed_delete(guild: discord.Guild, channel, message_id):
+    old_message = await message_history(guild.id, message_id)
+    if not old_message:
         author = None
         old_content = '*unknown*'
         old_attachment_url = None
@@ -335,7 +362,7 @@ async def audit_embed_delete(guild: discord.Guild, channel, message_id, bulk=Fal
     old_content = '*empty*' if old_content == '' else old_content
 
     embed = discord.Embed(
-        title="Bulk Message Deleted" if bulk else "Message Deleted",
+        title="Message Deleted",
         description=f"**Message sent by {'unknown' if author is None else author.mention} was deleted in {channel.mention}.**",
         color=discord.Colour.dark_red(),
         timestamp=discord.utils.utcnow()
@@ -353,17 +380,111 @@ async def audit_embed_delete(guild: discord.Guild, channel, message_id, bulk=Fal
     return embed
 
 
-async def record_message(message):
-    await models.AuditMessages.create(
-        guild_id=message.guild.id if message.guild else 0,
-        message_id=message.id,
-        user_id=message.author.id,
-        channel_id=message.channel.id,
-        message_date=message.created_at,
-        content=message.content,
-        attachment=message.attachments[0].url if message.attachments else None
+async def audit_embed_bulk_delete(guild: discord.Guild, channel, message_ids, history):
+    if guild.chunked is False:
+        await guild.chunk(cache=True)
+
+    authors = Counter(rows[-1]['user_id'] for rows in history.values())
+    unknown = len(message_ids) - len(history)
+
+    embed = discord.Embed(
+        title="Bulk Message Deleted",
+        description=f"**{len(message_ids)} messages were deleted in {channel.mention}.**  The attached transcript has "
+                    f"their content.",
+        color=discord.Colour.dark_red(),
+        timestamp=discord.utils.utcnow()
+    )
+
+    if authors:
+        lines = []
+        for user_id, count in authors.most_common(BULK_DELETE_AUTHORS):
+            member = guild.get_member(int(user_id))
+            lines.append(f"{member.mention if member else user_id}: {count}")
+        if len(authors) > BULK_DELETE_AUTHORS:
+            lines.append(f"...and {len(authors) - BULK_DELETE_AUTHORS} more")
+        embed.add_field(name='Authors', value='\n'.join(lines), inline=False)
+    if unknown:
+        embed.add_field(name='Unrecorded Messages', value=str(unknown), inline=False)
+    embed.set_footer(text="Logged at")
+
+    return embed
+
+
+def bulk_delete_transcript(guild: discord.Guild, channel, message_ids, history):
+    lines = []
+    for message_id in message_ids:
+        rows = history.get(message_id)
+        if not rows:
+            lines.append(f"[unknown] message {message_id} was not recorded")
+            continue
+        member = guild.get_member(int(rows[-1]['user_id']))
+        author = f"{member} ({member.id})" if member else rows[-1]['user_id']
+        line = f"[{rows[0]['message_date']:%Y-%m-%d %H:%M:%S} UTC] {author}: {rows[-1]['content']}"
+        if rows[-1]['attachment']:
+            line += f" [attachment: {rows[-1]['attachment']}]"
+        lines.append(line)
+
+    return discord.File(
+        fp=io.BytesIO('\n'.join(lines).encode('utf-8')),
+        filename=f"{channel.id}_deleted_{discord.utils.utcnow():%Y%m%d%H%M%S}.txt"
     )
 
 
+async def edited_message(channel, payload: discord.RawMessageUpdateEvent):
+    """
+    The edited message, built from the gateway payload when it carries the whole message, so editing doesn't cost a
+    REST call.  Returns None for updates that don't change the content, like embeds being unfurled.
+    """
+    data = payload.data
+    if 'content' not in data:
+        return None
+    if 'author' in data:
+        try:
+            return discord.Message(state=channel._state, channel=channel, data=data)
+        except KeyError:
+            pass
+    return await channel.fetch_message(payload.message_id)
+
+
+async def message_history(guild_id, message_id):
+    """
+    The recorded versions of a message, oldest first.  Recent messages come from memory, older ones from the database.
+    """
+    recent = recent_messages.get(guild_id, message_id)
+    if recent is not None:
+        return [recent]
+    return await audit_recorder.history(message_id)
+
+
+async def bulk_message_history(guild_id, message_ids):
+    """
+    The recorded versions of each message, oldest first, by message id.  Messages that weren't recorded are left
+    out.  Whatever isn't in memory is fetched with a single query.
+    """
+    history = {}
+    missing = []
+    for message_id in message_ids:
+        recent = recent_messages.get(guild_id, message_id)
+        if recent is not None:
+            history[message_id] = [recent]
+        else:
+            missing.append(message_id)
+
+    if missing:
+        for row in await models.AuditMessages.filter(message_id__in=missing).order_by('id').values():
+            history.setdefault(row['message_id'], []).append(row)
+        for message_id in missing:
+            pending = audit_recorder.pending(message_id)
+            if pending:
+                history.setdefault(message_id, []).extend(pending)
+
+    return history
+
+
+async def record_message(message):
+    recent_messages.put(audit_row(message))
+    await audit_recorder.record(message)
+
+
 async def setup(bot):
     await bot.add_cog(Audit(bot))
@@ -7,13 +7,12 @@ import zipfile
 from typing import List
 from urllib.parse import urlparse
 
-import aiocache
-import aiohttp
 import discord
 from discord.ext import commands
 from urlextract import URLExtract
 
 from alttprbot.util import http
+from alttprbot.util.httpcache import http_cache
 
 # from alttprbot import models
 
@@ -121,17 +120,8 @@ async def inspect_zip(url):
     return zippedfiles
 
 
-@aiocache.cached(ttl=3600, cache=aiocache.SimpleMemoryCache)
 async def bad_domain_hashes() -> List:
-    async with aiohttp.ClientSession() as session:
-        async with session.request(
-                method='get',
-                url='https://cdn.discordapp.com/bad-domains/hashes.json',
-                raise_for_status=True
-        ) as resp:
-            hashes: list = await resp.json()
-
-    return hashes
+    return await http_cache.get('https://cdn.discordapp.com/bad-domains/hashes.json', max_age=60 * 60)
 
 
 def ck_url(string_to_check):
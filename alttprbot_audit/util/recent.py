@@ -0,0 +1,49 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import config
+
+RECENT_MESSAGES_PER_GUILD = 2000
+
+
+class RecentMessages():
+    """
+    The latest version of the most recent messages in each guild, as AuditMessages rows, so the edit and delete
+    handlers can usually find the old message without going to the database.  Each guild keeps at most per_guild
+    messages, the least recently seen are dropped first.
+    """
+
+    def __init__(self, per_guild: int = RECENT_MESSAGES_PER_GUILD):
+        self.per_guild = per_guild
+        self.hits = 0
+        self.misses = 0
+        self._guilds: Dict[int, OrderedDict[int, dict]] = {}
+
+    def put(self, row: dict):
+        messages = self._guilds.setdefault(row['guild_id'], OrderedDict())
+        messages[row['message_id']] = row
+        messages.move_to_end(row['message_id'])
+        if len(messages) > self.per_guild:
+            messages.popitem(last=False)
+
+    def get(self, guild_id: int, message_id: int) -> Optional[dict]:
+        row = self._guilds.get(guild_id, {}).get(message_id)
+        if row is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return row
+
+    def pop(self, guild_id: int, message_id: int) -> Optional[dict]:
+        return self._guilds.get(guild_id, {}).pop(message_id, None)
+
+    def stats(self) -> dict:
+        return {
+            'guilds': len(self._guilds),
+            'messages': sum(len(messages) for messages in self._guilds.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+recent_messages = RecentMessages(getattr(config, 'AUDIT_RECENT_MESSAGES_PER_GUILD', RECENT_MESSAGES_PER_GUILD))
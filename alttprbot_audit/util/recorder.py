@@ -0,0 +1,271 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+import time
+from typing import Dict, List
+
+import aiofiles
+import discord
+from tortoise.transactions import in_transaction
+
+import config
+from alttprbot import models
+
+FLUSH_INTERVAL = 0.5  # seconds
+FLUSH_ROWS = 200
+MAX_BUFFERED_ROWS = 5000
+SPOOL_RETRY_INTERVAL = 30  # seconds
+AUDIT_SPOOL_PATH = os.path.join("data", "audit_spool")
+
+
+def _encode(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _decode(row: dict) -> dict:
+    if row.get('message_date'):
+        row['message_date'] = datetime.datetime.fromisoformat(row['message_date'])
+    return row
+
+
+def audit_row(message: discord.Message) -> dict:
+    """
+    The AuditMessages columns for message.
+    """
+    return {
+        'guild_id': message.guild.id if message.guild else 0,
+        'message_id': message.id,
+        'user_id': message.author.id,
+        'channel_id': message.channel.id,
+        'message_date': message.created_at,
+        'content': message.content,
+        'attachment': message.attachments[0].url if message.attachments else None,
+        'deleted': 0,
+    }
+
+
+class AuditRecorder():
+    """
+    A write-behind buffer for AuditMessages.  Messages are collected and written with one bulk insert every
+    flush_interval seconds, or as soon as flush_rows are waiting.
+
+    At most max_rows are buffered, after which recording a message waits for the next flush.  If the database can't
+    be reached, the batch is spooled to disk and replayed once it is back.
+
+    Rows that haven't been written yet can still be looked up by message id, so the edit and delete handlers see them.
+    """
+
+    def __init__(self, spool_path: str = AUDIT_SPOOL_PATH, flush_interval: float = FLUSH_INTERVAL,
+                 flush_rows: int = FLUSH_ROWS, max_rows: int = MAX_BUFFERED_ROWS):
+        self.spool_path = spool_path
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.max_rows = max_rows
+
+        self.flushes = 0
+        self.flushed = 0
+        self.failures = 0
+        self.spooled = 0
+        self.replayed = 0
+
+        self._buffer: List[dict] = []
+        # message id -> rows not in the database yet, including the batch being written and spooled batches
+        self._pending: Dict[int, List[dict]] = {}
+        # spool file -> the rows written to it, kept until they are replayed so deletes can still flag them
+        self._spooled: Dict[str, List[dict]] = {}
+        self._wake = asyncio.Event()
+        self._room = asyncio.Event()
+        self._task: asyncio.Task = None
+        self._stopping = False
+        self._last_replay = 0.0
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Write out everything buffered, then stop the flush loop.
+        """
+        self._stopping = True
+        self._wake.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        while self._buffer:
+            await self.flush()
+
+    async def record(self, message: discord.Message):
+        self.start()
+        while len(self._buffer) >= self.max_rows:
+            self._room.clear()
+            self._wake.set()
+            await self._room.wait()
+
+        row = audit_row(message)
+        self._buffer.append(row)
+        self._pending.setdefault(row['message_id'], []).append(row)
+        if len(self._buffer) >= self.flush_rows:
+            self._wake.set()
+
+    def pending(self, message_id: int) -> List[dict]:
+        """
+        The rows for message_id that haven't been written yet, oldest first, in the same shape as .values().
+        """
+        return [dict(row, id=None) for row in self._pending.get(message_id, [])]
+
+    async def history(self, message_id: int) -> List[dict]:
+        """
+        Every row recorded for message_id, oldest first, whether it has been written yet or not.
+        """
+        rows = await models.AuditMessages.filter(message_id=message_id).order_by('id').values()
+        return rows + self.pending(message_id)
+
+    def mark_deleted(self, message_id: int) -> int:
+        """
+        Flag the buffered rows for message_id as deleted.  Returns how many there were.
+        """
+        rows = self._pending.get(message_id, [])
+        for row in rows:
+            row['deleted'] = 1
+        return len(rows)
+
+    async def flush(self):
+        if not self._buffer:
+            return
+
+        batch = self._buffer
+        self._buffer = []
+        self._room.set()
+        self.flushes += 1
+
+        # rows can be marked deleted while the insert is running, those need updating afterwards
+        deleted = [row['deleted'] for row in batch]
+        try:
+            await self._insert(batch)
+        except Exception:
+            logging.exception("Unable to write %s audit messages, spooling them to disk.", len(batch))
+            self.failures += 1
+            # spooled rows stay pending until they are replayed
+            if not await self._spool(batch):
+                self._forget(batch)
+            return
+
+        try:
+            self.flushed += len(batch)
+            await self._flag_deleted(batch, deleted)
+        finally:
+            self._forget(batch)
+
+    async def _flag_deleted(self, rows: List[dict], deleted: List[int]):
+        late = {row['message_id'] for row, was_deleted in zip(rows, deleted) if row['deleted'] and not was_deleted}
+        if late:
+            try:
+                await models.AuditMessages.filter(message_id__in=list(late)).update(deleted=1)
+            except Exception:
+                logging.exception("Unable to flag %s deleted audit messages.", len(late))
+
+    async def _insert(self, rows: List[dict]):
+        # one transaction, so a failed batch is either all written or not at all, and can be spooled safely
+        async with in_transaction() as connection:
+            await models.AuditMessages.bulk_create(
+                [models.AuditMessages(**row) for row in rows],
+                batch_size=self.flush_rows,
+                using_db=connection
+            )
+
+    def _forget(self, batch: List[dict]):
+        for row in batch:
+            rows = self._pending.get(row['message_id'])
+            if rows is None:
+                continue
+            rows = [r for r in rows if r is not row]
+            if rows:
+                self._pending[row['message_id']] = rows
+            else:
+                del self._pending[row['message_id']]
+
+    async def _spool(self, rows: List[dict]) -> bool:
+        filename = f"{time.time_ns()}.jsonl"
+        path = os.path.join(self.spool_path, filename)
+        try:
+            os.makedirs(self.spool_path, exist_ok=True)
+            async with aiofiles.open(path + '.tmp', 'w') as f:
+                await f.write(''.join(json.dumps(row, default=_encode) + '\n' for row in rows))
+            os.replace(path + '.tmp', path)
+        except OSError:
+            logging.exception("Unable to spool %s audit messages, they have been lost.", len(rows))
+            return False
+        self._spooled[filename] = rows
+        self.spooled += len(rows)
+        return True
+
+    async def replay_spool(self):
+        """
+        Write any spooled batches to the database, oldest first, stopping at the first one that fails.
+        """
+        try:
+            filenames = sorted(f for f in os.listdir(self.spool_path) if f.endswith('.jsonl'))
+        except FileNotFoundError:
+            return
+
+        for filename in filenames:
+            path = os.path.join(self.spool_path, filename)
+            async with aiofiles.open(path, 'r') as f:
+                rows = [_decode(json.loads(line)) for line in (await f.read()).splitlines() if line]
+            # the rows as they were spooled, deletes since then are only flagged on the rows still in memory
+            spooled = self._spooled.get(filename, [])
+            deleted = [row['deleted'] for row in rows]
+            try:
+                await self._insert(rows)
+            except Exception:
+                logging.warning("Unable to replay spooled audit messages from %s, will try again later.", path)
+                return
+            os.remove(path)
+            self.replayed += len(rows)
+
+            self._spooled.pop(filename, None)
+            try:
+                await self._flag_deleted(spooled, deleted)
+            finally:
+                self._forget(spooled)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            try:
+                await self.flush()
+                if time.monotonic() - self._last_replay >= SPOOL_RETRY_INTERVAL:
+                    self._last_replay = time.monotonic()
+                    await self.replay_spool()
+            except Exception:
+                logging.exception("Audit recorder flush failed.")
+
+            if self._stopping and not self._buffer:
+                return
+
+    def stats(self) -> dict:
+        return {
+            'buffered': len(self._buffer),
+            'flushes': self.flushes,
+            'flushed': self.flushed,
+            'failures': self.failures,
+            'spooled': self.spooled,
+            'replayed': self.replayed,
+        }
+
+
+audit_recorder = AuditRecorder(
+    spool_path=getattr(config, 'AUDIT_SPOOL_PATH', AUDIT_SPOOL_PATH),
+    flush_interval=getattr(config, 'AUDIT_FLUSH_INTERVAL', FLUSH_INTERVAL),
+)
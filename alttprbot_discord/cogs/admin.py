@@ -3,6 +3,13 @@ from discord import app_commands
 from discord.ext import commands
 
 from alttprbot import models
+from alttprbot.alttprgen.hedging import hedger
+from alttprbot.alttprgen.seedcache import seed_cache
+from alttprbot.alttprgen.scheduler import generation_scheduler
+from alttprbot.util.circuitbreaker import breaker_stats
+from alttprbot.util.httpcache import http_cache
+from alttprbot.util.metrics import metrics
+from alttprbot_discord.util.embed_cache import embed_cache
 
 
 class Admin(commands.GroupCog, name="admin"):
@@ -32,6 +39,95 @@ class Admin(commands.GroupCog, name="admin"):
 
         await interaction.followup.send(f"Done. Performed {updated} changes.", ephemeral=True)
 
+    @app_commands.command(description="Show seed generation queues.")
+    async def generation(self, interaction: discord.Interaction):
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message("Only the bot owner can use this command.", ephemeral=True)
+            return
+
+        embed = discord.Embed(title="Seed Generation", color=discord.Colour.blue())
+        for backend, stats in generation_scheduler.stats().items():
+            queued = ', '.join(
+                f"{name.lower()}: {count}" for name, count in stats['queued_by_priority'].items() if count
+            )
+            waits = '\n'.join(
+                f"{name.lower()}: {wait['count']} runs, avg {wait['average']:.1f}s, max {wait['max']:.1f}s"
+                for name, wait in stats['waits'].items()
+            )
+            value = f"Active: {stats['active']}/{stats['limit']}\nQueued: {stats['queued']}"
+            if queued:
+                value += f" ({queued})"
+            if waits:
+                value += f"\n{waits}"
+            embed.add_field(name=backend, value=value, inline=False)
+        for backend, stats in hedger.stats().items():
+            failure_rate = 'n/a' if stats['failure_rate'] is None else f"{stats['failure_rate']:.0%}"
+            embed.add_field(
+                name=f"{backend} hedging",
+                value=f"Failure rate: {failure_rate}\nHedged: {stats['hedges']}/{stats['requests']}, "
+                      f"won {stats['hedge_wins']}",
+                inline=False
+            )
+        cache = seed_cache.stats()
+        if cache['hits'] or cache['misses']:
+            embed.add_field(
+                name="Seed cache",
+                value=f"{cache['entries']} seeds, {cache['bytes'] / 1048576:.1f}/{cache['max_bytes'] / 1048576:.0f} MiB"
+                      f"\nHit rate: {cache['hit_rate']:.0%} ({cache['hits']} hits, {cache['misses']} misses), "
+                      f"{cache['evictions']} evictions",
+                inline=False
+            )
+        embeds = embed_cache.stats()
+        if embeds['hits'] or embeds['misses']:
+            embed.add_field(
+                name="Embed cache",
+                value=f"{embeds['entries']} embeds\nHit rate: {embeds['hit_rate']:.0%} "
+                      f"({embeds['hits']} hits, {embeds['misses']} misses)",
+                inline=False
+            )
+        timers = metrics.stats()['timers']
+        if timers:
+            embed.add_field(
+                name="Timings",
+                value='\n'.join(
+                    f"{name}: {t['count']} runs, avg {t['average'] * 1000:.0f}ms, max {t['max'] * 1000:.0f}ms"
+                    for name, t in sorted(timers.items())
+                ),
+                inline=False
+            )
+        if not embed.fields:
+            embed.description = "No seeds have been generated yet."
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(description="Show the health of upstream APIs.")
+    async def upstreams(self, interaction: discord.Interaction):
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message("Only the bot owner can use this command.", ephemeral=True)
+            return
+
+        embed = discord.Embed(title="Upstream APIs", color=discord.Colour.blue())
+        for name, stats in breaker_stats().items():
+            failure_rate = 'n/a' if stats['failure_rate'] is None else f"{stats['failure_rate']:.0%}"
+            slow_call_rate = 'n/a' if stats['slow_call_rate'] is None else f"{stats['slow_call_rate']:.0%}"
+            value = f"State: {stats['state']}"
+            if stats['retry_after']:
+                value += f" (retry in {stats['retry_after']:.0f}s)"
+            value += f"\nFailure rate: {failure_rate}, slow: {slow_call_rate} over {stats['calls']} calls" \
+                     f"\nTripped {stats['trips']} times, rejected {stats['rejected']} calls"
+            if stats['last_failure']:
+                value += f"\nLast failure: {stats['last_failure'][:200]}"
+            embed.add_field(name=name, value=value, inline=False)
+        cache = http_cache.stats()
+        embed.add_field(
+            name="HTTP cache",
+            value=f"{cache['entries']} resources, {cache['hits']} served from cache\n"
+                  f"{cache['requests']} requests, {cache['not_modified']} not modified",
+            inline=False
+        )
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Admin(bot))
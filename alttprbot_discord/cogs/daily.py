@@ -1,13 +1,12 @@
 import logging
 
-import aiocache
-import aiohttp
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 
 from alttprbot import models
-from alttprbot_discord.util.alttpr_discord import ALTTPRDiscord
+from alttprbot.alttprgen import seedcache
+from alttprbot.util.httpcache import http_cache
 
 
 class Daily(commands.Cog):
@@ -60,12 +59,10 @@ async def update_daily(hash_id):
         return False
 
 
-@aiocache.cached(ttl=86400, cache=aiocache.SimpleMemoryCache)
 async def get_daily_seed(hash_id):
-    return await ALTTPRDiscord.retrieve(hash_id=hash_id)
+    return await seedcache.retrieve_alttpr(hash_id)
 
 
-@aiocache.cached(ttl=60, cache=aiocache.SimpleMemoryCache)
 async def find_daily_hash():
-    async with aiohttp.request(method='get', url='https://alttpr.com/api/daily', raise_for_status=True) as resp:
-        return await resp.json()
+    # never served stale, so a new daily is announced on the first check after it goes up
+    return await http_cache.get('https://alttpr.com/api/daily', max_age=60, stale_while_revalidate=0)
@@ -149,7 +149,7 @@ class AlttprGenerator(commands.GroupCog, name="alttpr"):
     @preset.autocomplete("preset")
     @spoiler.autocomplete("preset")
     async def preset_autocomplete(self, interaction: discord.Interaction, current: str):
-        presets = await generator.ALTTPRPreset().search(current)
+        presets = await generator.ALTTPRPreset().search(current, discord_user_id=interaction.user.id)
         return [app_commands.Choice(name=preset, value=preset) for preset in presets]
 
     @app_commands.command(
@@ -244,7 +244,7 @@ class AlttprGenerator(commands.GroupCog, name="alttpr"):
 
     @mystery.autocomplete("weightset")
     async def mystery_weightset_autocomplete(self, interaction: discord.Interaction, current: str):
-        weightsets = await generator.ALTTPRMystery().search(current)
+        weightsets = await generator.ALTTPRMystery().search(current, discord_user_id=interaction.user.id)
         return [app_commands.Choice(name=weightset, value=weightset) for weightset in weightsets]
 
     @app_commands.command(description="Create a series a \"Kiss Priest\" games.  This was created by hycutype.")
@@ -448,7 +448,7 @@ class Generator(commands.Cog):
 
     @sm.autocomplete("preset")
     async def sm_autocomplete(self, interaction: discord.Interaction, current: str):
-        presets = await generator.SMPreset().search(current)
+        presets = await generator.SMPreset().search(current, discord_user_id=interaction.user.id)
         return [app_commands.Choice(name=preset, value=preset) for preset in presets]
 
     @app_commands.command()
@@ -477,7 +477,7 @@ class Generator(commands.Cog):
 
     @smz3.autocomplete("preset")
     async def smz3_autocomplete(self, interaction: discord.Interaction, current: str):
-        presets = await generator.SMZ3Preset().search(current)
+        presets = await generator.SMZ3Preset().search(current, discord_user_id=interaction.user.id)
         return [app_commands.Choice(name=preset, value=preset) for preset in presets]
 
     @app_commands.command()
@@ -590,7 +590,7 @@ class Generator(commands.Cog):
 
     @ctjets.autocomplete("preset")
     async def ctjets_autocomplete(self, interaction: discord.Interaction, current: str):
-        presets = await generator.CTJetsPreset().search(current)
+        presets = await generator.CTJetsPreset().search(current, discord_user_id=interaction.user.id)
         return [app_commands.Choice(name=preset, value=preset) for preset in presets]
 
 
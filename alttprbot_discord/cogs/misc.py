@@ -2,7 +2,6 @@ import asyncio
 import datetime
 import random
 
-import aiohttp
 import discord
 import pytz
 from aiocache import cached, Cache
@@ -11,7 +10,8 @@ from discord.ext import commands
 from pytz import UnknownTimeZoneError
 
 import config
-from alttprbot.util.holyimage import HolyImage
+from alttprbot.util.holyimage import HolyImage, get_holy_images
+from alttprbot_discord.util.embed_cache import embed_cache
 
 # TODO: make work with discord.py 2.0
 
@@ -52,13 +52,6 @@ async def holy_game_default(guild: discord.Guild):
     return await guild.config_get("HolyImageDefaultGame", "z3r")
 
 
-@cached(ttl=300, cache=Cache.MEMORY, key="holyimages")
-async def get_holy_images() -> dict:
-    async with aiohttp.ClientSession() as session:
-        async with session.get('http://alttp.mymm1.com/holyimage/holyimages.json') as resp:
-            return await resp.json()
-
-
 class Misc(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -71,6 +64,18 @@ class Misc(commands.Cog):
                 await asyncio.sleep(random.random() * 5)
                 await message.add_reaction(emoji)
 
+    @commands.Cog.listener()
+    async def on_guild_emojis_update(self, guild, before, after):
+        embed_cache.invalidate_emojis()
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        embed_cache.invalidate_emojis()
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        embed_cache.invalidate_emojis()
+
     @app_commands.command(description="Welcome messages for various languages.")
     @app_commands.describe(language="Choose a language for the welcome message.")
     @app_commands.choices(
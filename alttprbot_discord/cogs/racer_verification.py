@@ -12,6 +12,7 @@ from discord.ext import commands, tasks
 
 import config
 from alttprbot import models
+from alttprbot.util import http
 
 RACETIME_URL = config.RACETIME_URL
 
@@ -272,7 +273,7 @@ async def get_racetime_count(racetime_id, category_slugs=None, days=365, max_cou
         return 0
 
     while count < max_count:
-        async with aiohttp.request(
+        async with http.get_session().request(
                 method='get',
                 url=f'{RACETIME_URL}/user/{racetime_id}/races/data',
                 params={'page': page}
@@ -310,7 +311,7 @@ def tz_aware_greater_than(dt1, dt2):
     return dt1 > dt2
 
 async def get_ladder_guid(discord_username):
-    async with aiohttp.request(
+    async with http.get_session().request(
             method='get',
             url='https://alttprladder.com/api/v1/PublicAPI/GetActiveRacers',
             headers={'User-Agent': 'SahasrahBot'},
@@ -324,7 +325,7 @@ async def get_ladder_guid(discord_username):
 
 async def get_ladder_count(discord_username, days=365):
     racer_guid = await get_ladder_guid(discord_username)
-    async with aiohttp.request(
+    async with http.get_session().request(
             method='get',
             url=f'https://alttprladder.com/api/v1/PublicAPI/GetRacerHistory?RacerGUID={racer_guid}&flag_id=0',
             headers={'User-Agent': 'SahasrahBot'},
@@ -346,7 +347,7 @@ async def get_ladder_archive_count(discord_id, days=365):
     delta = timedelta(days=days)
     start = (now - delta).strftime('%m%d%Y')
     end = now.strftime('%m%d%Y')
-    async with aiohttp.request(
+    async with http.get_session().request(
             method='get',
             url=f'https://archive.alttprladder.com/api/v1/PublicAPI/GetRacerRaceHistory?discordid={discord_id}&startdt={start}&enddt={end}',
             headers={'User-Agent': 'SahasrahBot'},
@@ -6,6 +6,11 @@ import html2markdown
 from pyz3r import ALTTPR
 
 import config
+from alttprbot.alttprgen.ext.spoiler_index import SpoilerIndex
+from alttprbot.util.httpcache import http_cache
+from alttprbot_discord.util.embed_cache import EmojiTable, SettingsNames, embed_cache
+
+RANDOMIZER_SETTINGS_MAX_AGE = 6 * 60 * 60  # seconds
 
 emoji_code_map = {
     'Bow': 'Bow',
@@ -51,6 +56,27 @@ class ALTTPRDiscord(ALTTPR):
         username = config.ALTTPR_USERNAME
         password = config.ALTTPR_PASSWORD
         self.auth = aiohttp.BasicAuth(login=username, password=password) if username and password else None
+        self._spoiler_index = None
+
+    @property
+    def spoiler_index(self) -> SpoilerIndex:
+        """
+        The seed's spoiler, parsed once into lookup tables.
+        """
+        if self._spoiler_index is None or self._spoiler_index.data is not self.data:
+            self._spoiler_index = SpoilerIndex(self.data, hash_id=self.hash, url=self.url)
+        return self._spoiler_index
+
+    def get_formatted_spoiler(self, translate_dungeon_items=False):
+        return self.spoiler_index.formatted_spoiler(translate_dungeon_items)
+
+    async def randomizer_settings(self):
+        """
+        The randomizer's settings map, used to name settings in embeds.  It rarely changes, so it comes from the
+        http cache.
+        """
+        return await http_cache.get(self.baseurl + '/randomizer/settings', max_age=RANDOMIZER_SETTINGS_MAX_AGE,
+                                    auth=self.auth)
 
     @property
     def generated_goal(self):
@@ -143,197 +169,58 @@ class ALTTPRDiscord(ALTTPR):
         return " ".join(settings_list)
 
     async def embed(self, emojis=False, name=False, notes=False, include_settings=True):
-        settings_map = await self.randomizer_settings()
-
-        meta = self.data['spoiler'].get('meta', {})
+        return await self._cached_embed('embed', emojis, name, notes, include_settings)
 
-        embed = discord.Embed(
-            title=meta.get('name', 'Requested Seed') if not name else name,
-            description=html2markdown.convert(
-                meta.get('notes', '')) if not notes else notes,
-            color=discord.Colour.dark_red(),
-            timestamp=datetime.datetime.fromisoformat(self.data['generated'])
+    async def tournament_embed(self, emojis=False, name=False, notes=False, include_settings=True):
+        return await self._cached_embed('tournament', emojis, name, notes, include_settings)
+
+    async def _cached_embed(self, variant, emojis, name, notes, include_settings):
+        settings_names = embed_cache.settings_names(await self.randomizer_settings()) if include_settings else None
+        emoji_table = embed_cache.emoji_table(emojis)
+
+        key = (
+            self.hash,
+            variant,
+            settings_names.version if settings_names else None,
+            emoji_table.version if emoji_table else None,
+            name,
+            notes,
         )
-
-        if include_settings:
-            if meta.get('spoilers', 'off') == "mystery":
-                embed.add_field(
-                    name='Mystery Game',
-                    value="No meta information is available for this game.",
-                    inline=False)
-                embed.add_field(
-                    name='Item Placement',
-                    value=f"**Glitches Required:** {meta['logic']}",
-                    inline=True)
-            else:
-                if meta.get('special', False):
-                    embed.add_field(
-                        name='Festive Randomizer',
-                        value="This game is a festive randomizer.  Spooky!",
-                        inline=False)
-                    embed.add_field(
-                        name='Settings',
-                        value=(f"**Item Placement:** {settings_map['item_placement'][meta['item_placement']]}\n"
-                               f"**Dungeon Items:** {settings_map['dungeon_items'][meta['dungeon_items']]}\n"
-                               f"**Accessibility:** {settings_map['accessibility'][meta['accessibility']]}\n"
-                               f"**World State:** {settings_map['world_state'][meta['mode']]}\n"
-                               f"**Hints:** {meta['hints']}\n"
-                               f"**Swords:** {settings_map['weapons'][meta['weapons']]}\n"
-                               f"**Item Pool:** {settings_map['item_pool'][meta['item_pool']]}\n"
-                               f"**Item Functionality:** {settings_map['item_functionality'][meta['item_functionality']]}"
-                               ),
-                        inline=False
-                    )
-                else:
-                    embed.add_field(
-                        name='Item Placement',
-                        value="**Glitches Required:** {logic}\n**Item Placement:** {item_placement}\n**Dungeon Items:** {dungeon_items}\n**Accessibility:** {accessibility}".format(
-                            logic=meta['logic'],
-                            item_placement=settings_map['item_placement'][meta['item_placement']],
-                            dungeon_items=settings_map['dungeon_items'][meta['dungeon_items']],
-                            accessibility=settings_map['accessibility'][meta['accessibility']],
-                        ),
-                        inline=True)
-
-                    embed.add_field(
-                        name='Goal',
-                        value="**Goal:** {goal}\n**Open Tower:** {tower}\n**Ganon Vulnerable:** {ganon}".format(
-                            goal=settings_map['goals'][meta['goal']],
-                            tower=meta.get(
-                                'entry_crystals_tower', 'unknown'),
-                            ganon=meta.get(
-                                'entry_crystals_ganon', 'unknown'),
-                        ),
-                        inline=True)
-                    embed.add_field(
-                        name='Gameplay',
-                        value="**World State:** {mode}\n**Entrance Shuffle:** {entrance}\n**Boss Shuffle:** {boss}\n**Enemy Shuffle:** {enemy}\n**Pot Shuffle:** {pot}\n**Hints:** {hints}".format(
-                            mode=settings_map['world_state'][meta['mode']],
-                            entrance=settings_map['entrance_shuffle'][meta['shuffle']
-                            ] if 'shuffle' in meta else "None",
-                            boss=settings_map['boss_shuffle'][meta['enemizer.boss_shuffle']],
-                            enemy=settings_map['enemy_shuffle'][meta['enemizer.enemy_shuffle']],
-                            pot=meta.get('enemizer.pot_shuffle', 'off'),
-                            hints=meta['hints']
-                        ),
-                        inline=True)
-                    embed.add_field(
-                        name='Difficulty',
-                        value="**Swords:** {weapons}\n**Item Pool:** {pool}\n**Item Functionality:** {functionality}\n**Enemy Damage:** {damage}\n**Enemy Health:** {health}".format(
-                            weapons=settings_map['weapons'][meta['weapons']],
-                            pool=settings_map['item_pool'][meta['item_pool']],
-                            functionality=settings_map['item_functionality'][meta['item_functionality']],
-                            damage=settings_map['enemy_damage'][meta['enemizer.enemy_damage']],
-                            health=settings_map['enemy_health'][meta['enemizer.enemy_health']],
-                        ),
-                        inline=True)
-
-        embed.add_field(name='File Select Code', value=self.build_file_select_code(
-            emojis=emojis), inline=False)
-
-        embed.add_field(name='Permalink', value=self.url, inline=False)
-
-        embed.set_footer(text="Generated", icon_url=discord.utils.get(
-            emojis, name="SahasrahBot").url)
+        embed = embed_cache.get(key)
+        if embed is None:
+            embed = embed_cache.put(key, self._render_embed(variant, emoji_table, settings_names, name, notes))
         return embed
 
-    async def tournament_embed(self, emojis=False, name=False, notes=False, include_settings=True):
-        settings_map = await self.randomizer_settings()
-
+    def _render_embed(self, variant, emoji_table: EmojiTable, settings_names: SettingsNames, name, notes):
         meta = self.data['spoiler'].get('meta', {})
 
         embed = discord.Embed(
             title=meta.get('name', 'Requested Seed') if not name else name,
             description=html2markdown.convert(
                 meta.get('notes', '')) if not notes else notes,
-            color=discord.Colour.dark_gold(),
+            color=discord.Colour.dark_gold() if variant == 'tournament' else discord.Colour.dark_red(),
             timestamp=datetime.datetime.fromisoformat(self.data['generated'])
         )
 
-        if include_settings:
-            if meta.get('spoilers', 'off') == "mystery":
-                embed.add_field(
-                    name='Mystery Game',
-                    value="No meta information is available for this game.",
-                    inline=False)
-                embed.add_field(
-                    name='Item Placement',
-                    value=f"**Glitches Required:** {meta['logic']}",
-                    inline=True)
-            else:
-                if meta.get('special', False):
-                    embed.add_field(
-                        name='Festive Randomizer',
-                        value="This game is a festive randomizer.  Spooky!",
-                        inline=False)
-                    embed.add_field(
-                        name='Settings',
-                        value=(f"**Item Placement:** {settings_map['item_placement'][meta['item_placement']]}\n"
-                               f"**Dungeon Items:** {settings_map['dungeon_items'][meta['dungeon_items']]}\n"
-                               f"**Accessibility:** {settings_map['accessibility'][meta['accessibility']]}\n"
-                               f"**World State:** {settings_map['world_state'][meta['mode']]}\n"
-                               f"**Hints:** {meta['hints']}\n"
-                               f"**Swords:** {settings_map['weapons'][meta['weapons']]}\n"
-                               f"**Item Pool:** {settings_map['item_pool'][meta['item_pool']]}\n"
-                               f"**Item Functionality:** {settings_map['item_functionality'][meta['item_functionality']]}"
-                               ),
-                        inline=False
-                    )
-                else:
-                    embed.add_field(
-                        name='Item Placement',
-                        value="**Glitches Required:** {logic}\n**Item Placement:** {item_placement}\n**Dungeon Items:** {dungeon_items}\n**Accessibility:** {accessibility}".format(
-                            logic=meta['logic'],
-                            item_placement=settings_map['item_placement'][meta['item_placement']],
-                            dungeon_items=settings_map['dungeon_items'][meta['dungeon_items']],
-                            accessibility=settings_map['accessibility'][meta['accessibility']],
-                        ),
-                        inline=True)
-
-                    embed.add_field(
-                        name='Goal',
-                        value="**Goal:** {goal}\n**Open Tower:** {tower}\n**Ganon Vulnerable:** {ganon}".format(
-                            goal=settings_map['goals'][meta['goal']],
-                            tower=meta.get(
-                                'entry_crystals_tower', 'unknown'),
-                            ganon=meta.get(
-                                'entry_crystals_ganon', 'unknown'),
-                        ),
-                        inline=True)
-                    embed.add_field(
-                        name='Gameplay',
-                        value="**World State:** {mode}\n**Entrance Shuffle:** {entrance}\n**Boss Shuffle:** {boss}\n**Enemy Shuffle:** {enemy}\n**Pot Shuffle:** {pot}\n**Hints:** {hints}".format(
-                            mode=settings_map['world_state'][meta['mode']],
-                            entrance=settings_map['entrance_shuffle'][meta['shuffle']
-                            ] if 'shuffle' in meta else "None",
-                            boss=settings_map['boss_shuffle'][meta['enemizer.boss_shuffle']],
-                            enemy=settings_map['enemy_shuffle'][meta['enemizer.enemy_shuffle']],
-                            pot=meta.get('enemizer.pot_shuffle', 'off'),
-                            hints=meta['hints']
-                        ),
-                        inline=True)
-                    embed.add_field(
-                        name='Difficulty',
-                        value="**Swords:** {weapons}\n**Item Pool:** {pool}\n**Item Functionality:** {functionality}\n**Enemy Damage:** {damage}\n**Enemy Health:** {health}".format(
-                            weapons=settings_map['weapons'][meta['weapons']],
-                            pool=settings_map['item_pool'][meta['item_pool']],
-                            functionality=settings_map['item_functionality'][meta['item_functionality']],
-                            damage=settings_map['enemy_damage'][meta['enemizer.enemy_damage']],
-                            health=settings_map['enemy_health'][meta['enemizer.enemy_health']],
-                        ),
-                        inline=True)
-
-        embed.add_field(name='File Select Code', value=self.build_file_select_code(
-            emojis=emojis), inline=False)
-
-        embed.set_footer(text="Generated", icon_url=discord.utils.get(
-            emojis, name="SahasrahBot").url)
+        if settings_names:
+            for field_name, value, inline in settings_names.fields(meta):
+                embed.add_field(name=field_name, value=value, inline=inline)
+
+        embed.add_field(name='File Select Code', value=self._file_select_code(emoji_table), inline=False)
+
+        if variant != 'tournament':
+            embed.add_field(name='Permalink', value=self.url, inline=False)
+
+        footer_emoji = emoji_table.get("SahasrahBot") if emoji_table else None
+        embed.set_footer(text="Generated", icon_url=footer_emoji.url if footer_emoji else None)
         return embed
 
     def build_file_select_code(self, emojis=None):
-        if emojis:
-            emoji_list = list(map(lambda x: str(discord.utils.get(
-                emojis, name=emoji_code_map[x])), self.code))
+        return self._file_select_code(embed_cache.emoji_table(emojis))
+
+    def _file_select_code(self, emoji_table: EmojiTable = None):
+        if emoji_table:
+            emoji_list = [str(emoji_table.get(emoji_code_map[x])) for x in self.code]
             return ' '.join(emoji_list) + ' (' + '/'.join(self.code) + ')'
         else:
             return '/'.join(self.code)
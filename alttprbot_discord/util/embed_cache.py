@@ -0,0 +1,198 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import discord
+
+EMBED_CACHE_MAX_ENTRIES = 256
+SETTINGS_FIELDS_MAX_ENTRIES = 512
+
+# the seed metadata the settings fields of an embed are rendered from
+SETTINGS_META_KEYS = (
+    'spoilers',
+    'special',
+    'logic',
+    'item_placement',
+    'dungeon_items',
+    'accessibility',
+    'mode',
+    'hints',
+    'weapons',
+    'item_pool',
+    'item_functionality',
+    'goal',
+    'entry_crystals_tower',
+    'entry_crystals_ganon',
+    'shuffle',
+    'enemizer.boss_shuffle',
+    'enemizer.enemy_shuffle',
+    'enemizer.enemy_damage',
+    'enemizer.enemy_health',
+    'enemizer.pot_shuffle',
+)
+
+_MISSING = object()
+
+# (name, value, inline)
+Field = Tuple[str, str, bool]
+
+
+class SettingsNames():
+    """
+    The randomizer's settings map, with the settings fields of an embed rendered once for each combination of
+    settings.  Seeds rolled from the same preset share them.
+    """
+
+    def __init__(self, settings_map: dict, version: int):
+        self.settings_map = settings_map
+        self.version = version
+        self._fields: Dict[tuple, Tuple[Field, ...]] = {}
+
+    def fields(self, meta: dict) -> Tuple[Field, ...]:
+        signature = tuple(meta.get(key, _MISSING) for key in SETTINGS_META_KEYS)
+        fields = self._fields.get(signature)
+        if fields is None:
+            fields = self._render(meta)
+            if len(self._fields) >= SETTINGS_FIELDS_MAX_ENTRIES:
+                self._fields.clear()
+            self._fields[signature] = fields
+        return fields
+
+    def _render(self, meta: dict) -> Tuple[Field, ...]:
+        settings_map = self.settings_map
+
+        if meta.get('spoilers', 'off') == "mystery":
+            return (
+                ('Mystery Game', "No meta information is available for this game.", False),
+                ('Item Placement', f"**Glitches Required:** {meta['logic']}", True),
+            )
+
+        if meta.get('special', False):
+            return (
+                ('Festive Randomizer', "This game is a festive randomizer.  Spooky!", False),
+                ('Settings', (
+                    f"**Item Placement:** {settings_map['item_placement'][meta['item_placement']]}\n"
+                    f"**Dungeon Items:** {settings_map['dungeon_items'][meta['dungeon_items']]}\n"
+                    f"**Accessibility:** {settings_map['accessibility'][meta['accessibility']]}\n"
+                    f"**World State:** {settings_map['world_state'][meta['mode']]}\n"
+                    f"**Hints:** {meta['hints']}\n"
+                    f"**Swords:** {settings_map['weapons'][meta['weapons']]}\n"
+                    f"**Item Pool:** {settings_map['item_pool'][meta['item_pool']]}\n"
+                    f"**Item Functionality:** {settings_map['item_functionality'][meta['item_functionality']]}"
+                ), False),
+            )
+
+        return (
+            ('Item Placement', (
+                f"**Glitches Required:** {meta['logic']}\n"
+                f"**Item Placement:** {settings_map['item_placement'][meta['item_placement']]}\n"
+                f"**Dungeon Items:** {settings_map['dungeon_items'][meta['dungeon_items']]}\n"
+                f"**Accessibility:** {settings_map['accessibility'][meta['accessibility']]}"
+            ), True),
+            ('Goal', (
+                f"**Goal:** {settings_map['goals'][meta['goal']]}\n"
+                f"**Open Tower:** {meta.get('entry_crystals_tower', 'unknown')}\n"
+                f"**Ganon Vulnerable:** {meta.get('entry_crystals_ganon', 'unknown')}"
+            ), True),
+            ('Gameplay', (
+                f"**World State:** {settings_map['world_state'][meta['mode']]}\n"
+                f"**Entrance Shuffle:** "
+                f"{settings_map['entrance_shuffle'][meta['shuffle']] if 'shuffle' in meta else 'None'}\n"
+                f"**Boss Shuffle:** {settings_map['boss_shuffle'][meta['enemizer.boss_shuffle']]}\n"
+                f"**Enemy Shuffle:** {settings_map['enemy_shuffle'][meta['enemizer.enemy_shuffle']]}\n"
+                f"**Pot Shuffle:** {meta.get('enemizer.pot_shuffle', 'off')}\n"
+                f"**Hints:** {meta['hints']}"
+            ), True),
+            ('Difficulty', (
+                f"**Swords:** {settings_map['weapons'][meta['weapons']]}\n"
+                f"**Item Pool:** {settings_map['item_pool'][meta['item_pool']]}\n"
+                f"**Item Functionality:** {settings_map['item_functionality'][meta['item_functionality']]}\n"
+                f"**Enemy Damage:** {settings_map['enemy_damage'][meta['enemizer.enemy_damage']]}\n"
+                f"**Enemy Health:** {settings_map['enemy_health'][meta['enemizer.enemy_health']]}"
+            ), True),
+        )
+
+
+class EmojiTable():
+    """
+    The bot's emojis by name, so building a file select code doesn't search the emoji list once per item.
+    """
+
+    def __init__(self, emojis: List[discord.Emoji], version: int):
+        self.version = version
+        self.count = len(emojis)
+        # the first emoji with a name wins, like discord.utils.get
+        self.by_name: Dict[str, discord.Emoji] = {}
+        for emoji in emojis:
+            self.by_name.setdefault(emoji.name, emoji)
+
+    def get(self, name: str) -> Optional[discord.Emoji]:
+        return self.by_name.get(name)
+
+
+class EmbedCache():
+    """
+    Rendered seed embeds, keyed by the seed's hash, the kind of embed, and the versions of the settings map and emoji
+    table they were rendered with.  A new settings map or emoji table starts the cache over.
+
+    Callers get a copy, so they are free to add fields to it.
+    """
+
+    def __init__(self, max_entries: int = EMBED_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._embeds: OrderedDict[Hashable, discord.Embed] = OrderedDict()
+        self._settings: Optional[SettingsNames] = None
+        self._emojis: Optional[EmojiTable] = None
+        self._version = 0
+
+    def settings_names(self, settings_map: dict) -> SettingsNames:
+        # the http cache hands back the same object until the settings actually change
+        if self._settings is None or self._settings.settings_map is not settings_map:
+            self._version += 1
+            self._settings = SettingsNames(settings_map, self._version)
+            self._embeds.clear()
+        return self._settings
+
+    def emoji_table(self, emojis: Optional[List[discord.Emoji]]) -> Optional[EmojiTable]:
+        if not emojis:
+            return None
+        if self._emojis is None or self._emojis.count != len(emojis):
+            self._version += 1
+            self._emojis = EmojiTable(emojis, self._version)
+            self._embeds.clear()
+        return self._emojis
+
+    def invalidate_emojis(self):
+        """
+        Rebuild the emoji table the next time it is used, e.g. after a guild's emojis change.
+        """
+        self._emojis = None
+
+    def get(self, key: Hashable) -> Optional[discord.Embed]:
+        embed = self._embeds.get(key)
+        if embed is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._embeds.move_to_end(key)
+        return embed.copy()
+
+    def put(self, key: Hashable, embed: discord.Embed) -> discord.Embed:
+        self._embeds[key] = embed
+        self._embeds.move_to_end(key)
+        while len(self._embeds) > self.max_entries:
+            self._embeds.popitem(last=False)
+        return embed.copy()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._embeds),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else None,
+        }
+
+
+embed_cache = EmbedCache()
@@ -1,7 +1,7 @@
 from racetime_bot import monitor_cmd, msg_actions
 
 from alttprbot.alttprgen import preset, spoilers, generator
-from .core import SahasrahBotCoreHandler
+from .core import SahasrahBotCoreHandler, single_flight_roll
 
 
 class GameHandler(SahasrahBotCoreHandler):
@@ -107,6 +107,7 @@ class GameHandler(SahasrahBotCoreHandler):
         await self.roll_game(preset_name=preset_name, message=message, allow_quickswap=False, branch=branch)
 
     # TODO: delete this in favor of !race
+    @single_flight_roll('spoiler')
     async def ex_spoiler(self, args, message):
         if await self.is_locked(message):
             return
@@ -139,6 +140,7 @@ class GameHandler(SahasrahBotCoreHandler):
         self.seed_rolled = True
 
     # TODO: delete this in favor of !race
+    @single_flight_roll('tournamentspoiler')
     async def ex_tournamentspoiler(self, args, message):
         if await self.is_locked(message):
             return
@@ -171,6 +173,7 @@ class GameHandler(SahasrahBotCoreHandler):
         self.seed_rolled = True
 
     # TODO: delete this in favor of !race
+    @single_flight_roll('progression')
     async def ex_progression(self, args, message):
         if await self.is_locked(message):
             return
@@ -197,6 +200,7 @@ class GameHandler(SahasrahBotCoreHandler):
         await self.schedule_spoiler_race(spoiler.spoiler_log_url, 0)
         self.seed_rolled = True
 
+    @single_flight_roll('newrace')
     async def ex2_newrace(self, message, positional_args, keyword_args):
         if await self.is_locked(message):
             return
@@ -262,6 +266,7 @@ class GameHandler(SahasrahBotCoreHandler):
 
         self.seed_rolled = True
 
+    @single_flight_roll('mystery')
     async def ex_mystery(self, args, message):
         if await self.is_locked(message):
             return
@@ -311,6 +316,7 @@ class GameHandler(SahasrahBotCoreHandler):
         await self.send_message("You need to be more creative.")
 
     # deprecated
+    @single_flight_roll('race')
     async def roll_game(self, preset_name, message, allow_quickswap=True, endpoint_prefix="", branch=None):
         if await self.is_locked(message):
             return
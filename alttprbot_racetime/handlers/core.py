@@ -9,9 +9,21 @@ from racetime_bot import RaceHandler, can_monitor, monitor_cmd
 
 from alttprbot import models
 from alttprbot import tournaments
+from alttprbot.util.singleflight import SingleFlight, single_flight
 from alttprbot_discord.bot import discordbot
 from alttprbot_racetime.misc.konot import KONOT
 
+# seed rolls in flight, keyed by (race room, command kind)
+roll_flights = SingleFlight()
+
+
+def single_flight_roll(kind: str):
+    """
+    Decorator for handler methods that roll a seed.  A duplicate request for the same room, such as a double-clicked
+    action or a re-delivered message, waits for the roll already in progress instead of starting another one.
+    """
+    return single_flight(roll_flights, lambda handler, *args, **kwargs: (handler.data.get('name'), kind))
+
 
 class SahasrahBotCoreHandler(RaceHandler):
     """
@@ -276,6 +288,7 @@ class SahasrahBotCoreHandler(RaceHandler):
         await self.set_bot_raceinfo("New Race")
         await self.send_message("Reseting bot state.  You may now roll a new game.")
 
+    @single_flight_roll('tournamentrace')
     async def ex_tournamentrace(self, args, message):
         if await self.is_locked(message):
             return
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""
+Roll a mystery weightset offline and report how often each setting comes up.
+
+    python analyze_mystery.py presets/alttprmystery/ladder.yaml -n 100000 \
+        -j weapons=swordless,keysanity=true,mode=inverted
+"""
+import argparse
+import random
+import time
+
+import yaml
+
+from alttprbot.alttprgen.randomizer.mysteryanalysis import SUMMARY_FIELDS, analyze, parse_condition
+
+
+def percent(count, total):
+    return f"{count / total * 100:6.2f}%" if total else "   n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('weightset', help="path to a weightset yaml file")
+    parser.add_argument('-n', '--rolls', type=int, default=100000)
+    parser.add_argument('-j', '--joint', action='append', default=[],
+                        help="comma separated key=value conditions to count together, can be repeated")
+    parser.add_argument('-f', '--field', action='append', default=[],
+                        help=f"settings to report, defaults to {', '.join(SUMMARY_FIELDS)}")
+    parser.add_argument('-b', '--by-subweight', default='door_shuffle',
+                        help="setting to break down per subweight")
+    parser.add_argument('-s', '--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    with open(args.weightset) as f:
+        weights = yaml.safe_load(f)
+
+    start = time.perf_counter()
+    analysis = analyze(
+        weights,
+        rolls=args.rolls,
+        joints=[parse_condition(joint) for joint in args.joint],
+        fields=args.field or None,
+        by_subweight=args.by_subweight,
+        rng=random.Random(args.seed),
+    )
+    print(f"Rolled {analysis.rolls} games in {time.perf_counter() - start:.1f}s\n")
+
+    for name, counter in analysis.marginals.items():
+        total = sum(counter.values())
+        print(f"{name}:")
+        for value, count in counter.most_common():
+            print(f"  {percent(count, total)}  {value}")
+        print()
+
+    if analysis.joints or args.joint:
+        print("joint:")
+        for joint in args.joint:
+            count = analysis.joints[parse_condition(joint)]
+            print(f"  {percent(count, analysis.rolls)}  {joint}")
+        print()
+
+    if len(analysis.by_subweight) > 1:
+        print(f"{args.by_subweight} by subweight:")
+        for path, counter in sorted(analysis.by_subweight.items()):
+            total = sum(counter.values())
+            print(f"  {'/'.join(str(p) for p in path) or '(none)'} - {percent(total, analysis.rolls)} of rolls")
+            for value, count in counter.most_common():
+                print(f"    {percent(count, total)}  {value}")
+        print()
+
+    for error, count in analysis.errors.most_common():
+        print(f"ERROR ({count} rolls): {error}")
+    for warning in analysis.warnings:
+        print(f"WARNING: {warning}")
+
+
+if __name__ == '__main__':
+    main()
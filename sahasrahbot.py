@@ -6,9 +6,14 @@ from sentry_sdk.integrations.aiohttp import AioHttpIntegration
 from tortoise import Tortoise
 
 import config
+from alttprbot.alttprgen.preset_registry import preset_registry
+from alttprbot.alttprgen.randomizer.alttprdoor_pool import shutdown_door_worker_pools
+from alttprbot.alttprgen.seedpool import seed_pool_manager
 from alttprbot.exceptions import SahasrahBotException
+from alttprbot.util import http, storage, triforce_text
 from alttprbot_api.api import sahasrahbotapi
 from alttprbot_audit.bot import start_bot as start_audit_bot
+from alttprbot_audit.util.recorder import audit_recorder
 from alttprbot_discord.bot import start_bot as start_discord_bot
 from alttprbot_racetime.bot import start_racetime
 
@@ -41,8 +46,23 @@ if __name__ == '__main__':
     dbtask = loop.create_task(database())
     loop.run_until_complete(dbtask)
 
+    preset_registry.load()
+
+    seed_pool_refresh = None
+    if not config.DEBUG:
+        seed_pool_refresh = loop.create_task(triforce_text.refresh_seed_pools())
+
     loop.create_task(start_discord_bot())
     loop.create_task(start_audit_bot())
     start_racetime(loop)
     loop.create_task(sahasrahbotapi.run(host='127.0.0.1', port=5001, use_reloader=False, loop=loop))
-    loop.run_forever()
+    try:
+        loop.run_forever()
+    finally:
+        if seed_pool_refresh is not None:
+            seed_pool_refresh.cancel()
+        loop.run_until_complete(seed_pool_manager.stop())
+        loop.run_until_complete(audit_recorder.stop())
+        loop.run_until_complete(http.close())
+        loop.run_until_complete(storage.close())
+        shutdown_door_worker_pools()